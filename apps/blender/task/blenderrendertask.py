@@ -14,6 +14,7 @@ from apps.blender.blenderenvironment import BlenderEnvironment, \
     BlenderNVGPUEnvironment
 from apps.core.task.coretask import CoreTaskTypeInfo
 from apps.rendering.resources.imgrepr import load_as_pil
+from apps.rendering.resources.preview import PreviewCanvas
 from apps.rendering.resources.renderingtaskcollector import \
     RenderingTaskCollector
 from apps.rendering.resources.utils import handle_image_error, handle_none
@@ -62,6 +63,8 @@ class PreviewUpdater(object):
         self.preview_res_y = preview_res_y
         self.preview_file_path = preview_file_path
         self.expected_offsets = expected_offsets
+        self.canvas = PreviewCanvas(preview_file_path,
+                                    (preview_res_x, preview_res_y))
 
         # where the match ends - since the chunks have unexpectable sizes, we
         # don't know where to paste new chunk unless all of the above are in
@@ -69,6 +72,14 @@ class PreviewUpdater(object):
         self.perfect_match_area_y = 0
         self.perfectly_placed_subtasks = 0
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # updaters pickled before previews were kept in memory
+        if 'canvas' not in state:
+            self.canvas = PreviewCanvas(self.preview_file_path,
+                                        (self.preview_res_x,
+                                         self.preview_res_y))
+
     def get_offset(self, subtask_number):
         if 0 < subtask_number < len(self.expected_offsets):
             return self.expected_offsets[subtask_number]
@@ -100,16 +111,10 @@ class PreviewUpdater(object):
             with subtask_img.resize((self.preview_res_x, height),
                                     resample=Image.BILINEAR) \
                     as subtask_img_resized:
-                def open_or_create_image():
-                    if not os.path.exists(self.preview_file_path) \
-                            or len(self.chunks) == 1:
-                        return Image.new("RGB", (self.preview_res_x,
-                                                 self.preview_res_y))
-                    return Image.open(self.preview_file_path)
-
-                with open_or_create_image() as preview_img:
-                    preview_img.paste(subtask_img_resized, (0, offset))
-                    preview_img.save(self.preview_file_path, PREVIEW_EXT)
+                if len(self.chunks) == 1:
+                    self.canvas.reset()
+                self.canvas.image.paste(subtask_img_resized, (0, offset))
+                self.canvas.changed()
 
         if not handler_result.success:
             return
@@ -123,11 +128,9 @@ class PreviewUpdater(object):
         self.chunks = {}
         self.perfect_match_area_y = 0
         self.perfectly_placed_subtasks = 0
+        self.canvas.reset()
         if os.path.exists(self.preview_file_path):
-            with handle_image_error(logger), \
-                 Image.new("RGB", (self.preview_res_x, self.preview_res_y)) \
-                    as img:
-                img.save(self.preview_file_path, PREVIEW_EXT)
+            self.canvas.flush()
 
 
 class RenderingTaskTypeInfo(CoreTaskTypeInfo):
@@ -138,6 +141,8 @@ class RenderingTaskTypeInfo(CoreTaskTypeInfo):
         if not task:
             pass
         elif task.use_frames:
+            # previews are written to disk lazily
+            task.flush_previews()
             if single:
                 return to_unicode(task.last_preview_path)
             else:
@@ -149,6 +154,7 @@ class RenderingTaskTypeInfo(CoreTaskTypeInfo):
                     except IndexError:
                         result[to_unicode(f)] = None
         else:
+            task.flush_previews()
             result = to_unicode(task.preview_task_file_path or
                                 task.preview_file_path)
         return cls._preview_result(result, single=single)
@@ -327,6 +333,14 @@ class BlenderRenderTask(FrameRenderingTask):
         self.compositing = False
         self.samples = task_definition.options.samples
 
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        # canvases of updaters restored from older pickles are not shared yet
+        for updater in self.preview_updaters or [self.preview_updater]:
+            if updater is not None:
+                self.preview_canvases.setdefault(updater.preview_file_path,
+                                                 updater.canvas)
+
     def initialize(self, dir_manager):
         super(BlenderRenderTask, self).initialize(dir_manager)
 
@@ -353,6 +367,8 @@ class BlenderRenderTask(FrameRenderingTask):
                                                             preview_x,
                                                             preview_y,
                                                             expected_offsets))
+                self.preview_canvases[preview_path] = \
+                    self.preview_updaters[i].canvas
         else:
             preview_name = "current_preview.{}".format(PREVIEW_EXT)
             self.preview_file_path = "{}".format(os.path.join(self.tmp_dir,
@@ -361,6 +377,8 @@ class BlenderRenderTask(FrameRenderingTask):
                                                   preview_x,
                                                   preview_y,
                                                   expected_offsets)
+            self.preview_canvases[self.preview_file_path] = \
+                self.preview_updater.canvas
 
     # pylint: disable-msg=too-many-locals
     def query_extra_data(self, perf_index: float,
@@ -543,8 +561,9 @@ class BlenderRenderTask(FrameRenderingTask):
                 preview_task_file_path = self._get_preview_task_file_path(num)
                 self.last_preview_path = preview_task_file_path
 
-                scaled.save(preview_task_file_path, PREVIEW_EXT)
-                scaled.save(self._get_preview_file_path(num), PREVIEW_EXT)
+                for path in {preview_task_file_path,
+                             self._get_preview_file_path(num)}:
+                    self._get_preview_canvas(path).replace(scaled.copy())
         else:
             self.preview_updaters[num].update_preview(new_chunk_file_path, part)
             self._update_frame_task_preview()
@@ -572,19 +591,18 @@ class BlenderRenderTask(FrameRenderingTask):
         lower = preview_updater.get_offset(part)
         upper = preview_updater.get_offset(part + 1)
         res_x = preview_updater.preview_res_x
-        for i in range(0, res_x):
-            for j in range(lower, upper):
-                img_task.putpixel((i, j), color)
+        img_task.paste(color, (0, lower, res_x, upper))
 
     def _mark_task_area(self, subtask, img_task, color, frame_index=0):
         if not self.use_frames:
             self.mark_part_on_preview(subtask['start_task'], img_task, color,
                                       self.preview_updater)
         elif self.total_tasks <= len(self.frames):
-            for i in range(0, int(math.floor(self.res_x * self.scale_factor))):
-                for j in range(0,
-                               int(math.floor(self.res_y * self.scale_factor))):
-                    img_task.putpixel((i, j), color)
+            img_task.paste(color, (0, 0,
+                                   int(math.floor(self.res_x *
+                                                  self.scale_factor)),
+                                   int(math.floor(self.res_y *
+                                                  self.scale_factor))))
         else:
             parts = int(self.total_tasks / len(self.frames))
             pu = self.preview_updaters[frame_index]
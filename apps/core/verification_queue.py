@@ -1,9 +1,11 @@
 import logging
 import queue
+import time
 from functools import partial
 from types import FunctionType
 from typing import Optional, Type, Dict, Tuple
 
+from golem.monitor import metrics
 from golem.verificator.verifier import Verifier
 from twisted.internet.defer import Deferred, gatherResults
 
@@ -55,6 +57,15 @@ class VerificationQueue:
         self._paused = False
         self._process_queue()
 
+    def get_stats(self) -> Dict[str, int]:
+        """
+        :return: Number of queued and running verification jobs
+        """
+        return {
+            'queue_depth': self._queue.qsize(),
+            'running': len(self._jobs),
+        }
+
     @property
     def can_run(self) -> bool:
         return not self._paused and len(self._jobs) < self._concurrency
@@ -76,9 +87,11 @@ class VerificationQueue:
         subtask_id = entry.subtask_id
 
         logger.info("Running verification of subtask %r", subtask_id)
+        started = time.monotonic()
 
         def callback(*args):
             logger.info("Finished verification of subtask %r", subtask_id)
+            metrics.VERIFICATION_SECONDS.observe(time.monotonic() - started)
             try:
                 self.callbacks[entry](subtask_id=args[0][0], verdict=args[0][1],
                                       result=args[0][2])
@@ -3,8 +3,12 @@
 #
 #  Harrison Ainsworth / HXA7241 and Juraj Sukop : 2007-2008, 2013.
 #  http://www.hxa.name/minilight
+import functools
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from time import time
+from typing import Optional, Tuple
 
 from .camera import Camera
 from .image import Image
@@ -59,18 +63,7 @@ def make_perf_test(filename):
 
       (0 0 0) (0 1 0) (1 1 0)  (0.7 0.7 0.7) (0 0 0)
     """
-    model_file_pathname = filename
-    model_file = open(model_file_pathname, 'r')
-    if model_file.readline().strip() != MODEL_FORMAT_ID:
-        raise Exception('invalid model file')
-    for line in model_file:
-        if not line.isspace():
-            iterations = int(line)
-            break
-    image = Image(model_file)
-    camera = Camera(model_file)
-    scene = Scene(model_file, camera.view_position)
-    model_file.close()
+    iterations, image, camera, scene = load_model(filename)
 
     duration: float = render_taskable(image, camera, scene, iterations)
 
@@ -83,6 +76,106 @@ def make_perf_test(filename):
     return average
 
 
+def make_multicore_perf_test(filename, processes: Optional[int] = None,
+                             tile_rows: int = 1,
+                             passes: Optional[int] = None) -> float:
+    """
+    Multi-core CPU performance test.
+
+    Renders the model image `passes` times (once per process by default),
+    split into tiles of `tile_rows` rows which are distributed across a
+    pool of worker processes. The result is the number of rays per second
+    traced by all the workers together, measured from the start of the
+    first tile to the end of the last one, so that starting the processes
+    and loading the model are not counted. Every tile is rendered with the
+    same renderer as in make_perf_test, which makes a single process result
+    comparable with the single core one.
+    """
+    processes = processes or os.cpu_count() or 1
+    passes = passes or processes
+    height = load_model(filename)[1].height
+
+    tiles = [(start, min(start + tile_rows, height))
+             for start in range(0, height, tile_rows)] * passes
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = list(executor.map(
+            render_tile, [filename] * len(tiles), tiles))
+
+    num_samples = sum(samples for samples, _, _ in results)
+    started = min(start for _, start, _ in results)
+    finished = max(end for _, _, end in results)
+    duration = finished - started
+
+    average = float(num_samples) / duration
+    logger.debug("Summary: Rendering scene with %d rays in %d processes took "
+                 "%f seconds giving an average speed of %f rays/s",
+                 num_samples, processes, duration, average)
+    return average
+
+
+# The single core calibration renders at least 1/n of the samples
+CALIBRATION_STRIDE = 4
+
+
+def make_calibrated_perf_test(filename, processes: Optional[int] = None) \
+        -> Tuple[float, float]:
+    """
+    Single core and all cores CPU performance test, taking less time than
+    make_perf_test on machines with more than one core.
+
+    The single core result is measured in this process, rendering the whole
+    image with fewer samples per pixel, so it stays comparable with
+    make_perf_test. The all cores result is measured by
+    make_multicore_perf_test, rendering the image split between the
+    processes rather than once per process.
+    :return: single core and all cores rays per second
+    """
+    processes = processes or os.cpu_count() or 1
+    iterations, image, camera, scene = load_model(filename)
+
+    samples = max(iterations // min(processes, CALIBRATION_STRIDE), 1)
+    duration = render_taskable(image, camera, scene, samples)
+    single_core = float(image.width * image.height * samples) / duration
+    if processes == 1:
+        return single_core, single_core
+
+    # Enough tiles to keep every process busy
+    passes = -(-2 * processes // image.height)
+    all_cores = make_multicore_perf_test(filename, processes, passes=passes)
+    return single_core, all_cores
+
+
+def render_tile(filename, rows: Tuple[int, int]) -> Tuple[int, float, float]:
+    """
+    Renders image rows [start, stop) of the model in a worker process.
+    :return: the number of rays traced, rendering start and end time
+    """
+    iterations, image, camera, scene = _load_model_cached(filename)
+    start = time()
+    render_taskable(image, camera, scene, iterations, range(*rows))
+    end = time()
+    return (rows[1] - rows[0]) * image.width * iterations, start, end
+
+
+def load_model(filename) -> Tuple[int, Image, Camera, Scene]:
+    with open(filename, 'r') as model_file:
+        if model_file.readline().strip() != MODEL_FORMAT_ID:
+            raise Exception('invalid model file')
+        for line in model_file:
+            if not line.isspace():
+                iterations = int(line)
+                break
+        image = Image(model_file)
+        camera = Camera(model_file)
+        scene = Scene(model_file, camera.view_position)
+    return iterations, image, camera, scene
+
+
+# Worker processes render many tiles of the same model
+_load_model_cached = functools.lru_cache(maxsize=4)(load_model)
+
+
 def timedafunc(function):
     def timedExecution(*args, **kwargs):
         t0 = time()
@@ -95,11 +188,11 @@ def timedafunc(function):
 
 
 @timedafunc
-def render_taskable(image, camera, scene, num_samples):
+def render_taskable(image, camera, scene, num_samples, rows=None):
     random = Random()
     aspect = float(image.height) / float(image.width)
 
-    for y in range(image.height):
+    for y in rows if rows is not None else range(image.height):
         for x in range(image.width):
             # separated tasks which should be added to the final image when they
             # are ready (even better simple pixel values can be accumulated
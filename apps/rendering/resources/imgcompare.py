@@ -2,6 +2,8 @@ from __future__ import division
 import logging
 import math
 
+import numpy
+
 from apps.rendering.resources.imgrepr import (EXRImgRepr, ImgRepr, load_img,
                                               PILImgRepr)
 logger = logging.getLogger("apps.rendering")
@@ -22,6 +24,16 @@ def calculate_psnr(mse, max_=255):
     return 20 * math.log10(max_) - 10 * math.log10(mse)
 
 
+def _crop(array, start, box):
+    """ Cut a box of side lengths `box` starting at pixel `start` out of
+    an image array of shape (height, width, channels) """
+    (x, y), (res_x, res_y) = start, box
+    if x < 0 or y < 0 or \
+            x + res_x > array.shape[1] or y + res_y > array.shape[0]:
+        raise IndexError("box is out of image bounds")
+    return array[y:y + res_y, x:x + res_x]
+
+
 def calculate_mse(img1, img2, start1=(0, 0), start2=(0, 0), box=None):
     """
     :param img1:
@@ -31,7 +43,6 @@ def calculate_mse(img1, img2, start1=(0, 0), start2=(0, 0), box=None):
     :param box: describes side lengths of the box
     :return:
     """
-    mse = 0
     if not isinstance(img1, ImgRepr) or not isinstance(img2, ImgRepr):
         raise TypeError("img1 and img2 must be ImgRepr")
 
@@ -45,17 +56,15 @@ def calculate_mse(img1, img2, start1=(0, 0), start2=(0, 0), box=None):
                  'img1 and img2 are of different sizes '
                  'and there is no cropping box provided.')
 
-    for i in range(0, res_x):
-        for j in range(0, res_y):
-            [r1, g1, b1] = img1.get_pixel((start1[0] + i, start1[1] + j))
-            [r2, g2, b2] = img2.get_pixel((start2[0] + i, start2[1] + j))
-            mse += (r1 - r2) * (r1 - r2) + \
-                   (g1 - g2) * (g1 - g2) + \
-                   (b1 - b2) * (b1 - b2)
-
     if res_x <= 0 or res_y <= 0:
         raise ValueError("Image or box resolution must be greater than 0")
 
+    # float64 keeps sums of 8-bit differences exact
+    diff = _crop(img1.to_numpy(), start1, (res_x, res_y)).astype(
+        numpy.float64)
+    diff -= _crop(img2.to_numpy(), start2, (res_x, res_y))
+
+    mse = float(numpy.sum(diff * diff))
     mse /= res_x * res_y * 3
     return mse
 
@@ -45,6 +45,12 @@ class ImgRepr(object, metaclass=abc.ABCMeta):
     def close(self):
         return
 
+    def to_numpy(self) -> numpy.ndarray:
+        """ Return the RGB values as an array of shape (height, width, 3) """
+        (res_x, res_y) = self.get_size()
+        return numpy.array([[self.get_pixel((x, y)) for x in range(res_x)]
+                            for y in range(res_y)])
+
 
 class OpenCVImgRepr:
     def __init__(self):
@@ -137,6 +143,16 @@ class PILImgRepr(ImgRepr):
     def to_pil(self):
         return self.img
 
+    def to_numpy(self) -> numpy.ndarray:
+        return numpy.asarray(self.img)
+
+    def load_from_numpy(self, array: numpy.ndarray):
+        """ Replace pixels with RGB values from an array of shape
+        (height, width, 3) """
+        name = getattr(self.img, 'name', "noname.png")
+        array = numpy.clip(array, 0, 255).astype(numpy.uint8)
+        self.load_from_pil_object(Image.fromarray(array), name)
+
     def close(self):
         if self.img:
             self.img.close()
@@ -173,6 +189,16 @@ class EXRImgRepr(ImgRepr):
         for c in range(0, len(self.rgb)):
             self.rgb[c].putpixel(xy, max(min(self.max, color[c]), self.min))
 
+    def to_numpy(self) -> numpy.ndarray:
+        return numpy.dstack([numpy.asarray(c) for c in self.rgb])
+
+    def load_from_numpy(self, array: numpy.ndarray):
+        """ Replace pixels with RGB values from an array of shape
+        (height, width, 3) """
+        array = numpy.clip(array, self.min, self.max).astype(numpy.float32)
+        self.rgb = [Image.fromarray(array[:, :, c])
+                    for c in range(len(self.rgb))]
+
     def get_rgbf_extrema(self):
         extrema = [im.getextrema() for im in self.rgb]
         darkest = min([lo for (lo, hi) in extrema])
@@ -266,12 +292,9 @@ def blend(img1, img2, alpha):
         return
 
     img = img1.copy()
-
-    for x in range(0, res_x):
-        for y in range(0, res_y):
-            p1 = img1.get_pixel((x, y))
-            p2 = img2.get_pixel((x, y))
-            p = list(map(lambda c1, c2: c1 * (1 - alpha) + c2 * alpha, p1, p2))
-            img.set_pixel((x, y), p)
+    img.load_from_numpy(
+        img1.to_numpy().astype(numpy.float64) * (1 - alpha) +
+        img2.to_numpy().astype(numpy.float64) * alpha
+    )
 
     return img
@@ -0,0 +1,84 @@
+import logging
+import os
+import time
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from apps.rendering.resources.utils import handle_image_error
+
+logger = logging.getLogger("apps.rendering")
+
+
+class PreviewCanvas(object):
+    """ Preview image kept in memory and written to disk lazily.
+
+    Modify image and call changed() afterwards. The file is rewritten at most
+    once per FLUSH_INTERVAL seconds; flush() writes pending changes at once,
+    e.g. before the preview is handed out.
+    """
+
+    FLUSH_INTERVAL = 2.0
+
+    def __init__(self, path: Optional[str], size: Tuple[int, int],
+                 mode: str = "RGB", ext: str = "PNG") -> None:
+        self.path = path
+        self.size = size
+        self.mode = mode
+        self.ext = ext
+
+        self._image = None  # type: Optional[Image.Image]
+        self._dirty = False
+        self._last_flush = 0.0
+
+    def __getstate__(self):
+        # Tasks are pickled in a worker thread, so don't touch the image here;
+        # it is reloaded from the last flushed file after restoring
+        state = self.__dict__.copy()
+        state['_image'] = None
+        state['_dirty'] = False
+        return state
+
+    @property
+    def image(self) -> Image.Image:
+        """ Preview image, loaded from the file or created on first use """
+        if self._image is None:
+            if self.path and os.path.exists(self.path):
+                with Image.open(self.path) as img:
+                    self._image = img.convert(self.mode)
+            else:
+                self._image = Image.new(self.mode, self.size)
+        return self._image
+
+    def is_empty(self) -> bool:
+        """ Return True if there is no preview, neither in memory nor on disk
+        """
+        return self._image is None and \
+            not (self.path and os.path.exists(self.path))
+
+    def replace(self, img: Image.Image) -> None:
+        """ Use img as the new preview. The canvas takes ownership of img """
+        if img.mode != self.mode:
+            img = img.convert(self.mode)
+        self._image = img
+        self.changed()
+
+    def reset(self) -> None:
+        """ Replace the preview with an empty one without writing it """
+        self._image = Image.new(self.mode, self.size)
+        self._dirty = True
+
+    def changed(self) -> None:
+        self._dirty = True
+        if time.time() - self._last_flush >= self.FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Write pending changes to disk """
+        if not self._dirty or self._image is None or not self.path:
+            return
+        with handle_image_error(logger) as handler_result:
+            self._image.save(self.path, self.ext)
+        if handler_result.success:
+            self._dirty = False
+        self._last_flush = time.time()
@@ -199,6 +199,9 @@ class FrameRenderingTask(RenderingTask):
 
         self.num_tasks_received += 1
 
+        if self.finished_computation():
+            self.flush_previews()
+
         if self.num_tasks_received == self.total_tasks and not self.use_frames:
             self._put_image_together()
 
@@ -230,7 +233,7 @@ class FrameRenderingTask(RenderingTask):
         empty_color = (0, 0, 0)
         sub = self.subtasks_given[subtask_id]
         for frame in sub['frames']:
-            # __mark_sub_frame() also saves preview_file_path(num)
+            # __mark_sub_frame() also updates preview_file_path(num)
             self.__mark_sub_frame(sub, frame, empty_color)
 
     def _update_frame_preview(self, new_chunk_file_path, frame_num, part=1, final=False):
@@ -246,9 +249,10 @@ class FrameRenderingTask(RenderingTask):
                 with img.resize((int(round(self.scale_factor * img_x)),
                                  int(round(self.scale_factor * img_y))),
                                 resample=Image.BILINEAR) as img_resized:
-                    img_resized.save(self._get_preview_file_path(num),
-                                     PREVIEW_EXT)
-                    img_resized.save(preview_task_file_path, PREVIEW_EXT)
+                    for path in (self._get_preview_file_path(num),
+                                 preview_task_file_path):
+                        self._get_preview_canvas(path).replace(
+                            img_resized.copy())
 
             if not final:
                 with self._paste_new_chunk(
@@ -308,17 +312,17 @@ class FrameRenderingTask(RenderingTask):
             img_offset.close()
             img_offset = None
 
-        if not os.path.exists(preview_file_path):
+        canvas = self._get_preview_canvas(preview_file_path)
+        if canvas.is_empty():
             return img_offset
 
         try:
             if img_offset:
-                with Image.open(preview_file_path) as img:
-                    result = ImageChops.add(img, img_offset)
-                    img_offset.close()
-                    return result
+                result = ImageChops.add(canvas.image, img_offset)
+                img_offset.close()
+                return result
             else:
-                return Image.open(preview_file_path)
+                return canvas.image.copy()
         except Exception as err:
             logger.error("Can't add new chunk to preview{}".format(err))
             return img_offset
@@ -336,18 +340,6 @@ class FrameRenderingTask(RenderingTask):
                 for frame in sub['frames']:
                     self.__mark_sub_frame(sub, frame, failed_color)
 
-    def _open_frame_preview(self, preview_file_path):
-
-        if not os.path.exists(preview_file_path):
-            with handle_image_error(logger), \
-                    Image.new("RGB",
-                              (int(round(self.res_x * self.scale_factor)),
-                               int(round(self.res_y * self.scale_factor)))) \
-                    as img:
-                img.save(preview_file_path, PREVIEW_EXT)
-
-        return Image.open(preview_file_path)
-
     def _mark_task_area(self, subtask, img_task, color, frame_index=0):
         if not self.use_frames:
             RenderingTask._mark_task_area(self, subtask, img_task, color)
@@ -364,9 +356,7 @@ class FrameRenderingTask(RenderingTask):
             upper_y = int(math.ceil(part_height) * ((subtask['start_task'] - 1) % parts))
             lower_y = int(math.floor(part_height) * ((subtask['start_task'] - 1) % parts + 1))
 
-        for i in range(lower_x, upper_x):
-            for j in range(upper_y, lower_y):
-                img_task.putpixel((i, j), color)
+        img_task.paste(color, (lower_x, upper_y, upper_x, lower_y))
 
     def _choose_frames(self, frames, start_task, total_tasks):
         if total_tasks <= len(frames):
@@ -445,10 +435,10 @@ class FrameRenderingTask(RenderingTask):
 
     def __mark_sub_frame(self, sub, frame, color):
         idx = self.frames.index(frame)
-        preview_task_file_path = self._get_preview_task_file_path(idx)
-        with self._open_frame_preview(preview_task_file_path) as img_task:
-            self._mark_task_area(sub, img_task, color, idx)
-            img_task.save(preview_task_file_path, PREVIEW_EXT)
+        canvas = self._get_preview_canvas(
+            self._get_preview_task_file_path(idx))
+        self._mark_task_area(sub, canvas.image, color, idx)
+        canvas.changed()
 
     def _get_subtask_file_path(self, subtask_dir_list, name_dir, num):
         if subtask_dir_list[num] is None:
@@ -1,13 +1,14 @@
 import logging
 import math
 import os
-from typing import Type
+from typing import Dict, Type
 
 from PIL import Image, ImageChops
 from pathlib import Path
 
 from apps.core.task.coretask import CoreTask, CoreTaskBuilder
 from apps.rendering.resources.imgrepr import load_as_pil
+from apps.rendering.resources.preview import PreviewCanvas
 from apps.rendering.resources.utils import handle_image_error, handle_none
 from apps.rendering.task.renderingtaskstate import RendererDefaults
 from golem.verificator.rendering_verifier import RenderingVerifier
@@ -69,6 +70,8 @@ class RenderingTask(CoreTask):
 
         self.preview_file_path = None
         self.preview_task_file_path = None
+        # in-memory previews, keyed by their file paths
+        self.preview_canvases = {}  # type: Dict[str, PreviewCanvas]
 
         self.collected_file_names = {}
 
@@ -85,6 +88,12 @@ class RenderingTask(CoreTask):
 
         self.test_task_res_path = None
 
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        # tasks pickled before previews were kept in memory
+        if 'preview_canvases' not in state:
+            self.preview_canvases = {}
+
     @CoreTask.handle_key_error
     def computation_failed(self, subtask_id: str, ban_node: bool = True):
         super().computation_failed(subtask_id, ban_node)
@@ -122,22 +131,26 @@ class RenderingTask(CoreTask):
     def get_preview_file_path(self):
         return self.preview_file_path
 
+    def flush_previews(self):
+        """ Write pending preview changes to disk """
+        for canvas in list(self.preview_canvases.values()):
+            canvas.flush()
+
     @handle_image_error(logger)
     def _update_preview(self, new_chunk_file_path, num_start):
+        canvas = self._get_result_preview_canvas()
         with handle_none(load_as_pil(new_chunk_file_path),
-                         raise_if_none=IOError("load_as_pil failed")) as img, \
-                self._open_preview() as img_current, \
-                ImageChops.add(img_current, img) as img_added:
-            img_added.save(self.preview_file_path, PREVIEW_EXT)
+                         raise_if_none=IOError("load_as_pil failed")) as img:
+            canvas.replace(ImageChops.add(canvas.image, img))
 
     @CoreTask.handle_key_error
     def _remove_from_preview(self, subtask_id):
         subtask = self.subtasks_given[subtask_id]
         empty_color = (0, 0, 0)
-        with handle_image_error(logger), \
-                self._open_preview() as img:
-            self._mark_task_area(subtask, img, empty_color)
-            img.save(self.preview_file_path, PREVIEW_EXT)
+        with handle_image_error(logger):
+            canvas = self._get_result_preview_canvas()
+            self._mark_task_area(subtask, canvas.image, empty_color)
+            canvas.changed()
 
     def _update_task_preview(self):
         sent_color = (0, 255, 0)
@@ -147,8 +160,8 @@ class RenderingTask(CoreTask):
         preview_task_file_path = "{}".format(os.path.join(self.tmp_dir,
                                                           preview_name))
 
-        with handle_image_error(logger), \
-                self._open_preview() as img_task:
+        with handle_image_error(logger):
+            img_task = self._get_result_preview_canvas().image.copy()
 
             subtasks_given = dict(self.subtasks_given)
             for sub in subtasks_given.values():
@@ -158,7 +171,7 @@ class RenderingTask(CoreTask):
                                      SubtaskStatus.restarted]:
                     self._mark_task_area(sub, img_task, failed_color)
 
-            img_task.save(preview_task_file_path, PREVIEW_EXT)
+            self._get_preview_canvas(preview_task_file_path).replace(img_task)
 
         self._update_preview_task_file_path(preview_task_file_path)
 
@@ -166,8 +179,7 @@ class RenderingTask(CoreTask):
         self.preview_task_file_path = preview_task_file_path
 
     def _mark_task_area(self, subtask, img_task, color):
-        x = int(round(self.res_x * self.scale_factor))
-        y = int(round(self.res_y * self.scale_factor))
+        x, y = self._get_preview_size()
         upper = max(0,
                     int(math.floor(y / self.total_tasks
                                    * (subtask['start_task'] - 1))))
@@ -175,9 +187,7 @@ class RenderingTask(CoreTask):
             int(math.floor(y / self.total_tasks * (subtask['start_task']))),
             y,
         )
-        for i in range(0, x):
-            for j in range(upper, lower):
-                img_task.putpixel((i, j), color)
+        img_task.paste(color, (0, upper, x, lower))
 
     def _put_collected_files_together(self, output_file_name, files, arg):
         task_collector_path = self._get_task_collector_path()
@@ -220,9 +230,33 @@ class RenderingTask(CoreTask):
         else:
             return ''
 
+    def _get_preview_size(self):
+        return (int(round(self.res_x * self.scale_factor)),
+                int(round(self.res_y * self.scale_factor)))
+
+    def _get_preview_canvas(self, preview_file_path, mode="RGB",
+                            ext=PREVIEW_EXT) -> PreviewCanvas:
+        canvas = self.preview_canvases.get(preview_file_path)
+        if canvas is None:
+            canvas = PreviewCanvas(preview_file_path, self._get_preview_size(),
+                                   mode, ext)
+            self.preview_canvases[preview_file_path] = canvas
+        return canvas
+
+    def _get_result_preview_canvas(self) -> PreviewCanvas:
+        if self.preview_file_path is None:
+            preview_name = "current_preview.{}".format(PREVIEW_EXT)
+            self.preview_file_path = "{}".format(os.path.join(self.tmp_dir,
+                                                              preview_name))
+        return self._get_preview_canvas(self.preview_file_path)
+
     def _open_preview(self, mode="RGB", ext=PREVIEW_EXT):
         """ If preview file doesn't exist create a new empty one with given mode
          and extension. Extension should be compatible with selected mode. """
+        canvas = self.preview_canvases.get(self.preview_file_path)
+        if canvas is not None:
+            canvas.flush()
+
         if self.preview_file_path is None or not os.path.exists(
                 self.preview_file_path):
             preview_name = "current_preview.{}".format(ext)
@@ -230,10 +264,7 @@ class RenderingTask(CoreTask):
                                                               preview_name))
 
             with handle_image_error(logger), \
-                    Image.new(mode,
-                              (int(round(self.res_x * self.scale_factor)),
-                               int(round(self.res_y * self.scale_factor)))) \
-                    as img:
+                    Image.new(mode, self._get_preview_size()) as img:
                 logger.debug('Saving new preview: %r', self.preview_file_path)
                 img.save(self.preview_file_path, ext)
 
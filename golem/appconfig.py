@@ -37,6 +37,8 @@ USE_UPNP = 1
 ACCEPT_TASKS = 1
 SEND_PINGS = 1
 ENABLE_MONITOR = 1
+# Port of the local metrics endpoint, 0 to disable it
+METRICS_PORT = 0
 DEBUG_THIRD_PARTY = 0
 
 PINGS_INTERVALS = 120
@@ -58,6 +60,8 @@ TASKARCHIVE_FILENAME = "task_archive.pickle"
 TASKARCHIVE_NUM_INTERVALS = 365
 # Limit of the number  of non-expired tasks stored in task archive at any moment
 TASKARCHIVE_MAX_TASKS = 10000000
+# Filename for resource file hash cache
+FILE_HASH_CACHE_FILENAME = "file_hashes.pickle"
 
 P2P_SESSION_TIMEOUT = 240
 TASK_SESSION_TIMEOUT = 900
@@ -146,6 +150,7 @@ class AppConfig:
             send_pings=SEND_PINGS,
             enable_talkback=ENABLE_TALKBACK,
             enable_monitor=ENABLE_MONITOR,
+            metrics_port=METRICS_PORT,
             # hardware
             hardware_preset_name=CUSTOM_HARDWARE_PRESET_NAME,
             # price and trust
@@ -3,6 +3,7 @@
 import collections
 import enum
 import logging
+import os
 import sys
 import time
 import uuid
@@ -18,8 +19,10 @@ from twisted.internet.defer import (
     Deferred)
 
 from apps.appsmanager import AppsManager
+from apps.core.task.coretask import CoreTask
 import golem
-from golem.appconfig import TASKARCHIVE_MAINTENANCE_INTERVAL, AppConfig
+from golem.appconfig import TASKARCHIVE_MAINTENANCE_INTERVAL, AppConfig, \
+    FILE_HASH_CACHE_FILENAME
 from golem.clientconfigdescriptor import ConfigApprover, ClientConfigDescriptor
 from golem.core import variables
 from golem.core.common import (
@@ -35,6 +38,7 @@ from golem.config.active import EthereumConfig
 from golem.core.keysauth import KeysAuth
 from golem.core.service import LoopingCallService
 from golem.core.simpleserializer import DictSerializer
+from golem.core.statskeeper import STATS_FLUSH_INTERVAL, stats_cache
 from golem.database import Database
 from golem.diag.service import DiagnosticsService, DiagnosticsOutputFormat
 from golem.diag.vm import VMDiagnosticsProvider
@@ -44,6 +48,7 @@ from golem.ethereum import exceptions as eth_exceptions
 from golem.ethereum.fundslocker import FundsLocker
 from golem.ethereum.paymentskeeper import PaymentStatus
 from golem.ethereum.transactionsystem import TransactionSystem
+from golem.monitor import metrics
 from golem.monitor.model.nodemetadatamodel import NodeMetadataModel
 from golem.monitor.monitor import SystemMonitor
 from golem.monitorconfig import MONITOR_CONFIG
@@ -56,10 +61,12 @@ from golem.network.p2p.p2pservice import P2PService
 from golem.network.p2p.peersession import PeerSessionInfo
 from golem.network.transport.tcpnetwork import SocketAddress
 from golem.network.upnp.mapper import PortMapperManager
+from golem.ranking.manager import database_manager as ranking_db
 from golem.ranking.ranking import Ranking
 from golem.report import Component, Stage, StatusPublisher, report_calls
 from golem.resource.base.resourceserver import BaseResourceServer
 from golem.resource.dirmanager import DirManager, DirectoryType
+from golem.resource.hashcache import HASH_CACHE_SAVE_INTERVAL, hash_cache
 from golem.resource.hyperdrive.resourcesmanager import HyperdriveResourceManager
 from golem.rpc import utils as rpc_utils
 from golem.rpc.mapping.rpceventnames import Task, Network, Environment, UI
@@ -111,6 +118,7 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
         self.task_tester: Optional[TaskTester] = None
 
         self.task_archiver = TaskArchiver(datadir)
+        hash_cache.load(os.path.join(datadir, FILE_HASH_CACHE_FILENAME))
 
         # Read and validate configuration
         self.app_config = app_config
@@ -165,6 +173,9 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
                 int(self.config_desc.network_check_interval)),
             TaskArchiverService(self.task_archiver),
             MessageHistoryService(),
+            LocalRankService(),
+            StatsFlushService(),
+            HashCacheSaveService(),
             DoWorkService(self),
         ]
 
@@ -180,6 +191,12 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
                         1, int(clean_resources_older_than / 10)),
                     older_than_seconds=clean_resources_older_than))
 
+        if self.config_desc.metrics_port:
+            self._services.append(metrics.MetricsService(
+                self.config_desc.metrics_port,
+                collectors=NodeMetricsCollector(self).collectors(),
+            ))
+
         self.ranking = Ranking(self)
 
         self.transaction_system = transaction_system
@@ -331,6 +348,7 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
             self.concent_filetransfers.stop()
         if self.task_server:
             self.task_server.task_computer.quit()
+            self.task_server.task_manager.quit()
         if self.use_monitor and self.monitor:
             self.stop_monitor()
             self.monitor = None
@@ -1171,6 +1189,7 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
             'supported': bool(env.check_support()),
             'accepted': env.is_accepted(),
             'performance': env.get_performance(),
+            'all_cores_performance': env.get_all_cores_performance(),
             'min_accepted': env.get_min_accepted_performance(),
             'description': str(env.short_description)
         } for env_id, env in envs.items()]
@@ -1450,6 +1469,127 @@ class MonitoringPublisherService(LoopingCallService):
             stats=(self._task_server.task_manager.comp_task_keeper
                    .provider_stats_manager.keeper.global_stats),
         )
+        dispatcher.send(
+            signal='golem.monitor',
+            event='task_timeouts_snapshot',
+            stats=self._task_server.task_manager.get_timeouts_stats(),
+        )
+        history_service = MessageHistoryService.instance
+        if history_service is not None:
+            dispatcher.send(
+                signal='golem.monitor',
+                event='message_history_snapshot',
+                stats=history_service.get_stats(),
+            )
+
+
+class NodeMetricsCollector:
+    """ Reads gauges from node components on every metrics scrape """
+
+    def __init__(self, client: Client) -> None:
+        self._client = client
+
+    def collectors(self) -> List[metrics.Collector]:
+        return [
+            self._tasks,
+            self._peers,
+            self._verification,
+            self._message_history,
+            self._payments,
+        ]
+
+    def _tasks(self) -> Iterable[metrics.MetricFamily]:
+        task_server = self._client.task_server
+        if task_server is None:
+            return
+
+        tasks = metrics.gauge('golem_tasks', 'Requested tasks, by status')
+        subtasks = metrics.gauge('golem_subtasks',
+                                 'Subtasks of requested tasks, by status')
+        task_statuses = collections.Counter()
+        subtask_statuses = collections.Counter()
+        for task_state in list(task_server.task_manager.tasks_states.values()):
+            task_statuses[task_state.status.name] += 1
+            subtask_statuses.update(
+                subtask_state.subtask_status.name for subtask_state
+                in list(task_state.subtask_states.values()))
+        for status, count in task_statuses.items():
+            tasks.add(count, status=status)
+        for status, count in subtask_statuses.items():
+            subtasks.add(count, status=status)
+        yield tasks
+        yield subtasks
+
+        comp_task_keeper = task_server.task_manager.comp_task_keeper
+        yield metrics.gauge(
+            'golem_computed_tasks',
+            'Tasks this node computes subtasks of',
+            len(comp_task_keeper.active_tasks))
+        yield metrics.gauge(
+            'golem_computed_subtasks',
+            'Subtasks assigned to this node',
+            len(comp_task_keeper.subtask_to_task))
+
+        task_keeper = task_server.task_keeper
+        yield metrics.gauge(
+            'golem_task_headers',
+            'Headers of tasks known in the network',
+            len(task_keeper.task_headers))
+        yield metrics.gauge(
+            'golem_supported_tasks',
+            'Known tasks this node may compute',
+            len(task_keeper.supported_tasks))
+
+    def _peers(self) -> Iterable[metrics.MetricFamily]:
+        p2pservice = self._client.p2pservice
+        if p2pservice is None:
+            return
+        yield metrics.gauge('golem_peers', 'Peers, by connection state') \
+            .add(len(p2pservice.peers), state='connected') \
+            .add(len(p2pservice.incoming_peers), state='known') \
+            .add(len(p2pservice.free_peers), state='free')
+
+    @staticmethod
+    def _verification() -> Iterable[metrics.MetricFamily]:
+        stats = CoreTask.VERIFICATION_QUEUE.get_stats()
+        yield metrics.gauge(
+            'golem_verification_queue_depth',
+            'Verification jobs waiting to be run',
+            stats['queue_depth'])
+        yield metrics.gauge(
+            'golem_verification_jobs_running',
+            'Verification jobs being run',
+            stats['running'])
+
+    @staticmethod
+    def _message_history() -> Iterable[metrics.MetricFamily]:
+        history_service = MessageHistoryService.instance
+        if history_service is None:
+            return
+        stats = history_service.get_stats()
+        yield metrics.gauge(
+            'golem_message_history_queue_depth',
+            'Network messages waiting to be saved',
+            stats['queue_depth'])
+        yield metrics.gauge(
+            'golem_message_history_batch_size',
+            'Number of network messages saved in the last batch',
+            stats['batch_size'])
+        yield metrics.gauge(
+            'golem_message_history_commit_seconds',
+            'Commit time of the last batch of network messages',
+            stats['commit_time'])
+
+    def _payments(self) -> Iterable[metrics.MetricFamily]:
+        count, value = self._client.transaction_system.get_awaiting_payments()
+        yield metrics.gauge(
+            'golem_awaiting_payments',
+            'Payments waiting to be sent out',
+            count)
+        yield metrics.gauge(
+            'golem_awaiting_payments_value',
+            'Total value of payments waiting to be sent out, in GNT wei',
+            value)
 
 
 class NetworkConnectionPublisherService(LoopingCallService):
@@ -1482,6 +1622,49 @@ class TaskArchiverService(LoopingCallService):
         self._task_archiver.do_maintenance()
 
 
+class LocalRankService(LoopingCallService):
+    """ Writes cached trust counter increments to the database """
+
+    def __init__(self) -> None:
+        super().__init__(
+            interval_seconds=ranking_db.LOCAL_RANK_FLUSH_INTERVAL)
+
+    def stop(self):
+        super().stop()
+        ranking_db.local_rank_cache.flush()
+
+    def _run(self):
+        ranking_db.local_rank_cache.flush()
+
+
+class StatsFlushService(LoopingCallService):
+    """ Writes changed node stats to the database """
+
+    def __init__(self) -> None:
+        super().__init__(interval_seconds=STATS_FLUSH_INTERVAL)
+
+    def stop(self):
+        super().stop()
+        stats_cache.flush()
+
+    def _run(self):
+        stats_cache.flush()
+
+
+class HashCacheSaveService(LoopingCallService):
+    """ Writes the file hash cache to its dump file, if it has changed """
+
+    def __init__(self) -> None:
+        super().__init__(interval_seconds=HASH_CACHE_SAVE_INTERVAL)
+
+    def stop(self):
+        super().stop()
+        hash_cache.save()
+
+    def _run(self):
+        hash_cache.save()
+
+
 class ResourceCleanerService(LoopingCallService):
     _client = None  # type: Client
     older_than_seconds = 0  # type: int
@@ -25,6 +25,7 @@ class ClientConfigDescriptor(object):
         self.use_upnp = 0
         self.enable_talkback = 0
         self.enable_monitor = 0
+        self.metrics_port = 0
 
         self.seed_host = None
         self.seed_port = 0
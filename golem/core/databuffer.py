@@ -4,10 +4,22 @@ from .variables import LONG_STANDARD_SIZE
 
 
 class DataBuffer:
-    """ Data buffer that helps with network communication. """
+    """ Data buffer that helps with network communication.
+
+    Data is kept in a single bytearray with a read offset. Appends are
+    amortized O(1) and reads only move the offset; consumed bytes are
+    discarded lazily, once they make up at least half of the buffer.
+    """
+
     def __init__(self):
         """ Create new data buffer """
-        self.buffered_data = b""
+        self._buffer = bytearray()
+        self._offset = 0
+
+    @property
+    def buffered_data(self) -> bytes:
+        """ Copy of the unread data """
+        return bytes(self._buffer[self._offset:])
 
     def append_ulong(self, num):
         """
@@ -18,31 +30,37 @@ class DataBuffer:
         if num < 0:
             raise AttributeError("num must be grater than 0")
         bytes_num_rep = struct.pack("!L", num)
-        self.buffered_data += bytes_num_rep
+        self.append_bytes(bytes_num_rep)
         return bytes_num_rep
 
     def append_bytes(self, data):
         """ Append given bytes to data buffer
         :param bytes data: bytes to append
         """
-        self.buffered_data += data
+        self._compact()
+        try:
+            self._buffer += data
+        except BufferError:
+            # A memoryview returned by get_len_prefixed_views() is still
+            # alive; leave the old buffer to it and continue with a copy
+            self._buffer = self._buffer[self._offset:] + data
+            self._offset = 0
 
     def data_size(self):
         """ Return size of data in buffer
         :return int: size of data in buffer
         """
-        return len(self.buffered_data)
+        return len(self._buffer) - self._offset
 
     def peek_ulong(self):
         """
         Check long number that is located at the beginning of this data buffer
         :return (long|None): number at the beginning of the buffer if it's there
         """
-        if len(self.buffered_data) < LONG_STANDARD_SIZE:
+        if self.data_size() < LONG_STANDARD_SIZE:
             return None
 
-        (ret_val,) = \
-            struct.unpack("!L", self.buffered_data[0:LONG_STANDARD_SIZE])
+        (ret_val,) = struct.unpack_from("!L", self._buffer, self._offset)
         return ret_val
 
     def read_ulong(self):
@@ -54,7 +72,7 @@ class DataBuffer:
         if val_ is None:
             raise ValueError(
                 "buffer_data is shorter than {}".format(LONG_STANDARD_SIZE))
-        self.buffered_data = self.buffered_data[LONG_STANDARD_SIZE:]
+        self._offset += LONG_STANDARD_SIZE
 
         return val_
 
@@ -64,11 +82,10 @@ class DataBuffer:
         :param long num_bytes: how many bytes should be read from buffer
         :return bytes: first <num_bytes> bytes from buffer
         """
-        if num_bytes > len(self.buffered_data):
+        if num_bytes > self.data_size():
             raise AttributeError("num_bytes is grater than buffer length")
 
-        ret_bytes = self.buffered_data[:num_bytes]
-        return ret_bytes
+        return bytes(self._buffer[self._offset:self._offset + num_bytes])
 
     def read_bytes(self, num_bytes):
         """
@@ -78,7 +95,7 @@ class DataBuffer:
         :return bytes: bytes removed form buffer
         """
         val_ = self.peek_bytes(num_bytes)
-        self.buffered_data = self.buffered_data[num_bytes:]
+        self._offset += num_bytes
 
         return val_
 
@@ -88,7 +105,7 @@ class DataBuffer:
         :return bytes: all data that was in the buffer.
         """
         ret_data = self.buffered_data
-        self.buffered_data = b""
+        self.clear_buffer()
 
         return ret_data
 
@@ -100,8 +117,7 @@ class DataBuffer:
         """
         ret_bytes = None
 
-        if (self.data_size() > LONG_STANDARD_SIZE and
-                self.data_size() >= (self.peek_ulong() + LONG_STANDARD_SIZE)):
+        if self._has_len_prefixed_frame():
             num_bytes = self.read_ulong()
             ret_bytes = self.read_bytes(num_bytes)
 
@@ -112,10 +128,22 @@ class DataBuffer:
         Generator function that return from buffer datas preceded with
         their length (long)
         """
-        while (self.data_size() > LONG_STANDARD_SIZE and
-               self.data_size() >= (self.peek_ulong() + LONG_STANDARD_SIZE)):
+        for view in self.get_len_prefixed_views():
+            yield view.tobytes()
+
+    def get_len_prefixed_views(self):
+        """
+        Generator function that return from buffer datas preceded with
+        their length (long) as memoryviews, without copying them. A view
+        should not be kept after the buffer has been modified.
+        """
+        while self._has_len_prefixed_frame():
             num_bytes = self.read_ulong()
-            yield self.read_bytes(num_bytes)
+            start = self._offset
+            self._offset += num_bytes
+            with memoryview(self._buffer) as view:
+                yield view[start:start + num_bytes]
+        self._compact()
 
     def append_len_prefixed_bytes(self, data):
         """
@@ -127,4 +155,20 @@ class DataBuffer:
 
     def clear_buffer(self):
         """ Remove all data from the buffer """
-        self.buffered_data = b""
+        self._buffer = bytearray()
+        self._offset = 0
+
+    def _has_len_prefixed_frame(self):
+        data_size = self.data_size()
+        return (data_size > LONG_STANDARD_SIZE and
+                data_size >= self.peek_ulong() + LONG_STANDARD_SIZE)
+
+    def _compact(self):
+        """ Drop already read bytes if they take at least half the buffer """
+        if not self._offset or self._offset * 2 < len(self._buffer):
+            return
+        try:
+            del self._buffer[:self._offset]
+        except BufferError:
+            self._buffer = self._buffer[self._offset:]
+        self._offset = 0
@@ -1,9 +1,13 @@
 import abc
+import hmac
+import io
+import os
 from hashlib import sha256
 from Crypto.Cipher import AES
 from Crypto import Random
 from Crypto.Random.random import StrongRandom
 from threading import Lock
+from typing import Optional
 
 from io import IOBase
 
@@ -131,3 +135,253 @@ class AESFileEncryptor(FileEncryptor):
                     working = False
 
                 dst.write(chunk)
+
+
+class DecryptionError(Exception):
+    pass
+
+
+class AESCTRFileEncryptor(AESFileEncryptor):
+    """
+    Encrypts files with AES in CTR mode, authenticated with HMAC-SHA256
+    (encrypt-then-MAC). Unlike AESFileEncryptor, data can be encrypted while
+    it is being written and decrypted from any offset, so packages can be
+    created and read without intermediate plaintext files.
+
+    File format: header (magic, version, salt), ciphertext, MAC of both.
+    """
+
+    aes_mode = AES.MODE_CTR
+    magic = b'golem-aes'
+    version = 1
+    header_len = len(magic) + 1 + AESFileEncryptor.block_size
+    nonce_len = 8
+    mac_len = sha256().digest_size
+    # Size of file buffers
+    buffer_size = 4 * 1024 * 1024
+    # Size of data passed to the cipher at once; small chunks stay in CPU cache
+    cipher_chunk_size = 64 * 1024
+
+    @classmethod
+    def is_encrypted(cls, path) -> bool:
+        """ Returns whether the file has been encrypted by this class,
+        otherwise it may have been encrypted by AESFileEncryptor """
+        with open(path, 'rb') as src:
+            return cls.is_header(src.read(cls.header_len))
+
+    @classmethod
+    def is_header(cls, header) -> bool:
+        return len(header) == cls.header_len and \
+            header.startswith(cls.magic + bytes([cls.version]))
+
+    @classmethod
+    def get_keys(cls, secret, salt, key_len=32):
+        """ Returns encryption key, MAC key and CTR nonce """
+        keys, nonce = cls.get_key_and_iv(secret, salt, 2 * key_len,
+                                         cls.nonce_len)
+        return keys[:key_len], keys[key_len:], nonce
+
+    @classmethod
+    def writer(cls, file_out, secret, buffer_size=None):
+        buffer_size = buffer_size or cls.buffer_size
+        return EncryptingWriter(open(file_out, 'wb', buffering=buffer_size),
+                                secret)
+
+    @classmethod
+    def reader(cls, file_in, secret, buffer_size=None):
+        """ Returns a seekable, buffered stream of decrypted data. The MAC is
+        verified before the stream is returned.
+        :raises DecryptionError: on MAC mismatch or unknown file format
+        """
+        buffer_size = buffer_size or cls.buffer_size
+        raw = DecryptingReader(open(file_in, 'rb', buffering=buffer_size),
+                               secret, buffer_size)
+        return io.BufferedReader(raw, buffer_size)
+
+    @classmethod
+    def encrypt(cls, file_in, file_out, secret, key_len=32):
+        with FileHelper(file_in, 'rb') as src, \
+                cls.writer(file_out, secret) as dst:
+            for chunk in iter(lambda: src.read(cls.buffer_size), b''):
+                dst.write(chunk)
+
+    @classmethod
+    def decrypt(cls, file_in, file_out, secret, key_len=32):
+        with cls.reader(file_in, secret) as src, \
+                FileHelper(file_out, 'wb') as dst:
+            for chunk in iter(lambda: src.read(cls.buffer_size), b''):
+                dst.write(chunk)
+
+
+class EncryptingWriter(io.RawIOBase):
+    """ Write-only, non-seekable stream encrypting data to a file with
+    AESCTRFileEncryptor. Writes are gathered into cipher_chunk_size chunks.
+    """
+
+    def __init__(self, dst, secret) -> None:
+        super().__init__()
+        encryptor = AESCTRFileEncryptor
+
+        salt = Random.new().read(encryptor.block_size)
+        key, mac_key, nonce = encryptor.get_keys(secret, salt)
+        header = encryptor.magic + bytes([encryptor.version]) + salt
+
+        self._dst = dst
+        self._cipher = AES.new(key, encryptor.aes_mode, nonce=nonce)
+        self._mac = hmac.new(mac_key, header, sha256)
+        self._buffer = bytearray()
+        self._position = 0
+
+        self._dst.write(header)
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def write(self, b):
+        self._buffer += b
+        self._position += len(b)
+        if len(self._buffer) >= AESCTRFileEncryptor.cipher_chunk_size:
+            self._write_buffer()
+        return len(b)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.abort()
+        return super().__exit__(exc_type, exc_val, exc_tb)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._write_buffer()
+            self._dst.write(self._mac.digest())
+        finally:
+            self._dst.close()
+            super().close()
+
+    def abort(self):
+        """ Closes the file without writing the MAC, so that incomplete data
+        never passes verification """
+        if self.closed:
+            return
+        self._buffer.clear()
+        try:
+            self._dst.close()
+        finally:
+            super().close()
+
+    def _write_buffer(self):
+        if self._buffer:
+            encrypted = self._cipher.encrypt(bytes(self._buffer))
+            self._mac.update(encrypted)
+            self._dst.write(encrypted)
+            self._buffer.clear()
+
+
+class DecryptingReader(io.RawIOBase):
+    """ Seekable stream of data decrypted from a file encrypted with
+    AESCTRFileEncryptor """
+
+    def __init__(self, src, secret, buffer_size) -> None:
+        super().__init__()
+        encryptor = AESCTRFileEncryptor
+        self._src = src
+
+        try:
+            header = src.read(encryptor.header_len)
+            if not AESCTRFileEncryptor.is_header(header):
+                raise DecryptionError("Unknown file format")
+
+            salt = header[-encryptor.block_size:]
+            self._key, mac_key, self._nonce = encryptor.get_keys(secret, salt)
+            self._size = os.fstat(src.fileno()).st_size \
+                - encryptor.header_len - encryptor.mac_len
+            self._verify(header, mac_key, buffer_size)
+        except BaseException:
+            src.close()
+            raise
+
+        self._position = 0
+        self._cipher = None
+        self._cipher_position = None  # type: Optional[int]
+
+    def _verify(self, header, mac_key, buffer_size):
+        encryptor = AESCTRFileEncryptor
+        if self._size < 0:
+            raise DecryptionError("File is too short")
+
+        mac = hmac.new(mac_key, header, sha256)
+        remaining = self._size
+        while remaining:
+            chunk = self._src.read(min(remaining, buffer_size))
+            if not chunk:
+                raise DecryptionError("File is too short")
+            mac.update(chunk)
+            remaining -= len(chunk)
+
+        if not hmac.compare_digest(mac.digest(),
+                                   self._src.read(encryptor.mac_len)):
+            raise DecryptionError("MAC check failed")
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError("Invalid whence: {}".format(whence))
+        if position < 0:
+            raise ValueError("Negative seek position {}".format(position))
+        self._position = position
+        return position
+
+    def readinto(self, b):
+        size = min(len(b), self._size - self._position)
+        if size <= 0:
+            return 0
+
+        if self._cipher_position != self._position:
+            self._seek_cipher()
+            self._src.seek(AESCTRFileEncryptor.header_len + self._position)
+
+        view = memoryview(b)
+        chunk_size = AESCTRFileEncryptor.cipher_chunk_size
+        read = 0
+
+        while read < size:
+            chunk = self._src.read(min(size - read, chunk_size))
+            if not chunk:
+                break
+            view[read:read + len(chunk)] = self._cipher.decrypt(chunk)
+            read += len(chunk)
+
+        self._position += read
+        self._cipher_position = self._position
+        return read
+
+    def close(self):
+        if not self.closed:
+            self._src.close()
+        super().close()
+
+    def _seek_cipher(self):
+        encryptor = AESCTRFileEncryptor
+        block, skip = divmod(self._position, encryptor.block_size)
+        self._cipher = AES.new(self._key, encryptor.aes_mode,
+                               nonce=self._nonce, initial_value=block)
+        if skip:
+            self._cipher.decrypt(bytes(skip))
@@ -14,6 +14,11 @@ class AsyncHTTPRequest:
 
     agent = None
     timeout = 5
+    # Connections are kept open and reused across requests
+    max_persistent_per_host = 8
+    # Should be lower than the server's keep-alive timeout, so that idle
+    # connections are closed by us before the server drops them
+    cached_connection_timeout = 4
 
     @implementer(IBodyProducer)
     class BytesBodyProducer:
@@ -45,8 +50,13 @@ class AsyncHTTPRequest:
     @classmethod
     def create_agent(cls):
         from twisted.internet import reactor
-        from twisted.web.client import Agent  # imports reactor
-        return Agent(reactor, connectTimeout=cls.timeout)
+        from twisted.web.client import Agent, \
+            HTTPConnectionPool  # imports reactor
+
+        pool = HTTPConnectionPool(reactor, persistent=True)
+        pool.maxPersistentPerHost = cls.max_persistent_per_host
+        pool.cachedConnectionTimeout = cls.cached_connection_timeout
+        return Agent(reactor, connectTimeout=cls.timeout, pool=pool)
 
 
 class AsyncRequest(object):
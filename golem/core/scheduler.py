@@ -0,0 +1,95 @@
+import logging
+import time
+from typing import Callable, Dict, Hashable, Tuple
+
+from twisted.internet.interfaces import IDelayedCall
+from twisted.python import threadable
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineScheduler:
+    """ Calls back with a key when the deadline registered for it passes.
+
+    Every key has at most one pending reactor timer; scheduling a key again
+    moves its timer. Callbacks are run in the reactor thread. Scheduling and
+    cancelling are safe to call from other threads.
+    """
+
+    def __init__(self, callback: Callable[[Hashable], None],
+                 reactor=None) -> None:
+        """
+        :param callback: called with the key when its deadline passes
+        :param reactor: reactor to schedule the calls in, the global one by
+         default
+        """
+        self._callback = callback
+        self._reactor = reactor
+        self._calls = {}  # type: Dict[Hashable, Tuple[float, IDelayedCall]]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    @property
+    def reactor(self):
+        if self._reactor is None:
+            from twisted.internet import reactor
+            self._reactor = reactor
+        return self._reactor
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """ Call back for key at deadline (a timestamp); replaces the previous
+        deadline of the key """
+        self._in_reactor(self._schedule, key, deadline, False)
+
+    def schedule_earlier(self, key: Hashable, deadline: float) -> None:
+        """ Like schedule(), unless the key is already due before deadline """
+        self._in_reactor(self._schedule, key, deadline, True)
+
+    def cancel(self, key: Hashable) -> None:
+        self._in_reactor(self._cancel, key)
+
+    def cancel_all(self) -> None:
+        self._in_reactor(self._cancel_all)
+
+    def _in_reactor(self, fn, *args) -> None:
+        reactor = self.reactor
+        if getattr(reactor, 'running', False) \
+                and not threadable.isInIOThread():
+            reactor.callFromThread(fn, *args)
+        else:
+            fn(*args)
+
+    def _schedule(self, key: Hashable, deadline: float,
+                  earlier_only: bool) -> None:
+        delay = max(0.0, deadline - time.time())
+        scheduled = self._calls.get(key)
+
+        if scheduled is None:
+            call = self.reactor.callLater(delay, self._fire, key)
+        else:
+            current_deadline, call = scheduled
+            if earlier_only and current_deadline <= deadline:
+                return
+            call.reset(delay)
+
+        self._calls[key] = deadline, call
+
+    def _cancel(self, key: Hashable) -> None:
+        scheduled = self._calls.pop(key, None)
+        if scheduled:
+            scheduled[1].cancel()
+
+    def _cancel_all(self) -> None:
+        for key in list(self._calls):
+            self._cancel(key)
+
+    def _fire(self, key: Hashable) -> None:
+        self._calls.pop(key, None)
+        try:
+            self._callback(key)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Deadline callback failed. key=%r", key)
@@ -1,20 +1,98 @@
 import functools
 import logging
-from threading import Lock
-from typing import Type, Any, Optional
+from threading import Lock, RLock
+from typing import Any, Callable, Dict, Set, Type
 
 from peewee import DatabaseError
 
 from golem.core.common import HandleAttributeError, HandleError
-from golem.model import Stats
+from golem.model import Stats, db
 
 logger = logging.getLogger(__name__)
 
+# How often changed stats are written to the database (in seconds)
+STATS_FLUSH_INTERVAL = 30
+
 
 def log_error(*args, **_kwargs):
     logger.warning("Unknown stats %r", args[1])
 
 
+class StatsCache:
+    """ Write-behind cache of Stats rows.
+
+    Global stat values are loaded from the database once and then kept in
+    memory, shared by all keepers. Changed values are written by flush(),
+    in a single transaction.
+    """
+
+    def __init__(self) -> None:
+        self._values = {}  # type: Dict[str, Any]
+        self._changed = set()  # type: Set[str]
+        self._lock = RLock()
+
+    def get(self, name: str, default: str, cast: Callable) -> Any:
+        with self._lock:
+            return self._get(name, default, cast)
+
+    def increase(self, name: str, default: str, cast: Callable,
+                 increment: Any) -> Any:
+        with self._lock:
+            value = cast(self._get(name, default, cast) + increment)
+            self._set(name, value)
+            return value
+
+    def set(self, name: str, value: Any) -> None:
+        with self._lock:
+            self._set(name, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._changed.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._changed:
+                return
+            changed = {name: self._values[name] for name in self._changed}
+
+            try:
+                with db.transaction():
+                    for name, value in changed.items():
+                        updated = Stats.update(value=f"{value}") \
+                            .where(Stats.name == name) \
+                            .execute()
+                        if not updated:
+                            Stats.create(name=name, value=f"{value}")
+            except DatabaseError as err:
+                logger.error("Exception occurred while writing stats %r: "
+                             "%r", list(changed), err)
+                return
+
+            self._changed.clear()
+            logger.debug('Flushed %d stats', len(changed))
+
+    def _get(self, name: str, default: str, cast: Callable) -> Any:
+        if name not in self._values:
+            self._values[name] = cast(self._load(name, default))
+        return self._values[name]
+
+    def _set(self, name: str, value: Any) -> None:
+        self._values[name] = value
+        self._changed.add(name)
+
+    @staticmethod
+    def _load(name: str, default: str) -> str:
+        stat = Stats.select(Stats.value) \
+            .where(Stats.name == name) \
+            .first()
+        return default if stat is None else stat.value
+
+
+stats_cache = StatsCache()
+
+
 class StatsKeeper:
 
     handle_attribute_error = HandleAttributeError(log_error)
@@ -26,40 +104,38 @@ class StatsKeeper:
         self.default_value = default_value
 
         for stat in vars(self.global_stats):
-            val = self._get_or_create(stat)
-            if val is not None:
+            try:
+                val = stats_cache.get(
+                    stat, self.default_value,
+                    functools.partial(self._cast_type, name=stat))
+            except (AttributeError, ValueError, TypeError):
+                logger.warning("Wrong stat '%s' format:", stat, exc_info=True)
+            except DatabaseError:
+                logger.warning("Cannot retrieve '%s' from the database:",
+                               stat, exc_info=True)
+            else:
                 setattr(self.global_stats, stat, val)
 
-    @HandleError(error=(TypeError, AttributeError), handle_error=log_error)
+    @HandleError(error=(TypeError, AttributeError, ValueError, DatabaseError),
+                 handle_error=log_error)
     def increase_stat(self, name: str, increment: Any = 1) -> None:
         with self._lock:
             session_val = getattr(self.session_stats, name)
             session_val = self._cast_type(session_val + increment, name)
             setattr(self.session_stats, name, session_val)
 
-            global_val = self._get_or_create(name)
-            global_val = self._cast_type(global_val + increment, name)
+            global_val = stats_cache.increase(
+                name, self.default_value,
+                functools.partial(self._cast_type, name=name), increment)
             setattr(self.global_stats, name, global_val)
 
-            self._update_stat(name, global_val)
-
     @handle_attribute_error
     def set_stat(self, name: str, value: Any) -> None:
         with self._lock:
             setattr(self.session_stats, name, value)
             setattr(self.global_stats, name, value)
 
-            self._update_stat(name, value)
-
-    @staticmethod
-    def _update_stat(name: str, value: Any) -> None:
-        try:
-            Stats.update(value=f"{value}") \
-                .where(Stats.name == name) \
-                .execute()
-        except DatabaseError as err:
-            logger.error("Exception occurred while updating stat %r: "
-                         "%r", name, err)
+            stats_cache.set(name, value)
 
     def get_stats(self, name):
         return self._get_stats(name) or (None, None)
@@ -71,18 +147,6 @@ class StatsKeeper:
             getattr(self.global_stats, name),
         )
 
-    def _get_or_create(self, name: str) -> Optional[Stats]:
-        try:
-            defaults = {'value': self.default_value}
-            stat, _ = Stats.get_or_create(name=name, defaults=defaults)
-            return self._cast_type(stat.value, name)
-        except (AttributeError, ValueError, TypeError):
-            logger.warning("Wrong stat '%s' format:", name, exc_info=True)
-        except DatabaseError:
-            logger.warning("Cannot retrieve '%s' from the database:", name,
-                           exc_info=True)
-        return None
-
     def _cast_type(self, value: Any, name: str) -> Any:
         return self._get_type(name)(value)
 
@@ -62,6 +62,8 @@ CONCENT_PULL_INTERVAL = (MAX_CONCENT_PING_INTERVAL / 2).total_seconds()
 
 # Number of task headers transmitted per message
 TASK_HEADERS_LIMIT = 20
+# Time after which a task header is sent again to a peer that has it (seconds)
+TASK_HEADERS_RESEND_INTERVAL = 300
 KEY_DIFFICULTY = 14
 
 # Maximum acceptable difference between node time and monitor time (seconds)
@@ -78,7 +80,7 @@ class PROTOCOL_CONST(object):
     https://docs.python.org/3/faq/programming.html#how-do-i-share-global-variables-across-modules # noqa
     https://bytes.com/topic/python/answers/19859-accessing-updating-global-variables-among-several-modules # noqa
     """
-    NUM: ClassVar[int] = 31
+    NUM: ClassVar[int] = 32
     POSTFIX: ClassVar[str] = ''
     ID: ClassVar[str] = str(NUM) + POSTFIX
 
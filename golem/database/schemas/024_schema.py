@@ -0,0 +1,18 @@
+# pylint: disable=no-member
+# pylint: disable=unused-argument
+SCHEMA_VERSION = 24
+
+
+def migrate(migrator, database, fake=False, **kwargs):
+    migrator.add_index(
+        'income',
+        'payer_address', 'accepted_ts', 'transaction', 'settled_ts',
+        unique=False,
+    )
+
+
+def rollback(migrator, database, fake=False, **kwargs):
+    migrator.drop_index(
+        'income',
+        'payer_address', 'accepted_ts', 'transaction', 'settled_ts',
+    )
@@ -0,0 +1,14 @@
+# pylint: disable=no-member
+import peewee as pw
+
+SCHEMA_VERSION = 25
+
+
+def migrate(migrator, *_, **__):
+    migrator.add_fields(
+        'performance',
+        all_cores_value=pw.FloatField(null=True))
+
+
+def rollback(migrator, *_, **__):
+    migrator.remove_fields('performance', 'all_cores_value')
@@ -2,8 +2,10 @@ import enum
 import logging
 
 from os import path
+from typing import Optional
 
-from apps.rendering.benchmark.minilight.src.minilight import make_perf_test
+from apps.rendering.benchmark.minilight.src.minilight import \
+    make_calibrated_perf_test
 
 from golem.core.common import get_golem_path
 from golem.environments.minperformancemultiplier import MinPerformanceMultiplier
@@ -88,11 +90,8 @@ class Environment():
         0.0 if performance is unknown
         :return float:
         """
-        try:
-            perf = Performance.get(Performance.environment_id == cls.get_id())
-        except Performance.DoesNotExist:
-            return 0.0
-        return perf.value
+        perf = Performance.get_cached(cls.get_id())
+        return perf.value if perf is not None else 0.0
 
     @classmethod
     def get_min_accepted_performance(cls) -> float:
@@ -100,22 +99,35 @@ class Environment():
         :return float:
         """
         step: float = 300
-        try:
-            perf = Performance.get(Performance.environment_id == cls.get_id())
+        perf = Performance.get_cached(cls.get_id())
+        if perf is not None:
             step = perf.min_accepted_step
-        except Performance.DoesNotExist:
-            pass
 
         return step * MinPerformanceMultiplier.get()
 
+    @classmethod
+    def get_all_cores_performance(cls) -> Optional[float]:
+        """ Return performance index of all cores together, if measured
+        :return float:
+        """
+        perf = Performance.get_cached(cls.get_id())
+        return perf.all_cores_value if perf is not None else None
+
     @classmethod
     def run_default_benchmark(cls, save=False):
+        """ Run the benchmark on all cores and return the single core result.
+        The single core result is the environment performance, so that saved
+        values stay comparable between machines with a different number of
+        cores; the all cores result is saved next to it.
+        """
         logger = logging.getLogger('golem.task.benchmarkmanager')
         logger.info('Running benchmark for %s', cls.get_id())
         test_file = path.join(get_golem_path(), 'apps', 'rendering',
                               'benchmark', 'minilight', 'cornellbox.ml.txt')
-        performance = make_perf_test(test_file)
-        logger.info('%s performance is %.2f', cls.get_id(), performance)
+        performance, all_cores = make_calibrated_perf_test(test_file)
+        logger.info('%s performance is %.2f, all cores performance is %.2f',
+                    cls.get_id(), performance, all_cores)
         if save:
-            Performance.update_or_create(cls.get_id(), performance)
+            Performance.update_or_create(cls.get_id(), performance,
+                                         all_cores_value=all_cores)
         return performance
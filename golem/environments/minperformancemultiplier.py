@@ -1,3 +1,6 @@
+import threading
+from typing import Optional
+
 from golem import model
 from golem.model import GenericKeyValue
 from golem.rpc import utils as rpc_utils
@@ -9,15 +12,22 @@ class MinPerformanceMultiplier:
     MAX = 100
     DEFAULT = MIN
 
+    _value = None  # type: Optional[float]
+    _lock = threading.Lock()
+
     @rpc_utils.expose('performance.multiplier')
     @classmethod
     def get(cls) -> float:
         """ Returns performance multiplier. Default is 0.
         :return float:
         """
-        rows = GenericKeyValue.select(GenericKeyValue.value).where(
-            GenericKeyValue.key == cls.DB_KEY)
-        return float(rows.get().value) if rows.count() == 1 else cls.DEFAULT
+        with cls._lock:
+            if cls._value is None:
+                rows = GenericKeyValue.select(GenericKeyValue.value).where(
+                    GenericKeyValue.key == cls.DB_KEY)
+                cls._value = float(rows.get().value) if rows.count() == 1 \
+                    else cls.DEFAULT
+            return cls._value
 
     @rpc_utils.expose('performance.multiplier.update')
     @classmethod
@@ -31,3 +41,10 @@ class MinPerformanceMultiplier:
             entry, _ = GenericKeyValue.get_or_create(key=cls.DB_KEY)
             entry.value = str(value)
             entry.save()
+        cls.invalidate()
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """ Drops the cached multiplier """
+        with cls._lock:
+            cls._value = None
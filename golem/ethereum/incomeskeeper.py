@@ -1,16 +1,21 @@
 # -*- coding: utf-8 -*-
+from collections import defaultdict
 from datetime import datetime, timedelta
 import logging
 import time
+from typing import Dict, List
 
 from ethereum.utils import denoms
 from pydispatch import dispatcher
 
 from golem.core.variables import PAYMENT_DEADLINE
-from golem.model import Income
+from golem.model import db, Income
 
 logger = logging.getLogger(__name__)
 
+# SQLite limits the number of variables in a single statement
+UPDATE_CHUNK_SIZE = 500
+
 
 class IncomesKeeper:
     """Keeps information about payments received from other nodes
@@ -22,33 +27,65 @@ class IncomesKeeper:
             sender: str,
             amount: int,
             closure_time: int) -> None:
-        expected = Income.select().where(
-            Income.payer_address == sender,
-            Income.accepted_ts > 0,
-            Income.accepted_ts <= closure_time,
-            Income.transaction.is_null(),
-            Income.settled_ts.is_null())
-
-        expected_value = sum([e.value_expected for e in expected])
-        if expected_value == 0:
-            # Probably already handled event
-            return
-
-        if expected_value != amount:
-            logger.warning(
-                'Batch transfer amount does not match, expected %r, got %r',
-                expected_value / denoms.ether,
-                amount / denoms.ether)
-
-        amount_left = amount
+        transaction = tx_hash[2:]
+
+        with db.atomic():
+            expected = list(Income.select(
+                Income.sender_node,
+                Income.subtask,
+                Income.value,
+                Income.value_received,
+            ).where(
+                Income.payer_address == sender,
+                Income.accepted_ts > 0,
+                Income.accepted_ts <= closure_time,
+                Income.transaction.is_null(),
+                Income.settled_ts.is_null()))
+
+            expected_value = sum([e.value_expected for e in expected])
+            if expected_value == 0:
+                # Probably already handled event
+                return
+
+            if expected_value != amount:
+                logger.warning(
+                    'Batch transfer amount does not match, expected %r, '
+                    'got %r',
+                    expected_value / denoms.ether,
+                    amount / denoms.ether)
+
+            amount_left = amount
+            # Subtasks of incomes received in full, by sender node
+            received_in_full: Dict[str, List[str]] = defaultdict(list)
+
+            for e in expected:
+                received = min(amount_left, e.value_expected)
+                e.value_received += received
+                amount_left -= received
+                e.transaction = transaction
+
+                if e.value_expected == 0:
+                    received_in_full[e.sender_node].append(e.subtask)
+                else:
+                    Income.update(
+                        value_received=e.value_received,
+                        transaction=transaction,
+                    ).where(
+                        Income.sender_node == e.sender_node,
+                        Income.subtask == e.subtask,
+                    ).execute()
+
+            for sender_node, subtasks in received_in_full.items():
+                for i in range(0, len(subtasks), UPDATE_CHUNK_SIZE):
+                    Income.update(
+                        value_received=Income.value,
+                        transaction=transaction,
+                    ).where(
+                        Income.sender_node == sender_node,
+                        Income.subtask.in_(subtasks[i:i + UPDATE_CHUNK_SIZE]),
+                    ).execute()
 
         for e in expected:
-            received = min(amount_left, e.value_expected)
-            e.value_received += received
-            amount_left -= received
-            e.transaction = tx_hash[2:]
-            e.save()
-
             if e.value_expected == 0:
                 dispatcher.send(
                     signal='golem.income',
@@ -157,18 +194,20 @@ class IncomesKeeper:
         """
         accepted_ts_deadline = int(time.time()) - PAYMENT_DEADLINE
 
-        incomes = list(Income.select().where(
+        overdue = (
             Income.overdue == False,   # noqa pylint: disable=singleton-comparison
             Income.transaction.is_null(True),
             Income.accepted_ts < accepted_ts_deadline,
-        ))
+        )
 
-        if not incomes:
-            return
+        with db.atomic():
+            incomes = list(Income.select().where(*overdue))
+            if not incomes:
+                return
+            Income.update(overdue=True).where(*overdue).execute()
 
         for income in incomes:
             income.overdue = True
-            income.save()
             dispatcher.send(
                 signal='golem.income',
                 event='overdue_single',
@@ -1,10 +1,11 @@
+import bisect
 import calendar
 import datetime
 import logging
 import time
 
 from collections import defaultdict
-from typing import List
+from typing import Iterator, List, Optional, Set, Tuple
 
 from pydispatch import dispatcher
 from sortedcontainers import SortedListWithKey
@@ -16,12 +17,14 @@ import golem_sci
 
 from golem.core.common import datetime_to_timestamp
 from golem.core.variables import PAYMENT_DEADLINE
-from golem.model import Payment, PaymentStatus
+from golem.model import db, Payment, PaymentStatus
 
 log = logging.getLogger(__name__)
 
 # We reserve 30 minutes for the payment to go through
 PAYMENT_MAX_DELAY = PAYMENT_DEADLINE - 30 * 60
+# SQLite limits the number of variables in a single statement
+UPDATE_CHUNK_SIZE = 500
 
 
 def get_timestamp() -> int:
@@ -39,15 +42,136 @@ def _make_batch_payments(payments: List[Payment]) -> List[golem_sci.Payment]:
     return res
 
 
+def _save_payments(payments: List[Payment]) -> None:
+    """ Stores status and details of the payments in a single transaction,
+    with one UPDATE per distinct status and details """
+    grouped: defaultdict = defaultdict(list)
+    for p in payments:
+        key = (p.status, Payment.details.db_value(p.details))
+        grouped[key].append(p)
+
+    with db.atomic():
+        for group in grouped.values():
+            subtasks = [p.subtask for p in group]
+            for i in range(0, len(subtasks), UPDATE_CHUNK_SIZE):
+                Payment.update(
+                    status=group[0].status,
+                    details=group[0].details,
+                ).where(
+                    Payment.subtask.in_(subtasks[i:i + UPDATE_CHUNK_SIZE]),
+                ).execute()
+
+
+class AwaitingPayments:
+    """ Payments awaiting sendout, ordered by processed_ts.
+
+    Keeps running sums of payment values and counts of distinct payees for
+    each prefix of the list, so that the longest affordable batch can be
+    found with binary search. The sums are extended when payments are
+    appended and recomputed lazily after an out-of-order insertion or after
+    a batch is removed.
+    """
+
+    def __init__(self) -> None:
+        self._payments = SortedListWithKey(key=lambda p: p.processed_ts)
+        # Sum of values and number of distinct payees of payments[:i + 1]
+        self._values: List[int] = []
+        self._payee_counts: List[int] = []
+        # Payees of payments[:len(self._values)], None when out of date
+        self._payees: Optional[Set[bytes]] = set()
+
+    def __len__(self) -> int:
+        return len(self._payments)
+
+    def __iter__(self) -> Iterator[Payment]:
+        return iter(self._payments)
+
+    def __getitem__(self, index):
+        return self._payments[index]
+
+    def __eq__(self, other) -> bool:
+        return list(self._payments) == list(other)
+
+    def __repr__(self) -> str:
+        return '<AwaitingPayments: {!r}>'.format(list(self._payments))
+
+    def add(self, payment: Payment) -> None:
+        self._payments.add(payment)
+        index = self._payments.bisect_key_right(payment.processed_ts) - 1
+        if index < len(self._values):
+            del self._values[index:]
+            del self._payee_counts[index:]
+            self._payees = None
+
+    def update(self, payments: List[Payment]) -> None:
+        for payment in payments:
+            self.add(payment)
+
+    def bisect_key_left(self, processed_ts: int) -> int:
+        return self._payments.bisect_key_left(processed_ts)
+
+    def pop_batch(self, count: int) -> List[Payment]:
+        """ Removes and returns the first count payments """
+        batch = list(self._payments[:count])
+        del self._payments[:count]
+        self._values.clear()
+        self._payee_counts.clear()
+        self._payees = set()
+        return batch
+
+    def value(self, count: int) -> int:
+        """ Returns the total value of the first count payments """
+        if count <= 0:
+            return 0
+        self._update_sums()
+        return self._values[count - 1]
+
+    def batch_size(
+            self,
+            closure_time: int,
+            max_value: int,
+            max_payees: int) -> Tuple[int, int, int]:
+        """ Returns lengths of the longest prefixes of payments processed
+        until closure_time, worth at most max_value and paid to at most
+        max_payees distinct payees """
+        self._update_sums()
+        count = self._payments.bisect_key_right(closure_time)
+        return (
+            count,
+            bisect.bisect_right(self._values, max_value, 0, count),
+            bisect.bisect_right(self._payee_counts, max_payees, 0, count),
+        )
+
+    def _update_sums(self) -> None:
+        start = len(self._values)
+        if start == len(self._payments):
+            return
+
+        if self._payees is None:
+            self._payees = {p.payee for p in self._payments[:start]}
+
+        total = self._values[-1] if self._values else 0
+        for payment in self._payments[start:]:
+            total += payment.value
+            self._payees.add(payment.payee)
+            self._values.append(total)
+            self._payee_counts.append(len(self._payees))
+
+
 class PaymentProcessor:
     CLOSURE_TIME_DELAY = 2
     # Don't try to use more than 75% of block gas limit
     BLOCK_GAS_LIMIT_RATIO = 0.75
+    # How long balances and gas readings are reused for (in seconds)
+    READINGS_TTL = 10
 
     def __init__(self, sci) -> None:
         self._sci = sci
         self._gntb_reserved = 0
-        self._awaiting = SortedListWithKey(key=lambda p: p.processed_ts)
+        self._awaiting = AwaitingPayments()
+        # GNTB balance, ETH balance, gas price and block gas limit
+        self._readings: Optional[Tuple[int, int, int, float]] = None
+        self._readings_ts = 0.
         self.load_from_db()
 
     @property
@@ -58,6 +182,10 @@ class PaymentProcessor:
     def reserved_gntb(self) -> int:
         return self._gntb_reserved
 
+    @property
+    def awaiting_value(self) -> int:
+        return self._awaiting.value(len(self._awaiting))
+
     def load_from_db(self):
         sent = {}
         for sent_payment in Payment \
@@ -88,12 +216,13 @@ class PaymentProcessor:
             self._gntb_reserved += awaiting_payment.value
 
     def _on_batch_confirmed(self, payments: List[Payment], receipt) -> None:
+        self._readings = None
         if not receipt.status:
             log.critical("Failed batch transfer: %s", receipt)
             for p in payments:
                 p.status = PaymentStatus.awaiting  # type: ignore
-                p.save()
-                self._awaiting.add(p)
+            _save_payments(payments)
+            self._awaiting.update(payments)
             return
 
         block = self._sci.get_block_by_number(receipt.block_number)
@@ -110,7 +239,9 @@ class PaymentProcessor:
             p.details.block_number = receipt.block_number
             p.details.block_hash = receipt.block_hash[2:]
             p.details.fee = fee
-            p.save()
+        _save_payments(payments)
+
+        for p in payments:
             self._gntb_reserved -= p.value
             self._payment_confirmed(p, block.timestamp)
 
@@ -153,54 +284,77 @@ class PaymentProcessor:
         log.info("GNTB reserved %.6f", self._gntb_reserved / denoms.ether)
         return payment.processed_ts
 
+    def _get_readings(self) -> Tuple[int, int, int, float]:
+        """ Returns GNTB balance, ETH balance, gas price and the gas limit
+        of a batch; values are cached for READINGS_TTL seconds """
+        now = time.monotonic()
+        if self._readings is None or \
+                now - self._readings_ts > self.READINGS_TTL:
+            address = self._sci.get_eth_address()
+            self._readings = (
+                self._sci.get_gntb_balance(address),
+                self._sci.get_eth_balance(address),
+                self._sci.get_current_gas_price(),
+                self._sci.get_latest_block().gas_limit *
+                self.BLOCK_GAS_LIMIT_RATIO,
+            )
+            self._readings_ts = now
+        return self._readings
+
+    def _max_payees(self, max_gas) -> int:
+        """ Returns the number of payees a batch using at most max_gas
+        can pay """
+        per_payment = self._sci.GAS_PER_PAYMENT
+        base = self._sci.GAS_BATCH_PAYMENT_BASE
+        count = int((max_gas - base) // per_payment)
+        # Guard against rounding of float limits
+        while count >= 0 and count * per_payment + base > max_gas:
+            count -= 1
+        return count
+
     def __get_next_batch(self, closure_time: int) -> int:
-        gntb_balance = self._sci.get_gntb_balance(self._sci.get_eth_address())
-        eth_balance = self._sci.get_eth_balance(self._sci.get_eth_address())
-        gas_price = self._sci.get_current_gas_price()
-
-        ind = 0
-        gas_limit = \
-            self._sci.get_latest_block().gas_limit * self.BLOCK_GAS_LIMIT_RATIO
-        payees = set()
-        for p in self._awaiting:
-            if p.processed_ts > closure_time:
-                break
-            gntb_balance -= p.value
-            if gntb_balance < 0:
-                log.debug(
-                    'Insufficient GNTB balance.'
-                    ' value=%(value).6f, subtask_id=%(subtask)s',
-                    {
-                        'value': p.value / denoms.ether,
-                        'subtask': p.subtask,
-                    },
-                )
-                break
-
-            payees.add(p.payee)
-            gas = len(payees) * self._sci.GAS_PER_PAYMENT + \
-                self._sci.GAS_BATCH_PAYMENT_BASE
-            if gas > gas_limit:
-                break
-            gas_cost = gas * gas_price
-            if gas_cost > eth_balance:
+        gntb_balance, eth_balance, gas_price, gas_limit = self._get_readings()
+
+        max_payees = self._max_payees(gas_limit)
+        max_payees_eth = self._max_payees(eth_balance // gas_price) \
+            if gas_price else max_payees
+
+        ind, ind_gntb, ind_eth = self._awaiting.batch_size(
+            closure_time,
+            gntb_balance,
+            min(max_payees, max_payees_eth),
+        )
+
+        if ind_gntb < ind:
+            p = self._awaiting[ind_gntb]
+            log.debug(
+                'Insufficient GNTB balance.'
+                ' value=%(value).6f, subtask_id=%(subtask)s',
+                {
+                    'value': p.value / denoms.ether,
+                    'subtask': p.subtask,
+                },
+            )
+            ind = ind_gntb
+
+        if ind_eth < ind:
+            if max_payees_eth < max_payees:
+                gas = (max_payees_eth + 1) * self._sci.GAS_PER_PAYMENT + \
+                    self._sci.GAS_BATCH_PAYMENT_BASE
                 log.debug(
                     'Not enough ETH to pay gas for transaction.'
                     ' gas_cost=%(gas_cost).6f, subtask_id=%(subtask)s',
                     {
-                        'gas_cost': gas_cost / denoms.ether,
-                        'subtask': p.subtask,
+                        'gas_cost': gas * gas_price / denoms.ether,
+                        'subtask': self._awaiting[ind_eth].subtask,
                     },
                 )
-                break
-
-            ind += 1
+            ind = ind_eth
 
         # we need to take either all payments with given processed_ts or none
         if ind < len(self._awaiting):
-            while ind > 0 and self._awaiting[ind - 1]\
-                    .processed_ts == self._awaiting[ind].processed_ts:
-                ind -= 1
+            ind = self._awaiting.bisect_key_left(
+                self._awaiting[ind].processed_ts)
 
         return ind
 
@@ -219,7 +373,7 @@ class PaymentProcessor:
             return False
         payments = self._awaiting[:payments_count]
 
-        value = sum([p.value for p in payments])
+        value = self._awaiting.value(payments_count)
         log.info("Batch payments value: %.6f", value / denoms.ether)
 
         closure_time = payments[-1].processed_ts
@@ -227,12 +381,15 @@ class PaymentProcessor:
             _make_batch_payments(payments),
             closure_time,
         )
-        del self._awaiting[:payments_count]
+        self._readings = None
+        self._awaiting.pop_batch(payments_count)
 
         for payment in payments:
             payment.status = PaymentStatus.sent
             payment.details.tx = tx_hash[2:]
-            payment.save()
+        _save_payments(payments)
+
+        for payment in payments:
             log.debug("- {} send to {} ({:.6f})".format(
                 payment.subtask,
                 encode_hex(payment.payee),
@@ -15,6 +15,7 @@ from typing import (
     Iterable,
     List,
     Optional,
+    Tuple,
 )
 
 from ethereum.utils import denoms
@@ -353,6 +354,15 @@ class TransactionSystem(LoopingCallService):
         """
         return self._incomes_keeper.get_list_of_all_incomes()
 
+    def get_awaiting_payments(self) -> Tuple[int, int]:
+        """ Number and total value of payments waiting to be sent out """
+        if not self._payment_processor:
+            raise Exception('Start was not called')
+        return (
+            self._payment_processor.recipients_count,
+            self._payment_processor.awaiting_value,
+        )
+
     def get_available_eth(self) -> int:
         return self._eth_balance - self.get_locked_eth()
 
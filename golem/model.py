@@ -4,7 +4,8 @@ import inspect
 import json
 import pickle
 import sys
-from typing import Optional
+import threading
+from typing import Dict, Optional
 
 from eth_utils import decode_hex, encode_hex
 from ethereum.utils import denoms
@@ -317,6 +318,11 @@ class Income(BaseModel):
     class Meta:
         database = db
         primary_key = CompositeKey('sender_node', 'subtask')
+        indexes = (
+            # covers incomes matched with batch transfers
+            (('payer_address', 'accepted_ts', 'transaction', 'settled_ts'),
+             False),
+        )
 
     def __repr__(self):
         return "<Income: {!r} v:{:.3f} accepted_ts:{!r} tid:{!r}>"\
@@ -464,20 +470,56 @@ class Performance(BaseModel):
     environment_id = CharField(null=False, index=True, unique=True)
     value = FloatField(default=0.0)
     min_accepted_step = FloatField(default=300.0)
+    all_cores_value = FloatField(null=True)
 
     class Meta:
         database = db
 
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        Performance.invalidate(self.environment_id)
+        return result
+
     @classmethod
-    def update_or_create(cls, env_id, performance):
+    def update_or_create(cls, env_id, performance, all_cores_value=None):
         try:
             perf = Performance.get(Performance.environment_id == env_id)
             perf.value = performance
+            perf.all_cores_value = all_cores_value
             perf.save()
         except Performance.DoesNotExist:
-            perf = Performance(environment_id=env_id, value=performance)
+            perf = Performance(environment_id=env_id, value=performance,
+                               all_cores_value=all_cores_value)
             perf.save()
 
+    @classmethod
+    def get_cached(cls, env_id: str) -> Optional['Performance']:
+        """ Returns the benchmark result of an environment or None. Results
+        are read from the database once and kept in memory until saved.
+        """
+        with _performance_lock:
+            try:
+                return _performance_cache[env_id]
+            except KeyError:
+                pass
+
+            perf = cls.select().where(cls.environment_id == env_id).first()
+            _performance_cache[env_id] = perf
+            return perf
+
+    @staticmethod
+    def invalidate(env_id: Optional[str] = None) -> None:
+        """ Drops cached results of an environment, or of all environments """
+        with _performance_lock:
+            if env_id is None:
+                _performance_cache.clear()
+            else:
+                _performance_cache.pop(env_id, None)
+
+
+_performance_cache = {}  # type: Dict[str, Optional[Performance]]
+_performance_lock = threading.Lock()
+
 
 ##################
 # MESSAGE MODELS #
@@ -0,0 +1,280 @@
+"""
+Local metrics endpoint exposing node internals in the Prometheus text
+exposition format.
+
+Counters and histograms are updated where events happen, gauges are read
+from node components by collectors on every scrape. Metrics are served from
+the reactor only when `metrics_port` is configured.
+"""
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from twisted.internet.task import LoopingCall
+from twisted.web.resource import Resource
+from twisted.web.server import Site
+
+from golem.core.service import IService
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = b'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds
+DEFAULT_BUCKETS = (.001, .005, .01, .05, .1, .5, 1., 5., 10., 60., 300., 1800.)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str, quotes: bool = True) -> str:
+    value = value.replace('\\', r'\\').replace('\n', r'\n')
+    return value.replace('"', r'\"') if quotes else value
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class MetricFamily:
+    """ Samples of a single metric, rendered together """
+
+    def __init__(self, name: str, metric_type: str,
+                 documentation: str) -> None:
+        self.name = name
+        self.type = metric_type
+        self.documentation = documentation
+        self.samples: List[Tuple[str, Labels, float]] = []
+
+    def add(self, value: float, suffix: str = '', **labels) -> 'MetricFamily':
+        self.samples.append((
+            self.name + suffix,
+            tuple(sorted((k, str(v)) for k, v in labels.items())),
+            value,
+        ))
+        return self
+
+    def render(self) -> str:
+        lines = [
+            '# HELP {} {}'.format(self.name,
+                                  _escape(self.documentation, quotes=False)),
+            '# TYPE {} {}'.format(self.name, self.type),
+        ]
+        for name, labels, value in self.samples:
+            if labels:
+                name += '{' + ','.join(
+                    '{}="{}"'.format(k, _escape(v)) for k, v in labels) + '}'
+            lines.append('{} {}'.format(name, _format_value(value)))
+        return '\n'.join(lines) + '\n'
+
+
+def gauge(name: str, documentation: str,
+          value: Optional[float] = None) -> MetricFamily:
+    family = MetricFamily(name, 'gauge', documentation)
+    if value is not None:
+        family.add(value)
+    return family
+
+
+class Counter:
+    """ Monotonically increasing counter, optionally labelled """
+
+    def __init__(self, name: str, documentation: str,
+                 label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels[name] for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, 'counter', self.documentation)
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            family.add(value, **dict(zip(self.label_names, key)))
+        return family
+
+
+class Histogram:
+    """ Distribution of observed values, optionally labelled """
+
+    def __init__(self, name: str, documentation: str,
+                 label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [counts per bucket and +Inf, sum]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels[name] for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, 'histogram', self.documentation)
+        with self._lock:
+            values = [(key, list(counts))
+                      for key, counts in self._values.items()]
+        for key, counts in values:
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                family.add(cumulative, '_bucket', le=_format_value(bound),
+                           **labels)
+            family.add(counts[-1], '_sum', **labels)
+            family.add(cumulative, '_count', **labels)
+        return family
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class Registry:
+    """ Metrics rendered on every scrape: instruments and collectors """
+
+    def __init__(self) -> None:
+        self._instruments: List = []
+        self._collectors: List[Collector] = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        counter = Counter(*args, **kwargs)
+        self._instruments.append(counter)
+        return counter
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        histogram = Histogram(*args, **kwargs)
+        self._instruments.append(histogram)
+        return histogram
+
+    def register(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def unregister(self, collector: Collector) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def collect(self) -> Iterable[MetricFamily]:
+        for instrument in self._instruments:
+            yield instrument.collect()
+        for collector in list(self._collectors):
+            try:
+                yield from collector()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Metrics collector %r failed', collector)
+
+    def render(self) -> bytes:
+        return ''.join(family.render() for family in self.collect())\
+            .encode('utf-8')
+
+
+REGISTRY = Registry()
+
+MESSAGES_SENT = REGISTRY.counter(
+    'golem_messages_sent_total',
+    'Messages sent to other nodes, by message type',
+    ('type',),
+)
+MESSAGE_HANDLING_SECONDS = REGISTRY.histogram(
+    'golem_message_handling_seconds',
+    'Time spent handling messages received from other nodes, by message type',
+    ('type',),
+)
+VERIFICATION_SECONDS = REGISTRY.histogram(
+    'golem_verification_seconds',
+    'Duration of subtask result verification jobs',
+)
+REACTOR_LAG_SECONDS = REGISTRY.histogram(
+    'golem_reactor_lag_seconds',
+    'Delay of timed calls scheduled in the reactor loop',
+    buckets=(.001, .005, .01, .05, .1, .25, .5, 1., 2.5, 5.),
+)
+
+
+class MetricsResource(Resource):
+    isLeaf = True
+
+    def __init__(self, registry: Registry) -> None:
+        super().__init__()
+        self.registry = registry
+
+    def render_GET(self, request):  # noqa pylint:disable=invalid-name
+        request.setHeader(b'content-type', CONTENT_TYPE)
+        return self.registry.render()
+
+
+class MetricsService(IService):
+    """
+    Serves metrics from the registry over HTTP on a local port, from the
+    reactor thread, and measures the reactor loop lag. Given collectors are
+    registered while the service is running.
+    """
+
+    LAG_INTERVAL = 1.0  # s
+
+    def __init__(self, port: int, interface: str = '127.0.0.1',
+                 collectors: Iterable[Collector] = (),
+                 registry: Registry = REGISTRY) -> None:
+        self.port = port
+        self.interface = interface
+        self.registry = registry
+        self.collectors = [self._collect] + list(collectors)
+        self._listener = None
+        self._lag_call = LoopingCall(self._measure_lag)
+        self._last_call = 0.
+        self._last_lag = 0.
+
+    @property
+    def running(self) -> bool:
+        return self._listener is not None
+
+    def start(self) -> None:
+        from twisted.internet import reactor
+
+        if self.running:
+            raise RuntimeError("service already started")
+        self._listener = reactor.listenTCP(
+            self.port, Site(MetricsResource(self.registry)),
+            interface=self.interface)
+        for collector in self.collectors:
+            self.registry.register(collector)
+        self._last_call = self._lag_call.clock.seconds()
+        self._lag_call.start(self.LAG_INTERVAL, now=False)
+        logger.info('Serving metrics on http://%s:%d/metrics',
+                    self.interface, self.port)
+
+    def stop(self) -> None:
+        if not self.running:
+            raise RuntimeError("service not started")
+        self._lag_call.stop()
+        for collector in self.collectors:
+            self.registry.unregister(collector)
+        self._listener.stopListening()
+        self._listener = None
+
+    def _measure_lag(self) -> None:
+        now = self._lag_call.clock.seconds()
+        self._last_lag = max(now - self._last_call - self.LAG_INTERVAL, 0.)
+        self._last_call = now
+        REACTOR_LAG_SECONDS.observe(self._last_lag)
+
+    def _collect(self) -> Iterable[MetricFamily]:
+        yield gauge('golem_reactor_last_lag_seconds',
+                    'Last measured reactor loop lag', self._last_lag)
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from golem.task.taskproviderstats import ProviderStats
 from golem.task.taskrequestorstats import CurrentStats, FinishedTasksStats, \
     AggregateTaskStats
@@ -101,3 +103,33 @@ class ProviderStatsModel(BasicModel):
 
         for key, value in vars(stats).items():
             setattr(self, key, value)
+
+
+class TaskTimeoutsModel(BasicModel):
+
+    def __init__(self, meta_data: BasicModel,
+                 stats: Dict[str, float]) -> None:
+
+        super().__init__(
+            "TaskTimeouts",
+            meta_data.cliid,
+            meta_data.sessid
+        )
+
+        for key, value in stats.items():
+            setattr(self, key, value)
+
+
+class MessageHistoryModel(BasicModel):
+
+    def __init__(self, meta_data: BasicModel,
+                 stats: Dict[str, float]) -> None:
+
+        super().__init__(
+            "MessageHistory",
+            meta_data.cliid,
+            meta_data.sessid
+        )
+
+        for key, value in stats.items():
+            setattr(self, key, value)
@@ -1,7 +1,7 @@
 import logging
-import queue
 import threading
 import time
+from collections import deque, OrderedDict
 from typing import Optional, Dict
 from urllib.parse import urljoin
 
@@ -23,34 +23,131 @@ log = logging.getLogger('golem.monitor')
 
 
 class SenderThread(threading.Thread):
+    """
+    Sends monitor messages in gzip-compressed batches of up to
+    `max_batch_size` messages, backing off exponentially while the monitor
+    host cannot be reached. At most `max_queue_size` messages are kept,
+    the oldest ones are dropped first. Of periodic snapshots listed in
+    COALESCED_MODELS, only the latest one of each type is sent.
+    """
+
+    COALESCED_MODELS = (
+        statssnapshotmodel.StatsSnapshotModel,
+        TaskComputerSnapshotModel,
+    )
+    MIN_BACKOFF = 1  # s
+    MAX_BACKOFF = 10 * 60  # s
+
     def __init__(self, node_info, monitor_host, monitor_request_timeout,
-                 monitor_sender_thread_timeout, proto_ver):
+                 monitor_sender_thread_timeout, proto_ver,
+                 max_queue_size=1000, max_batch_size=100):
         super(SenderThread, self).__init__()
-        self.queue = queue.Queue()
+        self.queue = deque()
+        self.snapshots = OrderedDict()
+        self.condition = threading.Condition()
         self.stop_request = threading.Event()
         self.node_info = node_info
         self.sender = Sender(monitor_host, monitor_request_timeout, proto_ver)
         self.monitor_sender_thread_timeout = monitor_sender_thread_timeout
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.backoff = 0
+        self.stats = {
+            'sent': 0,
+            'failed': 0,
+            'dropped': 0,
+            'coalesced': 0,
+        }
 
     def send(self, o):
-        self.queue.put(o)
+        with self.condition:
+            if isinstance(o, self.COALESCED_MODELS):
+                if self.snapshots.pop(type(o), None) is not None:
+                    self.stats['coalesced'] += 1
+                self.snapshots[type(o)] = o
+            else:
+                self.queue.append(o)
+                self._drop_oldest()
+            self.condition.notify()
+
+    def get_stats(self):
+        with self.condition:
+            stats = dict(self.stats)
+            stats['queue_depth'] = len(self.queue) + len(self.snapshots)
+        return stats
 
     def run(self):
         while not self.stop_request.isSet():
-            try:
-                msg = self.queue.get(True, self.monitor_sender_thread_timeout)
-                if msg is None:
-                    continue
-                self.sender.send(msg)
-            except queue.Empty:
-                # send ping message
-                self.sender.send(self.node_info)
+            with self.condition:
+                if not (self.queue or self.snapshots):
+                    self.condition.wait(self.monitor_sender_thread_timeout)
+                batch = self._next_batch()
+            if not batch:
+                if not self.stop_request.isSet():
+                    # send ping message
+                    self._send_batch([self.node_info], retry=False)
+                continue
+            if not self._send_batch(batch):
+                self.stop_request.wait(self.backoff)
+
+        # Flush messages queued before the thread was stopped
+        while True:
+            with self.condition:
+                batch = self._next_batch()
+            if not batch or not self._send_batch(batch, retry=False):
+                break
+        self.sender.close()
 
     def join(self, timeout=None):
         self.stop_request.set()
-        self.queue.put(None)
+        with self.condition:
+            self.condition.notify()
         super(SenderThread, self).join(timeout)
 
+    def _next_batch(self):
+        batch = []
+        while self.snapshots and len(batch) < self.max_batch_size:
+            batch.append(self.snapshots.popitem(last=False)[1])
+        while self.queue and len(batch) < self.max_batch_size:
+            batch.append(self.queue.popleft())
+        return batch
+
+    def _send_batch(self, batch, retry=True):
+        if len(batch) == 1:
+            sent = self.sender.send(batch[0])
+        else:
+            sent = self.sender.send_batch(batch)
+
+        with self.condition:
+            if sent:
+                self.stats['sent'] += len(batch)
+                self.backoff = 0
+                return True
+
+            self.stats['failed'] += 1
+            self.backoff = min(max(self.backoff * 2, self.MIN_BACKOFF),
+                               self.MAX_BACKOFF)
+            if retry:
+                self._requeue(batch)
+        return False
+
+    def _requeue(self, batch):
+        for o in reversed(batch):
+            if not isinstance(o, self.COALESCED_MODELS):
+                self.queue.appendleft(o)
+            elif type(o) in self.snapshots:
+                # A newer snapshot has been queued in the meantime
+                self.stats['coalesced'] += 1
+            else:
+                self.snapshots[type(o)] = o
+                self.snapshots.move_to_end(type(o), last=False)
+        self._drop_oldest()
+
+    def _drop_oldest(self):
+        while len(self.queue) > self.max_queue_size:
+            self.queue.popleft()
+            self.stats['dropped'] += 1
+
 
 class SystemMonitor(object):
     def __init__(self,
@@ -210,3 +307,11 @@ class SystemMonitor(object):
     def on_provider_stats_snapshot(self, stats: ProviderStats):
         msg = statssnapshotmodel.ProviderStatsModel(self.meta_data, stats)
         self.sender_thread.send(msg)
+
+    def on_task_timeouts_snapshot(self, stats: Dict[str, float]):
+        msg = statssnapshotmodel.TaskTimeoutsModel(self.meta_data, stats)
+        self.sender_thread.send(msg)
+
+    def on_message_history_snapshot(self, stats: Dict[str, float]):
+        msg = statssnapshotmodel.MessageHistoryModel(self.meta_data, stats)
+        self.sender_thread.send(msg)
@@ -10,3 +10,10 @@ class DefaultJSONSender(object):
     def send(self, o):
         msg = self.proto.prepare_json_message(o.dict_repr())
         return self.transport.post_json(msg)
+
+    def send_batch(self, objs):
+        msg = self.proto.prepare_json_message([o.dict_repr() for o in objs])
+        return self.transport.post_compressed_json(msg)
+
+    def close(self):
+        self.transport.close()
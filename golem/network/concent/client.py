@@ -5,10 +5,12 @@ import queue
 import threading
 import time
 import typing
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
 from pydispatch import dispatcher
 import requests
+from requests.adapters import HTTPAdapter
 import golem_messages
 from golem_messages import message
 from golem_messages import datastructures as msg_datastructures
@@ -74,9 +76,13 @@ def verify_response(response: requests.Response) -> None:
 def send_to_concent(
         msg: message.base.Message,
         signing_key: bytes,
-        concent_variant: dict) -> typing.Optional[bytes]:
+        concent_variant: dict,
+        session: typing.Optional[requests.Session] = None,
+) -> typing.Optional[bytes]:
     """Sends a message to the concent server
 
+    :param session: Session to send the request with, so that connections
+                    are kept alive between requests
     :return: Raw reply message, None or exception
     :rtype: Bytes|None
     """
@@ -115,7 +121,7 @@ def send_to_concent(
             concent_post_url,
             headers,
         )
-        response = requests.post(
+        response = (session or requests).post(
             concent_post_url,
             data=data,
             headers=headers,
@@ -133,7 +139,15 @@ def receive_from_concent(
         signing_key,
         public_key,
         concent_variant: dict,
-        path: str = '/api/v1/receive/') -> typing.Optional[bytes]:
+        path: str = '/api/v1/receive/',
+        session: typing.Optional[requests.Session] = None,
+        timeout: typing.Optional[float] = None) -> typing.Optional[bytes]:
+    """Polls the concent server for a message addressed to this node
+
+    :param session: Session to send the request with
+    :param timeout: How long to wait for a message, in seconds
+    :return: Raw message or None
+    """
     concent_receive_url = urljoin(concent_variant['url'], path)
     headers = {
         'Content-Type': 'application/octet-stream',
@@ -150,10 +164,11 @@ def receive_from_concent(
             concent_receive_url,
             headers,
         )
-        response = requests.post(
+        response = (session or requests).post(
             concent_receive_url,
             data=data,
             headers=headers,
+            timeout=timeout,
             **ssl_kwargs(concent_variant),
         )
     except requests.exceptions.RequestException as e:
@@ -175,22 +190,91 @@ def build_key(*args) -> str:
     return '/'.join(str(a) for a in args)
 
 
+class Backoff:
+    """ Delay growing `factor` times on each consecutive failure, from
+    `minimum` up to `maximum` seconds. Failures during a delay, e.g. of
+    requests sent in parallel, do not make it any longer. """
+
+    def __init__(self, minimum: float, maximum: float, factor: float) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.delay = minimum
+        self._until = 0.
+        self._lock = threading.Lock()
+
+    def failure(self) -> float:
+        """ :return: seconds left until the end of the delay """
+        with self._lock:
+            now = time.monotonic()
+            if self._until > now:
+                return self._until - now
+            self.delay = min(self.delay * self.factor, self.maximum)
+            self._until = now + self.delay
+            return self.delay
+
+    def success(self) -> None:
+        with self._lock:
+            self.delay = self.minimum
+            self._until = 0.
+
+    def remaining(self) -> float:
+        """ Seconds left until the end of the current delay """
+        return max(self._until - time.monotonic(), 0.)
+
+
 class ConcentClientService(threading.Thread):
+    """
+    Sends queued messages to the Concent and polls it for messages addressed
+    to this node.
+
+    Up to `max_in_flight` messages are sent in parallel by a thread pool,
+    over keep-alive connections of a single session. Messages are re-stamped
+    right before they are sent, so time spent in the queue does not count
+    towards their Message Transport Time. The Concent is polled again right
+    after it returns a message, until it runs out of them; errors pause
+    sending and receiving with exponential backoff.
+    """
 
     MIN_GRACE_TIME = 5  # s
     MAX_GRACE_TIME = 5 * 60  # s
     GRACE_FACTOR = 2  # n times on each failure
+    MAX_IDLE_TIME = 1  # s
+    RECEIVE_TIMEOUT = 30  # s
 
-    def __init__(self, keys_auth: keysauth.KeysAuth, variant: dict) -> None:
+    def __init__(self,
+                 keys_auth: keysauth.KeysAuth,
+                 variant: dict,
+                 max_in_flight: int = 4) -> None:
         super().__init__(daemon=True)
 
         self.keys_auth = keys_auth
         # SEE golem.core.variables.CONCENT_CHOICES
         self.variant: dict = variant
+        self.max_in_flight = max_in_flight
         self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
 
         self._queue: queue.Queue = queue.Queue()
-        self._grace_time: int = self.MIN_GRACE_TIME
+        self._in_flight = threading.Semaphore(max_in_flight)
+        self._send_backoff = Backoff(
+            self.MIN_GRACE_TIME, self.MAX_GRACE_TIME, self.GRACE_FACTOR)
+        self._receive_backoff = Backoff(
+            self.MIN_GRACE_TIME, self.MAX_GRACE_TIME, self.GRACE_FACTOR)
+        self._next_receive = 0.
+        self._receiving = False
+
+        self._executor: typing.Optional[ThreadPoolExecutor] = None
+        self._session: typing.Optional[requests.Session] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'in_flight': 0,
+            'sent': 0,
+            'failed': 0,
+            'received': 0,
+            'queue_time': 0.,
+            'request_time': 0.,
+        }
 
         self._delayed: dict = dict()
         self.received_messages: queue.Queue = queue.Queue(maxsize=100)
@@ -214,20 +298,45 @@ class ConcentClientService(threading.Thread):
         return self.available and soft_switch.is_on()
 
     def run(self) -> None:
-        last_receive = 0.0
         while not self._stop_event.isSet():
+            self._wakeup.clear()
             self._loop()
-            if time.time() - last_receive > variables.CONCENT_PULL_INTERVAL:
-                last_receive = time.time()
-                self.receive()
-            time.sleep(1)
+            now = time.monotonic()
+            if not self._receiving and now >= self._next_receive:
+                self._receiving = True
+                self._next_receive = now + variables.CONCENT_PULL_INTERVAL
+                self._get_executor().submit(self._receive_queued)
+            self._wakeup.wait(self._idle_time())
+        self._shutdown()
 
     def stop(self) -> None:
         self._stop_event.set()
+        self._wakeup.set()
         logger.info('Waiting for received messages queue to empty')
         self.received_messages.join()
+        self._shutdown()
         logger.info('%s stopped', self)
 
+    def _shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            session, self._session = self._session, None
+        if executor:
+            executor.shutdown(wait=False)
+        if session:
+            session.close()
+
+    def get_stats(self) -> typing.Dict[str, float]:
+        """
+        :return: Number of queued, in-flight, sent and failed requests,
+        number of received messages and the time the last sent message spent
+        in the queue and in flight, in seconds
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        return stats
+
     def submit_task_message(
             self, subtask_id: str, msg: message.base.Message,
             delay: typing.Optional[datetime.timedelta] = None
@@ -311,33 +420,72 @@ class ConcentClientService(threading.Thread):
 
     def _loop(self) -> None:
         """
-        Main service loop. Requests from the queue are sent one by one (FIFO).
-        In case of failure, service enters a grace period.
+        Dispatches requests from the queue (FIFO) to the workers, keeping at
+        most `max_in_flight` of them in flight. In case of failure, service
+        enters a grace period.
         """
-        try:
-            msg = self._queue.get_nowait()
-        except queue.Empty:
-            return
+        while not self._send_backoff.remaining():
+            if not self._in_flight.acquire(blocking=False):
+                return
+            try:
+                msg, enqueued = self._queue.get_nowait()
+            except queue.Empty:
+                self._in_flight.release()
+                return
+
+            if not self.available:
+                logger.debug('Concent disabled. Dropping %r', msg)
+                self._in_flight.release()
+                continue
 
-        if not self.available:
-            logger.debug('Concent disabled. Dropping %r', msg)
-            return
+            self._get_executor().submit(self._send, msg, enqueued)
 
+    def _send(self, msg: message.base.Message, enqueued: float) -> None:
+        started = time.monotonic()
+        with self._lock:
+            self._stats['in_flight'] += 1
         try:
             res = send_to_concent(
                 msg,
                 self.keys_auth._private_key,  # pylint: disable=protected-access
                 concent_variant=self.variant,
+                session=self._get_session(),
             )
         except exceptions.ConcentError as e:
             logger.info('send_to_concent error: %s', e)
-            self._grace_sleep()
+            self._record(msg, enqueued, started, ok=False)
+            self._grace_period(self._send_backoff)
         except Exception:  # pylint: disable=broad-except
             logger.exception('send_to_concent(%r) failed', msg)
-            self._grace_sleep()
+            self._record(msg, enqueued, started, ok=False)
+            self._grace_period(self._send_backoff)
         else:
-            self._grace_time = self.MIN_GRACE_TIME
+            self._record(msg, enqueued, started, ok=True)
+            self._send_backoff.success()
             self.react_to_concent_message(res, response_to=msg)
+        finally:
+            self._in_flight.release()
+            self._wakeup.set()
+
+    def _record(self, msg: message.base.Message, enqueued: float,
+                started: float, ok: bool) -> None:
+        finished = time.monotonic()
+        logger.debug('Concent request %s: %s, %.3fs in queue, %.3fs in flight',
+                     'sent' if ok else 'failed', msg.__class__.__name__,
+                     started - enqueued, finished - started)
+        with self._lock:
+            self._stats['in_flight'] -= 1
+            self._stats['sent' if ok else 'failed'] += 1
+            self._stats['queue_time'] = started - enqueued
+            self._stats['request_time'] = finished - started
+
+    def _receive_queued(self) -> None:
+        try:
+            self.receive()
+        finally:
+            self._receiving = False
+            if self._next_receive <= time.monotonic():
+                self._wakeup.set()
 
     def receive(self) -> None:
         if not self.available:
@@ -348,15 +496,26 @@ class ConcentClientService(threading.Thread):
                 signing_key=self.keys_auth._private_key,  # noqa pylint: disable=protected-access
                 public_key=self.keys_auth.public_key,
                 concent_variant=self.variant,
+                session=self._get_session(),
+                timeout=self.RECEIVE_TIMEOUT,
             )
         except exceptions.ConcentError as e:
             logger.warning("Can't receive message from Concent: %s", e)
-            self._grace_sleep()
+            self._next_receive = time.monotonic() + \
+                self._grace_period(self._receive_backoff)
             return
         except Exception:  # pylint: disable=broad-except
             logger.exception('receive_from_concent() failed')
-            self._grace_sleep()
+            self._next_receive = time.monotonic() + \
+                self._grace_period(self._receive_backoff)
             return
+
+        self._receive_backoff.success()
+        if res is not None:
+            with self._lock:
+                self._stats['received'] += 1
+            # There may be more messages waiting
+            self._next_receive = time.monotonic()
         self.react_to_concent_message(res)
 
     @staticmethod
@@ -389,17 +548,47 @@ class ConcentClientService(threading.Thread):
         else:
             self.process_synchronous_response(msg, response_to)
 
-    def _grace_sleep(self):
-        self._grace_time = min(self._grace_time * self.GRACE_FACTOR,
-                               self.MAX_GRACE_TIME)
-
-        logger.debug('Concent grace time: %r', self._grace_time)
-        time.sleep(self._grace_time)
+    @staticmethod
+    def _grace_period(backoff: Backoff) -> float:
+        grace_time = backoff.failure()
+        logger.debug('Concent grace time: %r', grace_time)
+        return grace_time
+
+    def _idle_time(self) -> float:
+        idle_time = min(self._next_receive - time.monotonic(),
+                        self.MAX_IDLE_TIME)
+        # Workers wake the service up once they finish, so it only has to
+        # keep track of the grace period
+        grace_time = self._send_backoff.remaining()
+        if grace_time and not self._queue.empty():
+            idle_time = min(idle_time, grace_time)
+        return max(idle_time, 0.)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # One more worker for polling the Concent
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_in_flight + 1,
+                    thread_name_prefix='ConcentClient',
+                )
+            return self._executor
+
+    def _get_session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self.max_in_flight + 1)
+                self._session.mount('http://', adapter)
+                self._session.mount('https://', adapter)
+            return self._session
 
     def _enqueue(self, key, msg):
         logger.debug("_enqueue(%r, %r)", key, msg)
         self._delayed.pop(key, None)
-        self._queue.put(msg)
+        self._queue.put((msg, time.monotonic()))
+        self._wakeup.set()
 
     def income_listener(self, event, **kwargs):
         logger.debug("income listener event: %s", event)
@@ -1,9 +1,14 @@
 import base64
 import logging
+import os
+import threading
+import time
 import typing
 import queue
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import golem_messages
 from golem_messages.message.concents import (
@@ -46,19 +51,67 @@ class ConcentFiletransferError(Exception):
     pass
 
 
+class TransferMetrics:
+    """ Size and duration of a single transfer """
+
+    def __init__(self, operation: str, path: str) -> None:
+        self.operation = operation
+        self.path = path
+        self.bytes = 0
+        self.resumed = 0
+        self._started = time.monotonic()
+        self.duration = 0.
+
+    def finish(self) -> None:
+        self.duration = time.monotonic() - self._started
+
+    @property
+    def throughput(self) -> float:
+        """ Bytes per second """
+        return self.bytes / self.duration if self.duration else 0.
+
+    def __repr__(self):
+        return '<TransferMetrics %s %r: %d B in %.3fs (%.0f B/s), ' \
+            'resumed %d times>' % (
+                self.operation, self.path, self.bytes, self.duration,
+                self.throughput, self.resumed,
+            )
+
+
 class ConcentFiletransferService(LoopingCallService):
     """
     Golem service responsible for exchanging files with the Concent service.
+
+    Queued transfers are picked up on every tick and run by up to
+    `max_workers` threads. Connections to each storage cluster are kept alive
+    in a pooled session. Interrupted downloads are resumed with HTTP Range
+    requests, up to `max_resumes` times.
     """
 
-    def __init__(self,
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self,  # noqa pylint:disable=too-many-arguments
                  keys_auth: keysauth.KeysAuth,
                  variant: dict,
-                 interval_seconds: int = 1,) -> None:
+                 interval_seconds: int = 1,
+                 max_workers: int = 4,
+                 max_resumes: int = 3) -> None:
         # SEE golem.core.variables.CONCENT_CHOICES
         self.variant = variant
         self.keys_auth = keys_auth
+        self.max_workers = max_workers
+        self.max_resumes = max_resumes
         self._transfers: queue.Queue = queue.Queue()
+        self._executor: typing.Optional[ThreadPoolExecutor] = None
+        self._sessions: typing.Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'active': 0,
+            'completed': 0,
+            'failed': 0,
+            'bytes': 0,
+            'throughput': 0.,
+        }
         super().__init__(interval_seconds=interval_seconds)
 
     def start(self, now: bool = True):
@@ -68,8 +121,26 @@ class ConcentFiletransferService(LoopingCallService):
     def stop(self):
         self._transfers.join()
         super().stop()
+        with self._lock:
+            executor, self._executor = self._executor, None
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        if executor:
+            executor.shutdown()
+        for session in sessions:
+            session.close()
         logger.debug("Concent Filetransfer Service stopped")
 
+    def get_stats(self) -> typing.Dict[str, float]:
+        """
+        :return: Number of queued, running, completed and failed transfers,
+        bytes transferred and throughput of the last transfer in bytes/s
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._transfers.qsize()
+        return stats
+
     def transfer(self,  # noqa pylint:disable=too-many-arguments
                  file_path: str,
                  file_transfer_token: FileTransferToken,
@@ -89,12 +160,54 @@ class ConcentFiletransferService(LoopingCallService):
         self._transfers.put(request)
 
     def _run(self):
+        while True:
+            try:
+                request = self._transfers.get_nowait()
+            except queue.Empty:
+                return
+            self._get_executor().submit(self._process_queued, request)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='ConcentFiletransfer',
+                )
+            return self._executor
+
+    def _process_queued(self, request: ConcentFileRequest) -> None:
+        with self._lock:
+            self._stats['active'] += 1
         try:
-            request = self._transfers.get_nowait()
-        except queue.Empty:
-            return
-        self.process(request)
-        self._transfers.task_done()
+            self.process(request)
+        except Exception:  # noqa pylint:disable=broad-except
+            logger.exception("Concent file transfer failed: %r", request)
+        finally:
+            with self._lock:
+                self._stats['active'] -= 1
+            self._transfers.task_done()
+
+    def _get_session(self, storage_cluster_address: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(storage_cluster_address)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self.max_workers)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[storage_cluster_address] = session
+            return session
+
+    def _record(self, metrics: TransferMetrics, ok: bool) -> None:
+        metrics.finish()
+        logger.info("Concent file transfer %s: %r",
+                    'finished' if ok else 'failed', metrics)
+        with self._lock:
+            self._stats['completed' if ok else 'failed'] += 1
+            self._stats['bytes'] += metrics.bytes
+            self._stats['throughput'] = metrics.throughput
 
     def process(self, request: ConcentFileRequest):
         logger.debug("Processing: %r", request)
@@ -162,18 +275,71 @@ class ConcentFiletransferService(LoopingCallService):
         logger.debug("Uploading file '%s' to '%s' using %s",
                      request.file_path, uri, headers)
 
-        with open(request.file_path, mode='rb') as f:
-            response = requests.post(
-                uri, data=f, headers=headers, **ssl_kwargs(self.variant))
+        session = self._get_session(ftt.storage_cluster_address)
+        metrics = TransferMetrics('upload', request.file_path)
+        response = None
+        try:
+            with open(request.file_path, mode='rb') as f:
+                response = session.post(
+                    uri, data=f, headers=headers, **ssl_kwargs(self.variant))
+            metrics.bytes = os.path.getsize(request.file_path)
+        finally:
+            self._record(metrics, response is not None and response.ok)
         return response
 
     def download(self, request: ConcentFileRequest):
-        uri = self._get_download_uri(request.file_transfer_token,
-                                     request.file_category)
-        headers = self._get_auth_headers(request.file_transfer_token)
-        response = requests.get(
-            uri, stream=True, headers=headers, **ssl_kwargs(self.variant))
-        with open(request.file_path, mode='wb') as f:
-            for chunk in response.iter_content(chunk_size=None):
-                f.write(chunk)
+        ftt = request.file_transfer_token
+        uri = self._get_download_uri(ftt, request.file_category)
+        headers = self._get_auth_headers(ftt)
+        session = self._get_session(ftt.storage_cluster_address)
+        metrics = TransferMetrics('download', request.file_path)
+        response = None
+
+        try:
+            with open(request.file_path, mode='wb') as f:
+                while True:
+                    response = session.get(
+                        uri, stream=True, headers=headers,
+                        **ssl_kwargs(self.variant))
+                    if not response.ok or self._receive(response, f, metrics):
+                        break
+                    if metrics.resumed >= self.max_resumes:
+                        raise ConcentFiletransferError(
+                            'Download of {} interrupted at byte {}'.format(
+                                uri, metrics.bytes))
+                    metrics.resumed += 1
+                    headers['Range'] = 'bytes={}-'.format(metrics.bytes)
+        finally:
+            self._record(metrics, response is not None and response.ok)
         return response
+
+    def _receive(self, response: requests.Response, file: typing.BinaryIO,
+                 metrics: TransferMetrics) -> bool:
+        """ Writes the response body to the file.
+        :return: False if the transfer was interrupted
+        """
+        if response.status_code != 206:
+            # The whole file is being sent
+            file.seek(0)
+            file.truncate()
+            metrics.bytes = 0
+
+        expected = None
+        if 'Content-Encoding' not in response.headers:
+            expected = response.headers.get('Content-Length')
+        received = 0
+
+        try:
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                file.write(chunk)
+                received += len(chunk)
+                metrics.bytes += len(chunk)
+        except (requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.ConnectionError) as e:
+            logger.debug("Download interrupted at byte %d: %r",
+                         metrics.bytes, e)
+            return False
+        finally:
+            response.close()
+
+        return expected is None or received >= int(expected)
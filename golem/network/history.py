@@ -4,8 +4,9 @@ import operator
 import pickle
 import queue
 import threading
+import time
 from functools import reduce, wraps
-from typing import List
+from typing import Dict, List, Tuple
 from typing import Optional
 
 from golem_messages import message
@@ -13,7 +14,7 @@ from peewee import (PeeweeException, DataError, ProgrammingError,
                     NotSupportedError, Field, IntegrityError)
 
 from golem.core.service import IService
-from golem.model import NetworkMessage, Actor
+from golem.model import NetworkMessage, Actor, db
 
 logger = logging.getLogger('golem.network.history')
 
@@ -35,6 +36,10 @@ class MessageHistoryService(IService):
     - NetworkMessages have to be saved ASAP
     - removal and sweeping is not critical and can be slightly delayed
 
+    Queued messages are saved in batches of up to BATCH_SIZE messages, or as
+    many as arrive within BATCH_TIME, in a single transaction. Until then
+    they are returned by get_sync from memory.
+
     Background operations performed by this service do not fit the looping call
     model of golem.core.service.LoopingCallService.
     """
@@ -42,6 +47,10 @@ class MessageHistoryService(IService):
     MESSAGE_LIFETIME = datetime.timedelta(days=1)
     SWEEP_INTERVAL = datetime.timedelta(hours=12)
     QUEUE_TIMEOUT = datetime.timedelta(seconds=2).total_seconds()
+    BATCH_SIZE = 500
+    BATCH_TIME = datetime.timedelta(milliseconds=100).total_seconds()
+    # SQLite limits the number of variables in a single statement
+    INSERT_CHUNK_SIZE = 50
 
     # Decorators (at the end of this file) need to access an instance
     # of MessageHistoryService
@@ -60,6 +69,15 @@ class MessageHistoryService(IService):
         self._remove_queue = queue.Queue()
         self._sweep_ts = datetime.datetime.now()
 
+        # Messages added to the save queue and not stored yet, by id()
+        self._pending: Dict[int, dict] = {}
+        self._pending_lock = threading.Lock()
+        self._stats = {
+            'queue_depth': 0,
+            'batch_size': 0,
+            'commit_time': 0.,
+        }
+
     def run(self) -> None:
         """
         Thread activity method.
@@ -106,7 +124,33 @@ class MessageHistoryService(IService):
         :return: Collection of NetworkMessage
         """
         clauses = cls.build_clauses(**properties)
+        service = cls.instance
+
+        if service is None:
+            return cls._select(clauses)
+
+        # Messages are removed from pending after they are committed, so
+        # reading pending first never misses a message; one committed in
+        # the meantime is found twice and skipped here
+        pending = service._get_pending(  # noqa pylint: disable=protected-access
+            **properties)
+        result = cls._select(clauses)
+
+        if pending:
+            saved = {cls._identity(msg) for msg in result}
+            for msg_dict in pending:
+                msg = NetworkMessage(**msg_dict)
+                if cls._identity(msg) not in saved:
+                    result.append(msg)
+            result.sort(key=operator.attrgetter('msg_date'))
+        return result
 
+    @staticmethod
+    def _identity(msg: NetworkMessage) -> tuple:
+        return msg.node, msg.msg_cls, msg.msg_date, msg.msg_data
+
+    @staticmethod
+    def _select(clauses) -> List[NetworkMessage]:
         result = NetworkMessage.select() \
             .where(reduce(operator.and_, clauses)) \
             .order_by(+NetworkMessage.msg_date)
@@ -127,6 +171,8 @@ class MessageHistoryService(IService):
         :param msg_dict:
         """
         if msg_dict:
+            with self._pending_lock:
+                self._pending[id(msg_dict)] = msg_dict
             self._save_queue.put(msg_dict)
 
     def add_sync(self, msg_dict: dict) -> None:
@@ -145,7 +191,9 @@ class MessageHistoryService(IService):
         except PeeweeException:
             # Temporary error
             logger.warning("Message '%s' save queued", msg_dict.get('msg_cls'))
-            self._save_queue.put(msg_dict)
+            self.add(msg_dict)
+            return
+        self._discard_pending([msg_dict])
 
     def remove(self, task: str, **properties) -> None:
         """
@@ -199,12 +247,111 @@ class MessageHistoryService(IService):
 
         return clauses
 
+    def get_stats(self) -> Dict[str, float]:
+        """
+        :return: Save queue depth, size of the last saved batch and its
+        commit time in seconds
+        """
+        stats = dict(self._stats)
+        stats['queue_depth'] = self._save_queue.qsize()
+        return stats
+
+    def _get_pending(self, **properties) -> List[dict]:
+        """
+        :param properties: NetworkMessage properties to filter (equality)
+        :return: Queued messages that have not been saved yet
+        """
+        properties = {
+            name: value for name, value in properties.items()
+            if isinstance(getattr(NetworkMessage, name, None), Field)
+        }
+        with self._pending_lock:
+            pending = list(self._pending.values())
+        return [
+            msg_dict for msg_dict in pending
+            if all(msg_dict.get(name) == value
+                   for name, value in properties.items())
+        ]
+
+    def _discard_pending(self, msg_dicts: List[dict]) -> None:
+        with self._pending_lock:
+            for msg_dict in msg_dicts:
+                self._pending.pop(id(msg_dict), None)
+
+    @staticmethod
+    def _drain(source: queue.Queue, block: bool, timeout: Optional[float],
+               max_items: int, max_time: float) -> list:
+        """
+        Takes an item (see queue.Queue.get) and then more items that arrive
+        in the queue within max_time, up to max_items in total.
+        """
+        try:
+            items = [source.get(block, timeout)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + max_time
+        while len(items) < max_items:
+            remaining = deadline - time.monotonic()
+            try:
+                items.append(source.get(remaining > 0, max(remaining, 0)))
+            except queue.Empty:
+                break
+        return items
+
+    def _save_batch(self, msg_dicts: List[dict]) -> None:
+        """
+        Saves messages in a single transaction. If that fails, messages are
+        saved one by one, so a single broken message is not going to hold
+        the others back.
+        """
+        started = time.monotonic()
+        try:
+            with db.transaction():
+                for i in range(0, len(msg_dicts), self.INSERT_CHUNK_SIZE):
+                    NetworkMessage.insert_many(
+                        msg_dicts[i:i + self.INSERT_CHUNK_SIZE]
+                    ).execute()
+        except (PeeweeException, TypeError) as exc:
+            logger.warning("Cannot save %d messages at once: %r",
+                           len(msg_dicts), exc)
+            for msg_dict in msg_dicts:
+                # Messages which fail temporarily are queued again
+                self.add_sync(msg_dict)
+        else:
+            # Only after the commit, so that get_sync does not miss them
+            self._discard_pending(msg_dicts)
+
+        commit_time = time.monotonic() - started
+        logger.debug("Saved %d messages in %.3fs", len(msg_dicts),
+                     commit_time)
+        self._stats['batch_size'] = len(msg_dicts)
+        self._stats['commit_time'] = commit_time
+
+    def _remove_batch(self, removals: List[Tuple[str, dict]]) -> None:
+        """
+        Removes messages of multiple tasks in a single transaction, falls
+        back to one by one removal on failure.
+        """
+        try:
+            with db.transaction():
+                for task, properties in removals:
+                    clauses = self.build_clauses(task=task, **properties)
+                    NetworkMessage.delete() \
+                        .where(reduce(operator.and_, clauses)) \
+                        .execute()
+        except (PeeweeException, TypeError) as exc:
+            logger.warning("Cannot remove messages of %d tasks at once: %r",
+                           len(removals), exc)
+            for task, properties in removals:
+                self.remove_sync(task, **properties)
+
     def _loop(self) -> None:
         """
         Main service loop.
         - calls _sweep every SWEEP_INTERVAL
-        - saves queued (1) messages to database (FIFO)
-        - removes queued (2) messages from database
+        - saves queued (1) messages to database (FIFO), in batches
+        - removes queued (2) messages from database, in batches
         """
 
         # Sweep messages.
@@ -215,20 +362,16 @@ class MessageHistoryService(IService):
             self._sweep_ts = now + self.SWEEP_INTERVAL
 
         # Remove messages
-        try:
-            task, parameters = self._remove_queue.get(False)
-        except queue.Empty:
-            pass
-        else:
-            self.remove_sync(task, **parameters)
+        removals = self._drain(self._remove_queue, False, None,
+                               self.BATCH_SIZE, 0)
+        if removals:
+            self._remove_batch(removals)
 
         # Save messages
-        try:
-            msg_dict = self._save_queue.get(True, self._queue_timeout)
-        except queue.Empty:
-            pass
-        else:
-            self.add_sync(msg_dict)
+        msg_dicts = self._drain(self._save_queue, True, self._queue_timeout,
+                                self.BATCH_SIZE, self.BATCH_TIME)
+        if msg_dicts:
+            self._save_batch(msg_dicts)
 
     def _sweep(self) -> None:
         """
@@ -8,7 +8,8 @@ import collections
 
 import requests
 from requests import HTTPError
-from twisted.internet.defer import Deferred
+from requests.adapters import HTTPAdapter
+from twisted.internet.defer import Deferred, DeferredList, DeferredSemaphore
 
 from golem_messages import helpers as msg_helpers
 
@@ -38,6 +39,8 @@ class HyperdriveClient(IClient):
 
     CLIENT_ID = 'hyperg'
     VERSION = 1.1
+    # Maximum number of kept-alive connections to the daemon
+    POOL_SIZE = 8
 
     def __init__(self, port=DEFAULT_HYPERDRIVE_RPC_PORT,
                  host='localhost', timeout=None):
@@ -53,6 +56,14 @@ class HyperdriveClient(IClient):
         self._url = 'http://{}:{}/api'.format(self.host, self.port)
         self._headers = {'content-type': 'application/json'}
 
+        # persistent connections to the daemon
+        self._session = requests.Session()
+        self._session.mount('http://', HTTPAdapter(pool_connections=1,
+                                                   pool_maxsize=self.POOL_SIZE))
+
+    def close(self):
+        self._session.close()
+
     @classmethod
     def build_options(cls, peers=None, **kwargs):
         return HyperdriveClientOptions(cls.CLIENT_ID, cls.VERSION,
@@ -126,10 +137,10 @@ class HyperdriveClient(IClient):
         return response['hash']
 
     def _request(self, **data):
-        response = requests.post(url=self._url,
-                                 headers=self._headers,
-                                 data=json.dumps(data),
-                                 timeout=self.timeout)
+        response = self._session.post(url=self._url,
+                                      headers=self._headers,
+                                      data=json.dumps(data),
+                                      timeout=self.timeout)
 
         try:
             response.raise_for_status()
@@ -203,6 +214,27 @@ class HyperdriveAsyncClient(HyperdriveClient):
             lambda response: response['hash']
         )
 
+    def cancel_many_async(self, content_hashes: Iterable[str],
+                          on_error: Optional[Callable] = None) -> Deferred:
+        """
+        Cancels multiple resources, keeping at most POOL_SIZE requests in
+        flight, so that they are sent over the pooled connections.
+        :param content_hashes: Hashes of resources to cancel
+        :param on_error: Called with a Failure of each failed request
+        :return: Deferred list of (success, result) tuples, fired when all
+        requests are finished
+        """
+        semaphore = DeferredSemaphore(self.POOL_SIZE)
+        deferreds = []
+
+        for content_hash in dict.fromkeys(content_hashes):
+            deferred = semaphore.run(self.cancel_async, content_hash)
+            if on_error:
+                deferred.addErrback(on_error)
+            deferreds.append(deferred)
+
+        return DeferredList(deferreds, consumeErrors=True)
+
     def _async_request(self, params, response_parser):
         from twisted.web.client import readBody  # imports reactor
 
@@ -698,6 +698,12 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):  # no
         """
         return self.task_server.get_others_tasks_headers()
 
+    def add_task_headers(self, task_headers: List[dt_tasks.TaskHeader]):
+        """ Add new task headers to a list of known task headers
+        :return Deferred: fired with a list of results of `add_task_header`
+        """
+        return self.task_server.add_task_headers(task_headers)
+
     def add_task_header(self, task_header: dt_tasks.TaskHeader):
         """ Add new task header to a list of known task headers
         :param dict th_dict_repr: new task header dictionary representation
@@ -1,7 +1,7 @@
-import itertools
+import bisect
+import functools
+import heapq
 import logging
-import math
-import operator
 import random
 import time
 from collections import deque, Counter
@@ -15,6 +15,17 @@ K_SIZE = 512  # pubkey size
 PONG_TIMEOUT = 5  # don't wait for pong longer than this time
 REQUEST_TIMEOUT = 10  # find node requests timeout after this time
 IDLE_REFRESH = 3  # refresh idle buckets after this time
+KEY_CACHE_SIZE = 2 ** 14  # number of parsed keys to keep
+
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+def key_to_num(key):
+    """ Return a hexadecimal key in long format. Keys are parsed once and
+    cached, as the same peers are looked up over and over again.
+    :param hex key: public key in hexadecimal format
+    :return long: public key in long format
+    """
+    return int(key, 16)
 
 
 class PeerKeeper(object):
@@ -32,6 +43,7 @@ class PeerKeeper(object):
         self.concurrency = CONCURRENCY  # parallel find node lookup
         self.k_size = k_size  # pubkey size
         self.buckets = [KBucket(0, 2 ** k_size, self.k)]
+        self._bucket_starts = [0]  # bisectable starts of self.buckets
         self.pong_timeout = PONG_TIMEOUT
         self.request_timeout = REQUEST_TIMEOUT
         self.idle_refresh = IDLE_REFRESH
@@ -51,6 +63,7 @@ class PeerKeeper(object):
         self.key = key
         self.key_num = int(key, 16)
         self.buckets = [KBucket(0, 2 ** self.k_size, self.k)]
+        self._bucket_starts = [0]
         self.expected_pongs = {}
         self.find_requests = {}
         self.sessions_to_end = []
@@ -68,7 +81,7 @@ class PeerKeeper(object):
             logger.warning("Trying to add self to Routing table")
             return
 
-        key_num = int(peer_info.key, 16)
+        key_num = key_to_num(peer_info.key)
 
         bucket = self.bucket_for_peer(key_num)
         peer_to_remove = bucket.add_peer(peer_info)
@@ -79,8 +92,9 @@ class PeerKeeper(object):
             self.expected_pongs[peer_to_remove.key] = (peer_info, time.time())
             return peer_to_remove
 
-        for bucket in self.buckets:
-            logger.debug(str(bucket))
+        if logger.isEnabledFor(logging.DEBUG):
+            for bucket in self.buckets:
+                logger.debug(str(bucket))
         return None
 
     def set_last_message_time(self, key):
@@ -91,13 +105,14 @@ class PeerKeeper(object):
         """
         if not key:
             return
-        if isinstance(key, str):
-            key = key.encode()
+        if isinstance(key, bytes):
+            key_num = int.from_bytes(key, 'big')
+        else:
+            key_num = key_to_num(key)
 
-        for i, bucket in enumerate(self.buckets):
-            if bucket.start <= int(key.hex(), 16) < bucket.end:
-                self.buckets[i].last_updated = time.time()
-                break
+        bucket = self.bucket_for_peer(key_num)
+        if bucket:
+            bucket.last_updated = time.time()
 
     def get_random_known_peer(self):
         """ Return random peer from any bucket
@@ -124,10 +139,13 @@ class PeerKeeper(object):
          should be found
         :return KBucket: bucket containing key in it's range
         """
-        for bucket in self.buckets:
-            if bucket.start <= key_num < bucket.end:
+        idx = bisect.bisect_right(self._bucket_starts, key_num) - 1
+        if idx >= 0:
+            bucket = self.buckets[idx]
+            if key_num < bucket.end:
                 return bucket
         logger.error("Did not find a bucket for {}".format(key_num))
+        return None
 
     def split_bucket(self, bucket):
         """ Split given bucket into two buckets
@@ -135,9 +153,10 @@ class PeerKeeper(object):
         """
         logger.debug("Splitting bucket")
         buck1, buck2 = bucket.split()
-        idx = self.buckets.index(bucket)
+        idx = bisect.bisect_left(self._bucket_starts, bucket.start)
         self.buckets[idx] = buck1
         self.buckets.insert(idx + 1, buck2)
+        self._bucket_starts.insert(idx + 1, buck2.start)
 
     def cnt_distance(self, key):
         """
@@ -146,7 +165,7 @@ class PeerKeeper(object):
         :param hex key: other peer public key
         :return long: distance to other peer
         """
-        return self.key_num ^ int(key, 16)
+        return self.key_num ^ key_to_num(key)
 
     def sync(self):
         """
@@ -173,22 +192,32 @@ class PeerKeeper(object):
         if not alpha:
             alpha = self.concurrency
 
-        def gen_neigh():
-            for bucket in self.buckets_by_id_distance(key_num):
-                for peer in bucket.peers_by_id_distance(key_num):
-                    if int(peer.key, 16) != key_num:
-                        yield peer
-        return list(itertools.islice(gen_neigh(), alpha))
+        # Distances from key_num to peers of different buckets lie in
+        # disjoint ranges, so buckets are visited in the order of their
+        # lowest possible distance and only until alpha peers are found
+        bucket_heap = [(bucket.min_distance(key_num), i)
+                       for i, bucket in enumerate(self.buckets)]
+        heapq.heapify(bucket_heap)
+
+        neighbours = []
+        while bucket_heap and len(neighbours) < alpha:
+            _, i = heapq.heappop(bucket_heap)
+            peers = (p for p in self.buckets[i].peers
+                     if key_to_num(p.key) != key_num)
+            neighbours.extend(heapq.nsmallest(
+                alpha - len(neighbours), peers,
+                key=lambda p: node_id_distance(p, key_num)))
+        return neighbours
 
     def buckets_by_id_distance(self, key_num):
         """
         Return list of buckets sorted by distance from given key.
-        Bucket middle range element will be taken into account
+        The lowest distance to any key from the bucket range is taken
+        into account
         :param long key_num: given key in long format
         :return list: sorted buckets list
         """
-        return sorted(
-            self.buckets, key=operator.methodcaller('id_distance', key_num))
+        return sorted(self.buckets, key=lambda b: b.min_distance(key_num))
 
     def get_estimated_network_size(self) -> int:
         """
@@ -200,7 +229,7 @@ class PeerKeeper(object):
             representations of peer's key and own key which is equivalent to the
             position of the first '1' in (peer_key XOR own_key)"""
             return self.k_size \
-                - int(math.log2(node_id_distance(peer, self.key_num))) - 1
+                - node_id_distance(peer, self.key_num).bit_length()
 
         def filter_outliers(data, m=2.0):
             """ Simple median-based outlier detection """
@@ -230,7 +259,7 @@ class PeerKeeper(object):
     def __remove_old_expected_pongs(self):
         cur_time = time.time()
         for key, (replacement, time_) in list(self.expected_pongs.items()):
-            key_num = int(key, 16)
+            key_num = key_to_num(key)
             if cur_time - time_ > self.pong_timeout:
                 peer_info = self.bucket_for_peer(key_num).remove_peer(key_num)
                 if peer_info:
@@ -253,8 +282,8 @@ class PeerKeeper(object):
 
     def __remove_old_requests(self):
         cur_time = time.time()
-        for key_num, _ in list(self.find_requests.items()):
-            if cur_time - time.time() > self.request_timeout:
+        for key_num, time_ in list(self.find_requests.items()):
+            if cur_time - time_ > self.request_timeout:
                 del self.find_requests[key_num]
 
 
@@ -266,11 +295,11 @@ def node_id_distance(node_info, key_num):
     :param long key_num: other node public key in long format
     :return long: distance between two peers
     """
-    return int(node_info.key, 16) ^ key_num
+    return key_to_num(node_info.key) ^ key_num
 
 
 def key_distance(key, second_key):
-    return int(key, 16) ^ int(second_key, 16)
+    return key_to_num(key) ^ key_to_num(second_key)
 
 
 class KBucket(object):
@@ -299,7 +328,7 @@ class KBucket(object):
         :return Node|None: oldest peer in a bucket, if a new peer hasn't been
          added or None otherwise
         """
-        logger.debug("KBucket adding peer {}".format(peer))
+        logger.debug("KBucket adding peer %s", peer)
         self.last_updated = time.time()
         old_peer = None
         for p in self.peers:
@@ -324,7 +353,7 @@ class KBucket(object):
          None otherwise
         """
         for peer in self.peers:
-            if int(peer.key, 16) == key_num:
+            if key_to_num(peer.key) == key_num:
                 self.peers.remove(peer)
                 return peer
         return None
@@ -334,7 +363,16 @@ class KBucket(object):
         :param long key_num:  other node public key in long format
         :return long: distance from a middle of this bucket to a given key
         """
-        return math.floor((self.start + self.end) / 2) ^ key_num
+        return ((self.start + self.end) // 2) ^ key_num
+
+    def min_distance(self, key_num):
+        """ Return the lowest distance from a key in this bucket range to
+        a given key. Bucket ranges are aligned to their size, so keys of
+        different buckets are at disjoint ranges of distances.
+        :param long key_num: other node public key in long format
+        :return long: lowest distance from this bucket to a given key
+        """
+        return (self.start ^ key_num) & ~(self.end - self.start - 1)
 
     def peers_by_id_distance(self, key_num):
         return sorted(self.peers, key=lambda p: node_id_distance(p, key_num))
@@ -344,11 +382,11 @@ class KBucket(object):
         :return (KBucket, KBucket): two buckets that were created from this
          bucket
         """
-        midpoint = (self.start + self.end) / 2
+        midpoint = (self.start + self.end) // 2
         lower = KBucket(self.start, midpoint, self.k)
         upper = KBucket(midpoint, self.end, self.k)
         for peer in self.peers:
-            if int(peer.key, 16) < midpoint:
+            if key_to_num(peer.key) < midpoint:
                 lower.add_peer(peer)
             else:
                 upper.add_peer(peer)
@@ -75,6 +75,12 @@ class PeerSession(BasicSafeSession):
         self.conn_id = None
         self.metadata = None
 
+        # Versions of task headers that the peer already has, because they
+        # were sent to or received from it: task_id -> (signature, expiry).
+        # Expired headers are sent again, in case the peer has dropped them
+        self.known_headers: typing.Dict[
+            str, typing.Tuple[typing.Optional[bytes], float]] = {}
+
         # Verification by challenge not a random value
         self.solve_challenge = False
         self.challenge = None
@@ -340,6 +346,10 @@ class PeerSession(BasicSafeSession):
     def _react_to_get_tasks(self, msg):
         my_tasks = self.p2p_service.get_own_tasks_headers()
         other_tasks = self.p2p_service.get_others_tasks_headers()
+        self._forget_headers(my_tasks, other_tasks)
+        # Only headers that are new or changed for the peer are sent
+        my_tasks = self._unknown_headers(my_tasks)
+        other_tasks = self._unknown_headers(other_tasks)
         if not my_tasks and not other_tasks:
             return
 
@@ -361,16 +371,48 @@ class PeerSession(BasicSafeSession):
         except TypeError:
             logger.debug("Unexpected format of other task list %r", other_tasks)
 
+        self._remember_headers(tasks_to_send)
         self.send(message.p2p.Tasks(tasks=tasks_to_send))
 
+    def _remember_headers(self, headers):
+        expires = time.time() + variables.TASK_HEADERS_RESEND_INTERVAL
+        for t in headers:
+            self.known_headers[t.task_id] = (t.signature, expires)
+
+    def _unknown_headers(self, headers):
+        if headers is None:
+            return headers
+        now = time.time()
+        unknown = []
+        for t in headers:
+            signature, expires = self.known_headers.get(t.task_id, (None, 0))
+            if signature != t.signature or expires <= now:
+                unknown.append(t)
+        return unknown
+
+    def _forget_headers(self, *header_lists):
+        """ Forget headers of tasks that are no longer known to this node """
+        if not self.known_headers:
+            return
+        task_ids = {t.task_id for headers in header_lists if headers
+                    for t in headers}
+        self.known_headers = {task_id: known for task_id, known
+                              in self.known_headers.items()
+                              if task_id in task_ids}
+
     def _react_to_tasks(self, msg):
         logger.debug("Running handler for `Tasks`. msg=%r", msg)
         for t in msg.tasks:
             logger.debug("Task information received. task header: %r", t)
-            if not self.p2p_service.add_task_header(t):
-                self.disconnect(
-                    message.base.Disconnect.REASON.BadProtocol
-                )
+        self._remember_headers(msg.tasks)
+        deferred = self.p2p_service.add_task_headers(msg.tasks)
+        deferred.addCallback(self._tasks_added)
+
+    def _tasks_added(self, results):
+        if not all(results):
+            self.disconnect(
+                message.base.Disconnect.REASON.BadProtocol
+            )
 
     def _react_to_remove_task(self, msg):
         if not self._verify_remove_task(msg):
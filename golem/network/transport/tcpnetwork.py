@@ -12,6 +12,7 @@ from twisted.internet.protocol import connectionDone
 
 from golem.core.databuffer import DataBuffer
 from golem.core.hostaddress import get_host_addresses
+from golem.monitor import metrics
 from golem.network.transport.limiter import CallRateLimiter
 from .network import Network, SessionProtocol, IncomingProtocolFactoryWrapper, \
     OutgoingProtocolFactoryWrapper
@@ -296,6 +297,7 @@ class BasicProtocol(SessionProtocol):
 
         self.transport.getHandle()
         self.transport.write(msg_to_send)
+        metrics.MESSAGES_SENT.inc(type=msg.__class__.__name__)
 
         return True
 
@@ -358,7 +360,10 @@ class BasicProtocol(SessionProtocol):
         self.db.append_bytes(data)
         mess = self._data_to_messages()
         for m in mess:
+            started = time.monotonic()
             self.session.interpret(m)
+            metrics.MESSAGE_HANDLING_SECONDS.observe(
+                time.monotonic() - started, type=m.__class__.__name__)
 
     def _load_message(self, data):
         msg = golem_messages.load(data, None, None)
@@ -371,18 +376,21 @@ class BasicProtocol(SessionProtocol):
     def _data_to_messages(self):
         messages = []
 
-        for data in self.db.get_len_prefixed_bytes():
-            if len(data) > MAX_MESSAGE_SIZE:
+        # Frames are memoryviews into the receive buffer; a copy is made
+        # only for messages that pass the size and spam checks
+        for frame in self.db.get_len_prefixed_views():
+            if len(frame) > MAX_MESSAGE_SIZE:
                 logger.info(
                     'Ignoring huge message %dB from %r',
-                    len(data),
+                    len(frame),
                     self.transport.getPeer(),
                 )
                 continue
 
             try:
-                if not self.spam_protector.check_msg(data):
+                if not self.spam_protector.check_msg(frame):
                     continue
+                data = frame.tobytes()
                 msg = self._load_message(data)
             except golem_messages.exceptions.HeaderError as e:
                 logger.debug(
@@ -410,12 +418,12 @@ class BasicProtocol(SessionProtocol):
                     {
                         'e': e,
                         'peer': self.transport.getPeer(),
-                        'data': data,
+                        'data': frame.tobytes(),
                     },
                 )
                 logger.debug(
                     "BasicProtocol._data_to_messages() failed %r",
-                    data,
+                    frame.tobytes(),
                     exc_info=True,
                 )
                 continue
@@ -1,5 +1,9 @@
 import datetime
 import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set
 
 from peewee import IntegrityError
 
@@ -12,114 +16,196 @@ logger = logging.getLogger(__name__)
 
 REQUESTOR_FORGETTING_FACTOR = 0.9
 PROVIDER_FORGETTING_FACTOR = 0.9
+# How often cached trust increments are written to the database (in seconds)
+LOCAL_RANK_FLUSH_INTERVAL = 10
+
+
+class LocalRankCache:
+    """ Write-behind cache of LocalRank rows.
+
+    Reads are served from an LRU of LocalRank instances, so that trust
+    checks do not hit the database. Trust counter increments are applied to
+    cached instances right away and accumulated in memory; flush() writes
+    them in a single transaction, with one statement per node.
+    """
+
+    def __init__(self, max_size: int = 10000,
+                 max_pending: int = 1000) -> None:
+        self._ranks = OrderedDict()  # type: OrderedDict
+        self._pending = {}  # type: Dict[str, Dict[str, float]]
+        self._lock = threading.RLock()
+        self._max_size = max_size
+        self._max_pending = max_pending
+
+    def get(self, node_id: str) -> Optional[LocalRank]:
+        with self._lock:
+            try:
+                self._ranks.move_to_end(node_id)
+                return self._ranks[node_id]
+            except KeyError:
+                pass
+
+            rank = LocalRank.select() \
+                .where(LocalRank.node_id == node_id).first()
+            deltas = self._pending.get(node_id)
+            if deltas:
+                rank = self._apply(node_id, rank, deltas)
+
+            self._store(node_id, rank)
+            return rank
+
+    def increase(self, node_id: str, counter: str, trust_mod: float) -> None:
+        with self._lock:
+            deltas = self._pending.setdefault(node_id, {})
+            deltas[counter] = deltas.get(counter, 0.0) + trust_mod
+
+            if node_id in self._ranks:
+                self._ranks[node_id] = self._apply(
+                    node_id, self._ranks[node_id], {counter: trust_mod})
+
+            if len(self._pending) >= self._max_pending:
+                self.flush()
+
+    def invalidate(self, node_id: str) -> None:
+        with self._lock:
+            self._ranks.pop(node_id, None)
+
+    @contextmanager
+    def updating(self, node_id: str):
+        """ Guards updates of a LocalRank row made outside of the cache """
+        with self._lock:
+            try:
+                yield
+            finally:
+                self.invalidate(node_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ranks.clear()
+            self._pending.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            try:
+                with db.transaction():
+                    existing = self._existing(list(pending))
+                    for node_id, deltas in pending.items():
+                        if node_id in existing:
+                            self._update(node_id, deltas)
+                        else:
+                            self._create(node_id, deltas)
+            except Exception:
+                for node_id, deltas in pending.items():
+                    current = self._pending.setdefault(node_id, {})
+                    for counter, value in deltas.items():
+                        current[counter] = current.get(counter, 0.0) + value
+                raise
+
+            logger.debug('Flushed local ranks of %d nodes', len(pending))
+
+    @staticmethod
+    def _existing(node_ids: List[str], chunk_size: int = 500) -> Set[str]:
+        existing = set()  # type: Set[str]
+        for i in range(0, len(node_ids), chunk_size):
+            chunk = node_ids[i:i + chunk_size]
+            query = LocalRank.select(LocalRank.node_id) \
+                .where(LocalRank.node_id.in_(chunk))
+            existing.update(rank.node_id for rank in query)
+        return existing
+
+    @classmethod
+    def _create(cls, node_id: str, deltas: Dict[str, float]) -> None:
+        try:
+            with db.atomic():
+                LocalRank.create(node_id=node_id, **deltas)
+        except IntegrityError:
+            # Created concurrently, outside of the cache
+            cls._update(node_id, deltas)
+
+    @staticmethod
+    def _update(node_id: str, deltas: Dict[str, float]) -> None:
+        values = {
+            getattr(LocalRank, counter): getattr(LocalRank, counter) + value
+            for counter, value in deltas.items()
+        }
+        values[LocalRank.modified_date] = str(datetime.datetime.now())
+        LocalRank.update(values) \
+            .where(LocalRank.node_id == node_id).execute()
+
+    @staticmethod
+    def _apply(node_id: str, rank: Optional[LocalRank],
+               deltas: Dict[str, float]) -> LocalRank:
+        if rank is None:
+            rank = LocalRank(node_id=node_id)
+        for counter, value in deltas.items():
+            setattr(rank, counter, getattr(rank, counter) + value)
+        return rank
+
+    def _store(self, node_id: str, rank: Optional[LocalRank]) -> None:
+        self._ranks[node_id] = rank
+        while len(self._ranks) > self._max_size:
+            self._ranks.popitem(last=False)
+
+
+local_rank_cache = LocalRankCache()
 
 
 def increase_positive_computed(node_id, trust_mod):
     logger.debug('increase_positive_computed. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_computed=LocalRank.positive_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_cache.increase(node_id, 'positive_computed', trust_mod)
 
 
 def increase_negative_computed(node_id, trust_mod):
     logger.debug('increase_negative_computed. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_computed=LocalRank.negative_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_cache.increase(node_id, 'negative_computed', trust_mod)
 
 
 def increase_wrong_computed(node_id, trust_mod):
     logger.debug('increase_wrong_computed. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, wrong_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(wrong_computed=LocalRank.wrong_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_cache.increase(node_id, 'wrong_computed', trust_mod)
 
 
 def increase_positive_requested(node_id, trust_mod):
     logger.debug('increase_positive_requested. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_requested=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_requested=LocalRank.positive_requested + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_cache.increase(node_id, 'positive_requested', trust_mod)
 
 
 def increase_negative_requested(node_id, trust_mod):
     logger.debug('increase_negative_requested. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_requested=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_requested=LocalRank.negative_requested + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_cache.increase(node_id, 'negative_requested', trust_mod)
 
 
 def increase_positive_payment(node_id, trust_mod):
     logger.debug('increase_positive_payment. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_payment=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_payment=LocalRank.positive_payment + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_cache.increase(node_id, 'positive_payment', trust_mod)
 
 
 def increase_negative_payment(node_id, trust_mod):
     logger.debug('increase_negative_payment. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_payment=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_payment=LocalRank.negative_payment + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_cache.increase(node_id, 'negative_payment', trust_mod)
 
 
 def increase_positive_resource(node_id, trust_mod):
     logger.debug('increase_positive_resource. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_resource=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_resource=LocalRank.positive_resource + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_cache.increase(node_id, 'positive_resource', trust_mod)
 
 
 def increase_negative_resource(node_id, trust_mod):
     logger.debug('increase_negative_resource. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_resource=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_resource=LocalRank.negative_resource + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_cache.increase(node_id, 'negative_resource', trust_mod)
 
 
 def _calculate_efficiency(efficiency: float,
@@ -146,7 +232,7 @@ def update_requestor_efficiency(node_id: str,
                                 computation_time: float,
                                 performance: float,
                                 min_performance: float) -> None:
-    with db.transaction():
+    with local_rank_cache.updating(node_id), db.transaction():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         efficiency = rank.requestor_efficiency
 
@@ -169,14 +255,14 @@ def get_requestor_assigned_sum(node_id: str) -> int:
 
 def update_requestor_assigned_sum(node_id: str, amount: int) -> None:
 
-    with db.transaction():
+    with local_rank_cache.updating(node_id), db.transaction():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         rank.requestor_assigned_sum += amount
         rank.save()
 
 
 def update_requestor_paid_sum(node_id: str, amount: int) -> None:
-    with db.transaction():
+    with local_rank_cache.updating(node_id), db.transaction():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         rank.requestor_paid_sum += amount
         rank.save()
@@ -198,7 +284,7 @@ def update_provider_efficiency(node_id: str,
                                timeout: float,
                                computation_time: float) -> None:
 
-    with db.transaction():
+    with local_rank_cache.updating(node_id), db.transaction():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         efficiency = rank.provider_efficiency
 
@@ -215,7 +301,7 @@ def get_provider_efficacy(node_id: str) -> ProviderEfficacy:
 
 def update_provider_efficacy(node_id: str, op: SubtaskOp) -> None:
 
-    with db.transaction():
+    with local_rank_cache.updating(node_id), db.transaction():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         rank.provider_efficacy.update(op)
         rank.save()
@@ -238,10 +324,11 @@ def upsert_global_rank(node_id, comp_trust, req_trust, comp_weight, req_weight):
 
 
 def get_local_rank(node_id):
-    return LocalRank.select().where(LocalRank.node_id == node_id).first()
+    return local_rank_cache.get(node_id)
 
 
 def get_local_rank_for_all():
+    local_rank_cache.flush()
     return LocalRank.select()
 
 
@@ -0,0 +1,180 @@
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from golem.core.simplehash import SimpleHash
+
+logger = logging.getLogger(__name__)
+
+# How often a changed cache is written to the dump file (in seconds)
+HASH_CACHE_SAVE_INTERVAL = 60
+
+# (size, mtime_ns, inode)
+FileStat = Tuple[int, int, int]
+
+
+class FileHashCache:
+    """ Caches base64-encoded SHA-1 hashes of files, so that unchanged
+    resources are not rehashed every time a resource header is built.
+
+    Entries are keyed on the file path and validated with the file's size,
+    modification time and inode. Files modified less than `racy_period`
+    seconds ago are hashed but not cached, since a subsequent change within
+    the same mtime tick would go unnoticed.
+    :param dump_file: File to persist the cache to
+    :param max_entries: Maximum number of cached files
+    :param max_workers: Number of threads hashing files in parallel
+    """
+
+    CLASS_VERSION = 1
+    racy_period = 2.0
+    batch_size = 64
+
+    def __init__(self,
+                 dump_file: Optional[str] = None,
+                 max_entries: int = 100000,
+                 max_workers: Optional[int] = None) -> None:
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._dump_file = dump_file
+        self._max_entries = max_entries
+        self._max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+
+        if dump_file:
+            self.load(dump_file)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, dump_file: str) -> None:
+        self._dump_file = dump_file
+        try:
+            with open(dump_file, 'rb') as f:
+                version, entries = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except (EOFError, IOError, ValueError, pickle.UnpicklingError) as e:
+            logger.info("File hash cache not loaded: %s", e)
+            return
+
+        if version != self.CLASS_VERSION:
+            logger.info("File hash cache not loaded: unsupported version: %s",
+                        version)
+            return
+
+        with self._lock:
+            self._entries = entries
+            self._dirty = False
+
+    def save(self) -> None:
+        """ Writes the cache to the dump file, if it has changed. The dump is
+        written to a temporary file and renamed, so a crash never leaves a
+        partially written dump.
+        """
+        if not self._dump_file or not self._dirty:
+            return
+
+        with self._save_lock:
+            with self._lock:
+                entries = self._entries.copy()
+                self._dirty = False
+
+            dump_dir = os.path.dirname(self._dump_file) or '.'
+            fd, tmp_file = tempfile.mkstemp(dir=dump_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump((self.CLASS_VERSION, entries), f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self._dump_file)
+            except OSError as e:
+                logger.warning("Cannot save file hash cache: %s", e)
+                self._dirty = True
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    def get(self, path: str) -> str:
+        return self.get_many([path])[path]
+
+    def get_many(self, paths: Iterable[str]) -> Dict[str, str]:
+        """ Returns hashes of given files. Files missing from the cache are
+        hashed in a thread pool.
+        :raises OSError: when any of the files cannot be read
+        """
+        hashes = {}
+        missing = {}
+
+        for path in paths:
+            if path in hashes or path in missing:
+                continue
+            stat = self._stat(path)
+            hsh = self._lookup(path, stat)
+            if hsh is None:
+                missing[path] = stat
+            else:
+                hashes[path] = hsh
+
+        paths = list(missing)
+        if len(paths) > 1:
+            # Submit files in batches, since small files are hashed faster
+            # than a future is scheduled
+            batch = max(1, min(self.batch_size,
+                               len(paths) // self._max_workers))
+            batches = [paths[i:i + batch] for i in range(0, len(paths), batch)]
+            workers = min(self._max_workers, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                computed = [hsh for batch_hashes in
+                            executor.map(self._hash_files, batches)
+                            for hsh in batch_hashes]
+        else:
+            computed = self._hash_files(paths)
+
+        for path, hsh in zip(paths, computed):
+            hashes[path] = hsh
+            self._store(path, missing[path], hsh)
+
+        return hashes
+
+    @staticmethod
+    def _hash_files(paths: List[str]) -> List[str]:
+        return [SimpleHash.hash_file_base64(path) for path in paths]
+
+    def _lookup(self, path: str, stat: FileStat) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != stat:
+                return None
+            self._entries.move_to_end(path)
+            return entry[1]
+
+    def _store(self, path: str, stat: FileStat, hsh: str) -> None:
+        if stat[1] > (time.time() - self.racy_period) * 10 ** 9:
+            return
+
+        with self._lock:
+            self._entries[path] = (stat, hsh)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    @staticmethod
+    def _stat(path: str) -> FileStat:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+hash_cache = FileHashCache()
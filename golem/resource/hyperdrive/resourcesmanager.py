@@ -114,9 +114,10 @@ class HyperdriveResourceManager(ClientHandler):
                                 "task '{}'".format(task_id))
 
         on_error = partial(log_error, "Error removing task: %r")
-        for resource in resources:
-            self.client.cancel_async(resource.hash) \
-                .addErrback(on_error)
+        return self.client.cancel_many_async(
+            (resource.hash for resource in resources),
+            on_error=on_error
+        )
 
     @handle_async(on_error=partial(log_error, "Error adding task: %r"))
     def add_task(self, files, task_id,  # pylint: disable=too-many-arguments
@@ -7,11 +7,24 @@ import zipfile
 
 from golem.core.simplehash import SimpleHash
 from golem.resource.dirmanager import split_path
+from golem.resource.hashcache import hash_cache
 
 
 logger = logging.getLogger(__name__)
 
 
+def scan_dir(path):
+    """ Returns names of directories and files in the given directory """
+    dirs, files = [], []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                dirs.append(entry.name)
+            elif entry.is_file():
+                files.append(entry.name)
+    return dirs, files
+
+
 class TaskResourceHeader():
     def __init__(self, dir_name):
         self.sub_dir_headers = []
@@ -41,6 +54,7 @@ class TaskResourceHeader():
         cur_th = TaskResourceHeader(dir_name)
 
         abs_dirs = split_path(absolute_root)
+        hashes = hash_cache.get_many(chosen_files)
 
         for f in chosen_files:
 
@@ -58,37 +72,41 @@ class TaskResourceHeader():
                     last_header.sub_dir_headers.append(child_sub_dir_header)
                     last_header = child_sub_dir_header
 
-            hsh = SimpleHash.hash_file_base64(f)
-            last_header.files_data.append((file_name, hsh))
+            last_header.files_data.append((file_name, hashes[f]))
 
         return cur_th
 
     @classmethod
     def __build(cls, dir_name, absolute_root, chosen_files=None):
-        cur_th = TaskResourceHeader(dir_name)
+        if chosen_files:
+            chosen_files = set(chosen_files)
 
-        dirs = [name for name in os.listdir(absolute_root) if os.path.isdir(os.path.join(absolute_root, name))]
-        files = [name for name in os.listdir(absolute_root) if os.path.isfile(os.path.join(absolute_root, name))]
+        pending = []
+        cur_th = cls.__build_tree(dir_name, absolute_root, chosen_files,
+                                  pending)
 
-        files_data = []
-        for f in files:
-            if chosen_files and os.path.join(absolute_root, f) not in chosen_files:
-                continue
-            hsh = SimpleHash.hash_file_base64(os.path.join(absolute_root, f))
+        hashes = hash_cache.get_many(path for _, _, path in pending)
+        for files_data, file_name, path in pending:
+            files_data.append((file_name, hashes[path]))
 
-            files_data.append((f, hsh))
+        return cur_th
 
-        # print "{}, {}, {}".format(relative_root, absolute_root, files_data)
+    @classmethod
+    def __build_tree(cls, dir_name, absolute_root, chosen_files, pending):
+        """ Builds the header without file hashes. Files to hash are appended
+        to `pending` as (files_data, file name, path) tuples, in order. """
+        cur_th = TaskResourceHeader(dir_name)
+        dirs, files = scan_dir(absolute_root)
 
-        cur_th.files_data = files_data
+        for f in files:
+            path = os.path.join(absolute_root, f)
+            if chosen_files and path not in chosen_files:
+                continue
+            pending.append((cur_th.files_data, f, path))
 
-        sub_dir_headers = []
         for d in dirs:
-            child_sub_dir_header = cls.__build(d, os.path.join(absolute_root, d), chosen_files)
-            sub_dir_headers.append(child_sub_dir_header)
-
-        cur_th.sub_dir_headers = sub_dir_headers
-        # print "{} {} {}\n".format(absolute_root, len(sub_dir_headers), len(files_data))
+            cur_th.sub_dir_headers.append(cls.__build_tree(
+                d, os.path.join(absolute_root, d), chosen_files, pending))
 
         return cur_th
 
@@ -99,6 +117,7 @@ class TaskResourceHeader():
         cur_th = TaskResourceHeader(header.dir_name)
 
         abs_dirs = split_path(absolute_root)
+        hashes = hash_cache.get_many(chosen_files)
 
         for file_ in chosen_files:
 
@@ -110,7 +129,7 @@ class TaskResourceHeader():
 
             last_header, last_ref_header, ref_header_found = cls.__resolve_dirs(dirs, last_header, last_ref_header)
 
-            hsh = SimpleHash.hash_file_base64(file_)
+            hsh = hashes[file_]
             if ref_header_found:
                 if last_ref_header.__has_file(file_name):
                     if hsh == last_ref_header.__get_file_hash(file_name):
@@ -126,6 +145,7 @@ class TaskResourceHeader():
         cur_th = TaskResourceHeader(header.dir_name)
         abs_dirs = split_path(absolute_root)
         delta_parts = []
+        hashes = hash_cache.get_many(res_parts)
 
         for file_, parts in res_parts.items():
             dir_, file_name = os.path.split(file_)
@@ -136,7 +156,7 @@ class TaskResourceHeader():
 
             last_header, last_ref_header, ref_header_found = cls.__resolve_dirs(dirs, last_header, last_ref_header)
 
-            hsh = SimpleHash.hash_file_base64(file_)
+            hsh = hashes[file_]
             if ref_header_found:
                 if last_ref_header.__has_file(file_name):
                     if hsh == last_ref_header.__get_file_hash(file_name):
@@ -152,32 +172,37 @@ class TaskResourceHeader():
         if not isinstance(header, TaskResourceHeader):
             raise TypeError("Incorrect header type: {}. Should be TaskResourceHeader".format(type(header)))
 
+        if chosen_files:
+            chosen_files = set(chosen_files)
+
+        return cls.__build_header_delta_from_header(header, absolute_root,
+                                                    chosen_files)
+
+    @classmethod
+    def __build_header_delta_from_header(cls, header, absolute_root,
+                                         chosen_files):
         cur_tr = TaskResourceHeader(header.dir_name)
 
-        dirs = [name for name in os.listdir(absolute_root) if os.path.isdir(os.path.join(absolute_root, name))]
-        files = [name for name in os.listdir(absolute_root) if os.path.isfile(os.path.join(absolute_root, name))]
+        dirs, files = scan_dir(absolute_root)
 
         for d in dirs:
             if header.__has_sub_header(d):
                 cur_tr.sub_dir_headers.append(
-                    cls.build_header_delta_from_header(header.__get_sub_header(d), os.path.join(absolute_root, d),
-                                                       chosen_files))
+                    cls.__build_header_delta_from_header(header.__get_sub_header(d), os.path.join(absolute_root, d),
+                                                         chosen_files))
             else:
                 cur_tr.sub_dir_headers.append(cls.__build(d, os.path.join(absolute_root, d), chosen_files))
 
-        for f in files:
-            if chosen_files and os.path.join(absolute_root, f) not in chosen_files:
-                continue
-
-            file_hash = 0
-            if header.__has_file(f):
-                file_hash = SimpleHash.hash_file_base64(os.path.join(absolute_root, f))
+        files = [f for f in files if not chosen_files
+                 or os.path.join(absolute_root, f) in chosen_files]
+        hashes = hash_cache.get_many(os.path.join(absolute_root, f)
+                                     for f in files)
 
-                if file_hash == header.__get_file_hash(f):
-                    continue
+        for f in files:
+            file_hash = hashes[os.path.join(absolute_root, f)]
 
-            if not file_hash:
-                file_hash = SimpleHash.hash_file_base64(os.path.join(absolute_root, f))
+            if header.__has_file(f) and file_hash == header.__get_file_hash(f):
+                continue
 
             cur_tr.files_data.append((f, file_hash))
 
@@ -250,8 +275,7 @@ class TaskResource(object):
     def __build(cls, dir_name, absolute_root):
         cur_th = TaskResource(dir_name)
 
-        dirs = [name for name in os.listdir(absolute_root) if os.path.isdir(os.path.join(absolute_root, name))]
-        files = [name for name in os.listdir(absolute_root) if os.path.isfile(os.path.join(absolute_root, name))]
+        dirs, files = scan_dir(absolute_root)
 
         files_data = []
         for f in files:
@@ -354,8 +378,7 @@ class TaskResource(object):
 
         cur_tr = TaskResource(header.dir_name)
 
-        dirs = [name for name in os.listdir(absolute_root) if os.path.isdir(os.path.join(absolute_root, name))]
-        files = [name for name in os.listdir(absolute_root) if os.path.isfile(os.path.join(absolute_root, name))]
+        dirs, files = scan_dir(absolute_root)
 
         for d in dirs:
             if d in [sdh.dir_name for sdh in header.sub_dir_headers]:
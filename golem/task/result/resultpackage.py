@@ -1,4 +1,6 @@
 import binascii
+import hashlib
+import io
 import uuid
 import zipfile
 from typing import Iterable, Optional, List, Dict
@@ -6,7 +8,7 @@ from typing import Iterable, Optional, List, Dict
 import abc
 import os
 
-from golem.core.fileencrypt import AESFileEncryptor
+from golem.core.fileencrypt import AESFileEncryptor, AESCTRFileEncryptor
 from golem.core.fileshelper import common_dir, relative_path
 from golem.core.printable_object import PrintableObject
 from golem.core.simplehash import SimpleHash
@@ -137,10 +139,42 @@ class ZipPackager(Packager):
                     directories and files, unsupported object: {path}")
 
 
+class TeeWriter(io.RawIOBase):
+    """ Non-seekable stream writing data to multiple streams at once and
+    computing the SHA-1 of everything written """
+
+    def __init__(self, *streams) -> None:
+        super().__init__()
+        self._streams = streams
+        self._sha1 = hashlib.sha1()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def write(self, b):
+        for stream in self._streams:
+            stream.write(b)
+        self._sha1.update(b)
+        self._position += len(b)
+        return len(b)
+
+    def hexdigest(self) -> str:
+        return self._sha1.hexdigest()
+
+
 class EncryptingPackager(Packager):
+    """ Creates packages encrypted with AESCTRFileEncryptor. The plain
+    package is written and encrypted in a single pass; packages encrypted
+    with legacy_encryptor_class can still be extracted. """
 
     creator_class = ZipPackager
-    encryptor_class = AESFileEncryptor
+    encryptor_class = AESCTRFileEncryptor
+    legacy_encryptor_class = AESFileEncryptor
+    buffer_size = AESCTRFileEncryptor.buffer_size
 
     def __init__(self, secret):
         self._packager = self.creator_class()
@@ -150,21 +184,51 @@ class EncryptingPackager(Packager):
                output_path: str,
                disk_files: Iterable[str]):
 
+        if not disk_files:
+            raise ValueError('No files to pack')
+
         tmp_file_path = self.package_name(output_path)
         backup_rename(tmp_file_path)
 
-        pkg_file_path, pkg_sha1 = super().create(tmp_file_path, disk_files)
+        disk_files = self._prepare_file_dict(disk_files)
 
-        self.encryptor_class.encrypt(pkg_file_path, output_path,
-                                     secret=self._secret)
-        return output_path, pkg_sha1
+        try:
+            with open(tmp_file_path, 'wb',
+                      buffering=self.buffer_size) as plain, \
+                    self.encryptor_class.writer(output_path, self._secret,
+                                                self.buffer_size) as encrypted:
+                tee = TeeWriter(plain, encrypted)
+                with self.generator(tee) as of:
+                    for file_path, file_name in disk_files.items():
+                        self.write_disk_file(of, file_path, file_name)
+        except BaseException:
+            for path in (tmp_file_path, output_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+        return output_path, tee.hexdigest()
 
     def extract(self, input_path, output_dir=None):
+        if not self.encryptor_class.is_encrypted(input_path):
+            return self._extract_legacy(input_path, output_dir)
+
+        if not output_dir:
+            output_dir = os.path.dirname(input_path)
+
+        with self.encryptor_class.reader(input_path, self._secret,
+                                         self.buffer_size) as src:
+            result = self._packager.extract(src, output_dir=output_dir)
+
+        os.remove(input_path)
+        return result
+
+    def _extract_legacy(self, input_path, output_dir=None):
         tmp_file_path = self.package_name(input_path)
         backup_rename(tmp_file_path)
 
-        self.encryptor_class.decrypt(input_path, tmp_file_path,
-                                     secret=self._secret)
+        self.legacy_encryptor_class.decrypt(input_path, tmp_file_path,
+                                            secret=self._secret)
         os.remove(input_path)
 
         return self._packager.extract(tmp_file_path, output_dir=output_dir)
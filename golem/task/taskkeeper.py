@@ -1,12 +1,16 @@
 import datetime
+import hashlib
+import itertools
 import logging
+import os
 import pathlib
 import pickle
+import threading
 import time
 import typing
 
 import random
-from collections import Counter
+from collections import Counter, OrderedDict
 
 from eth_utils import decode_hex
 from golem_messages import (
@@ -132,24 +136,82 @@ class CompTaskKeeper:
             tasks_path.mkdir()
         self.dump_path = tasks_path / "comp_task_keeper.pickle"
         self.persist = persist
+        # Only one dump runs at a time; changes made meanwhile are written
+        # by the running dump once it finishes
+        self._dump_pending = False
+        self._dumping = False
+        self._dump_lock = threading.Lock()
+        self._write_lock = threading.Lock()
         self.restore()
 
     def dump(self):
         if not self.persist:
             return
-        golem_async.async_run(golem_async.AsyncRequest(self._dump_tasks))
+        with self._dump_lock:
+            self._dump_pending = True
+            if self._dumping:
+                return
+            self._dumping = True
+        golem_async.async_run(
+            golem_async.AsyncRequest(self._dump_pending_tasks))
+
+    def dump_pending(self):
+        """ Synchronously write changes not written to disk yet """
+        with self._dump_lock:
+            if not self._dump_pending:
+                return
+            self._dump_pending = False
+        self._try_dump_tasks()
+
+    def _dump_pending_tasks(self):
+        while True:
+            with self._dump_lock:
+                if not self._dump_pending:
+                    self._dumping = False
+                    return
+                self._dump_pending = False
+            if not self._try_dump_tasks():
+                with self._dump_lock:
+                    self._dumping = False
+                return
+
+    def _try_dump_tasks(self) -> bool:
+        try:
+            self._dump_tasks()
+        except Exception:  # pylint: disable=broad-except
+            # Pickling may fail when the keeper is modified at the same
+            # time; the changes are written again with the next dump
+            logger.warning('Problem writing dumpfile: %s', self.dump_path,
+                           exc_info=True)
+            with self._dump_lock:
+                self._dump_pending = True
+            return False
+        return True
 
     def _dump_tasks(self):
+        """ The dump is written to a temporary file and renamed, so a crash
+        never leaves a partially written dump.
+        """
         logger.debug('COMPTASK DUMP: %s', self.dump_path)
-        with self.dump_path.open('wb') as f:
-            dump_data = (
-                self.active_tasks,
-                self.subtask_to_task,
-                self.task_package_paths,
-                self.active_task_offers,
-                self.resources_options
-            )
-            pickle.dump(dump_data, f)
+        tmp_path = self.dump_path.with_name(self.dump_path.name + '.tmp')
+        with self._write_lock:
+            try:
+                with tmp_path.open('wb') as f:
+                    dump_data = (
+                        self.active_tasks,
+                        self.subtask_to_task,
+                        self.task_package_paths,
+                        self.active_task_offers,
+                        self.resources_options
+                    )
+                    pickle.dump(dump_data, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(str(tmp_path), str(self.dump_path))
+            except Exception:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+                raise
 
     def restore(self):
         if not self.persist:
@@ -317,6 +379,114 @@ class CompTaskKeeper:
         return self.task_package_paths.get(task_id, None)
 
 
+class HeaderSignatureCache:
+    """ Bounded LRU of task headers with verified signatures.
+
+    Peers keep sending the same headers, so a header identical to one
+    verified before does not need to be verified again. Headers are keyed
+    by a digest of the whole pickled header together with its signature and
+    owner key, so a header modified in any way is verified again.
+    """
+
+    def __init__(self, max_size: int = 10000) -> None:
+        self._keys: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_size = max_size
+
+    @staticmethod
+    def key(header: dt_tasks.TaskHeader) -> tuple:
+        digest = hashlib.sha256(pickle.dumps(header, protocol=2)).digest()
+        return digest, header.signature, header.task_owner.key
+
+    def __contains__(self, key: tuple) -> bool:
+        with self._lock:
+            if key not in self._keys:
+                return False
+            self._keys.move_to_end(key)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: tuple) -> None:
+        with self._lock:
+            self._keys[key] = None
+            self._keys.move_to_end(key)
+            while len(self._keys) > self._max_size:
+                self._keys.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+
+
+class RandomAccessSet:
+    """ Set of task ids with O(1) addition, removal, membership test and
+    random sampling. Items are kept in a list; removed items are swapped
+    with the last one, so the list order is arbitrary.
+    """
+
+    # Number of random picks tried before excluded items are filtered out
+    sample_attempts = 8
+
+    def __init__(self, items: typing.Iterable[str] = ()) -> None:
+        self._items: typing.List[str] = []
+        self._index: typing.Dict[str, int] = {}
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item) -> bool:
+        return item in self._index
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._items)
+
+    def __getitem__(self, index: int) -> str:
+        return self._items[index]
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self._items)
+
+    def add(self, item: str) -> None:
+        if item not in self._index:
+            self._index[item] = len(self._items)
+            self._items.append(item)
+
+    def discard(self, item: str) -> None:
+        index = self._index.pop(item, None)
+        if index is None:
+            return
+        last = self._items.pop()
+        if index < len(self._items):
+            self._items[index] = last
+            self._index[last] = index
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._index.clear()
+
+    def choice(
+            self,
+            exclude: typing.Optional[typing.Container[str]] = None
+    ) -> typing.Optional[str]:
+        """ Returns a random item which is not excluded or None """
+        if not self._items:
+            return None
+        if not exclude:
+            return random.choice(self._items)
+
+        for _ in range(self.sample_attempts):
+            item = random.choice(self._items)
+            if item not in exclude:
+                return item
+
+        items = [item for item in self._items if item not in exclude]
+        return random.choice(items) if items else None
+
+
 class TaskHeaderKeeper:
     """Keeps information about tasks living in Golem Network. Node may
        choose one of those task to compute or will pass information
@@ -336,14 +506,14 @@ class TaskHeaderKeeper:
         # all computing tasks that this node knows about
         self.task_headers: typing.Dict[str, dt_tasks.TaskHeader] = {}
         # ids of tasks that this node may try to compute
-        self.supported_tasks = []
+        self.supported_tasks = RandomAccessSet()
         # results of tasks' support checks
         self.support_status = {}
         # tasks that were removed from network recently, so they won't
-        # be added again to task_headers
-        self.removed_tasks = {}
-        # task ids by owner
-        self.tasks_by_owner: typing.Dict[str, set] = {}
+        # be added again to task_headers, ordered by remove time
+        self.removed_tasks: typing.Dict[str, float] = OrderedDict()
+        # task ids by owner, from the least recently checked
+        self.tasks_by_owner: typing.Dict[str, OrderedDict] = {}
         # Keep track which tasks were checked when
         self.last_checking: typing.Dict[str, datetime.datetime] = {}
 
@@ -453,12 +623,12 @@ class TaskHeaderKeeper:
         if config_desc.min_price == self.min_price:
             return
         self.min_price = config_desc.min_price
-        self.supported_tasks = []
+        self.supported_tasks.clear()
         for id_, th in self.task_headers.items():
             supported = self.check_support(th)
             self.support_status[id_] = supported
             if supported:
-                self.supported_tasks.append(id_)
+                self.supported_tasks.add(id_)
             if self.task_archiver:
                 self.task_archiver.add_support_status(id_, supported)
 
@@ -482,7 +652,7 @@ class TaskHeaderKeeper:
                 if header.timestamp < old_header.timestamp:
                     return True  # We already have a newer version
 
-            if task_id in self.removed_tasks:  # recent
+            if self._recently_removed(task_id):
                 logger.debug("Received a task which has been already "
                              "cancelled/removed/timeout/banned/etc "
                              "Task id %s .", task_id)
@@ -491,7 +661,9 @@ class TaskHeaderKeeper:
             self.task_headers[task_id] = header
             self.last_checking[task_id] = datetime.datetime.now()
 
-            self._get_tasks_by_owner_set(header.task_owner.key).add(task_id)
+            owner_tasks = self._get_tasks_by_owner_set(header.task_owner.key)
+            owner_tasks[task_id] = None
+            owner_tasks.move_to_end(task_id)
 
             self.update_supported_set(header)
 
@@ -513,15 +685,15 @@ class TaskHeaderKeeper:
         support = self.check_support(header)
         self.support_status[task_id] = support
 
-        if not support and task_id in self.supported_tasks:
-            self.supported_tasks.remove(task_id)
-        if support and task_id not in self.supported_tasks:
+        if not support:
+            self.supported_tasks.discard(task_id)
+        elif task_id not in self.supported_tasks:
             logger.info(
                 "Adding task %r support=%r",
                 task_id,
                 support
             )
-            self.supported_tasks.append(task_id)
+            self.supported_tasks.add(task_id)
 
     @staticmethod
     def check_owner(task_id: str, owner_id: str) -> None:
@@ -529,9 +701,9 @@ class TaskHeaderKeeper:
             raise WrongOwnerException(
                 "Task_id %s doesn't match task owner %s", task_id, owner_id)
 
-    def _get_tasks_by_owner_set(self, owner_key_id):
+    def _get_tasks_by_owner_set(self, owner_key_id) -> OrderedDict:
         if owner_key_id not in self.tasks_by_owner:
-            self.tasks_by_owner[owner_key_id] = set()
+            self.tasks_by_owner[owner_key_id] = OrderedDict()
 
         return self.tasks_by_owner[owner_key_id]
 
@@ -541,12 +713,10 @@ class TaskHeaderKeeper:
         if len(owner_task_set) <= self.max_tasks_per_requestor:
             return
 
-        by_age = sorted(owner_task_set,
-                        key=lambda tid: self.last_checking[tid])
-
-        # leave alone the first (oldest) max_tasks_per_requestor
-        # headers, remove the rest
-        to_remove = by_age[self.max_tasks_per_requestor:]
+        # tasks are kept in the order they were checked in, so leave alone
+        # the first (oldest) max_tasks_per_requestor headers, remove the rest
+        to_remove = list(itertools.islice(
+            owner_task_set, self.max_tasks_per_requestor, None))
 
         logger.warning("Too many tasks from %s, dropping %d tasks",
                        owner_key_id, len(to_remove))
@@ -558,40 +728,33 @@ class TaskHeaderKeeper:
         """ Removes task with given id from a list of known task headers.
         return: False if task was already removed
         """
-        if task_id in self.removed_tasks:
+        if self._recently_removed(task_id):
             return False
 
-        try:
-            owner_key_id = self.task_headers[task_id].task_owner.key
-            self.tasks_by_owner[owner_key_id].discard(task_id)
-        except KeyError:
-            pass
-
-        for container in (
-                self.task_headers,
-                self.supported_tasks,
-                self.support_status,
-                self.last_checking
-        ):
-            if isinstance(container, list):
-                try:
-                    container.remove(task_id)
-                except ValueError:
-                    pass
-                continue
-            if isinstance(container, dict):
-                try:
-                    del container[task_id]
-                except KeyError:
-                    pass
-                continue
-            raise RuntimeError(
-                "Unknown container type {}".format(type(container)),
-            )
+        header = self.task_headers.pop(task_id, None)
+        if header is not None:
+            owner_key_id = header.task_owner.key
+            owner_tasks = self.tasks_by_owner.get(owner_key_id, {})
+            owner_tasks.pop(task_id, None)
+            if not owner_tasks:
+                self.tasks_by_owner.pop(owner_key_id, None)
+
+        self.supported_tasks.discard(task_id)
+        self.support_status.pop(task_id, None)
+        self.last_checking.pop(task_id, None)
 
         self.removed_tasks[task_id] = time.time()
         return True
 
+    def _recently_removed(self, task_id) -> bool:
+        remove_time = self.removed_tasks.get(task_id)
+        if remove_time is None:
+            return False
+        if time.time() - remove_time > self.removed_task_timeout:
+            del self.removed_tasks[task_id]
+            return False
+        return True
+
     def get_owner(self, task_id) -> typing.Optional[str]:
         """ Returns key_id of task owner or None if there is no information
         about this task.
@@ -610,28 +773,39 @@ class TaskHeaderKeeper:
         :return: None if there are no tasks that this node may want to compute
         """
         logger.debug("`get_task` called. exclude=%r", exclude)
-        tasks = self.supported_tasks
-        if exclude:
-            tasks = [t for t in tasks if t not in exclude]
-        if not tasks:
+        task_id = self.supported_tasks.choice(exclude)
+        if task_id is None:
             logger.debug("`get_task`: no potential task candidates found.")
             return None
-        task_id = random.choice(tasks)
         logger.debug("`get_task`: task candidate found. task_id=%r", task_id)
         return self.task_headers[task_id]
 
     def remove_old_tasks(self):
-        for t in list(self.task_headers.values()):
-            cur_time = common.get_timestamp_utc()
-            if cur_time > t.deadline:
-                logger.warning("Task owned by %s dies, task_id: %s",
-                               t.task_owner.key, t.task_id)
-                self.remove_task_header(t.task_id)
-
-        for task_id, remove_time in list(self.removed_tasks.items()):
-            cur_time = time.time()
-            if cur_time - remove_time > self.removed_task_timeout:
-                del self.removed_tasks[task_id]
+        for task_id in list(self.task_headers):
+            self.remove_task_if_expired(task_id)
+
+        self.forget_removed_tasks()
+
+    def remove_task_if_expired(self, task_id) -> bool:
+        """ Removes the task header if its deadline has passed.
+        return: True if the header has been removed
+        """
+        t = self.task_headers.get(task_id)
+        if t is None or common.get_timestamp_utc() <= t.deadline:
+            return False
+        logger.warning("Task owned by %s dies, task_id: %s",
+                       t.task_owner.key, t.task_id)
+        return self.remove_task_header(t.task_id)
+
+    def forget_removed_tasks(self):
+        """ Allows tasks removed more than removed_task_timeout seconds ago
+        to be added again """
+        cur_time = time.time()
+        while self.removed_tasks:
+            task_id, remove_time = next(iter(self.removed_tasks.items()))
+            if cur_time - remove_time <= self.removed_task_timeout:
+                break
+            del self.removed_tasks[task_id]
 
     def get_unsupport_reasons(self):
         """
@@ -1,12 +1,15 @@
+import heapq
+import itertools
 import logging
 import os
 import pickle
 import shutil
+import threading
 import time
 import uuid
 from functools import partial
 from pathlib import Path
-from typing import Optional, Dict, List, Iterable
+from typing import Optional, Dict, List, Iterable, Set, Tuple
 from zipfile import ZipFile
 
 from golem_messages.message import ComputeTaskDef
@@ -80,6 +83,14 @@ class TaskManager(TaskEventListener):
     class AlreadyRestartedError(Error):
         pass
 
+    # Task updates are written to disk in the background; all updates of
+    # a task that arrive within this many seconds are coalesced into one dump
+    DUMP_DELAY = 2.0
+
+    # The deadline heap is rebuilt when it holds this many more entries than
+    # there are indexed deadlines
+    DEADLINES_COMPACT_SLACK = 64
+
     def __init__(
             self, node, keys_auth, root_path,
             tasks_dir="tasks", task_persistence=True,
@@ -99,6 +110,20 @@ class TaskManager(TaskEventListener):
         self.subtask2task_mapping: Dict[str, str] = {}
 
         self.task_persistence = task_persistence
+        self._dirty_tasks: Set[str] = set()
+        self._dump_call = None
+        self._dump_deferred: Optional[Deferred] = None
+        self._dump_lock = threading.Lock()
+
+        # Deadlines of active tasks and of their computed subtasks, see
+        # check_timeouts(). The heap holds (deadline, seq, task_id,
+        # subtask_id) entries, subtask_id being None for the task deadline;
+        # entries no longer found in the index are skipped when popped.
+        self._deadlines: List[Tuple[float, int, str, Optional[str]]] = []
+        self._deadline_index: Dict[str, Dict[Optional[str], float]] = {}
+        self._deadline_seq = itertools.count()
+        self._indexed_deadlines = 0
+        self._last_timeouts_check_time = 0.0
 
         tasks_dir = Path(tasks_dir)
         self.tasks_dir = tasks_dir / "tmanager"
@@ -227,13 +252,20 @@ class TaskManager(TaskEventListener):
         return self.tasks_dir / ('%s.pickle' % (task_id,))
 
     def dump_task(self, task_id: str) -> None:
+        """ Write the task to disk now. The dump is written to a temporary
+        file and renamed, so a crash never leaves a partially written dump.
+        """
         logger.debug('DUMP TASK %r', task_id)
         filepath = self._dump_filepath(task_id)
+        tmp_filepath = self.tasks_dir / ('%s.pickle.tmp' % (task_id,))
         try:
             data = self.tasks[task_id], self.tasks_states[task_id]
             logger.debug('DUMPING TASK %r', filepath)
-            with filepath.open('wb') as f:
+            with tmp_filepath.open('wb') as f:
                 pickle.dump(data, f, protocol=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(str(tmp_filepath), str(filepath))
             logger.debug('TASK %s DUMPED in %r', task_id, filepath)
         except Exception as e:
             logger.exception(
@@ -241,10 +273,78 @@ class TaskManager(TaskEventListener):
                 task_id, self.tasks.get(task_id, '<not found>'),
                 self.tasks_states.get(task_id, '<not found>'),
             )
-            if filepath.exists():
-                filepath.unlink()
+            if tmp_filepath.exists():
+                tmp_filepath.unlink()
             raise
 
+    def schedule_dump(self, task_id: str) -> None:
+        """ Mark the task as modified and schedule writing it to disk
+        in a background thread
+        """
+        self._dirty_tasks.add(task_id)
+        self._schedule_dump_call()
+
+    def _schedule_dump_call(self) -> None:
+        # Only one write is in flight at a time; tasks modified meanwhile
+        # are picked up by the next one
+        if self._dump_call is not None or self._dump_deferred is not None:
+            return
+        from twisted.internet import reactor
+        self._dump_call = reactor.callLater(
+            self.DUMP_DELAY,
+            self._dump_dirty_tasks_async,
+        )
+
+    def _dump_dirty_tasks_async(self) -> None:
+        self._dump_call = None
+        task_ids, self._dirty_tasks = self._dirty_tasks, set()
+        if not task_ids:
+            return
+
+        def finished(failed):
+            self._dump_deferred = None
+            if not isinstance(failed, set):
+                logger.error('Task dump failed: %r', failed)
+                failed = task_ids
+            # Pickling may fail when a task is modified at the same time;
+            # such tasks are dumped again with the next write
+            for task_id in task_ids:
+                if task_id not in self.tasks:
+                    # Deleted while being written
+                    self.remove_dump(task_id)
+                elif task_id in failed:
+                    self._dirty_tasks.add(task_id)
+            if self._dirty_tasks:
+                self._schedule_dump_call()
+
+        self._dump_deferred = deferToThread(self._dump_tasks, task_ids)
+        self._dump_deferred.addBoth(finished)
+
+    def _dump_tasks(self, task_ids: Iterable[str]) -> Set[str]:
+        failed = set()
+        with self._dump_lock:
+            for task_id in task_ids:
+                if task_id not in self.tasks:
+                    continue
+                try:
+                    self.dump_task(task_id)
+                except Exception:  # pylint: disable=broad-except
+                    failed.add(task_id)
+        return failed
+
+    def dump_dirty_tasks(self) -> None:
+        """ Synchronously write all modified tasks to disk """
+        if self._dump_call is not None and self._dump_call.active():
+            self._dump_call.cancel()
+        self._dump_call = None
+        task_ids, self._dirty_tasks = self._dirty_tasks, set()
+        self._dirty_tasks = self._dump_tasks(task_ids)
+
+    def quit(self) -> None:
+        if self.task_persistence:
+            self.dump_dirty_tasks()
+        self.comp_task_keeper.dump_pending()
+
     def remove_dump(self, task_id: str):
         filepath = self._dump_filepath(task_id)
         try:
@@ -273,6 +373,10 @@ class TaskManager(TaskEventListener):
         logger.debug('SEARCHING FOR TASKS TO RESTORE')
         broken_paths = set()
         for path in self.tasks_dir.iterdir():
+            if path.suffixes == ['.pickle', '.tmp']:
+                # Leftover of an interrupted dump
+                broken_paths.add(path)
+                continue
             if not path.suffix == '.pickle':
                 continue
             logger.debug('RESTORE TASKS %r', path)
@@ -300,6 +404,9 @@ class TaskManager(TaskEventListener):
 
                     for sub in state.subtask_states.values():
                         self.subtask2task_mapping[sub.subtask_id] = task_id
+                        if sub.subtask_status.is_computed():
+                            self._index_deadline(task_id, sub.subtask_id,
+                                                 sub.deadline)
 
                     logger.debug('TASK %s RESTORED from %r', task_id, path)
 
@@ -803,35 +910,130 @@ class TaskManager(TaskEventListener):
 
     # CHANGE TO RETURN KEY_ID (check IF SUBTASK COMPUTER HAS KEY_ID
     def check_timeouts(self):
+        started = time.time()
+        cur_time = int(get_timestamp_utc())
+
+        expired: Dict[str, List[Optional[str]]] = {}
+        while self._deadlines and self._deadlines[0][0] < cur_time:
+            deadline, _, task_id, subtask_id = heapq.heappop(self._deadlines)
+            if self._deadline_index.get(task_id, {}).get(subtask_id) \
+                    != deadline:
+                continue
+            self._unindex_deadline(task_id, subtask_id)
+            expired.setdefault(task_id, []).append(subtask_id)
+
         nodes_with_timeouts = []
-        for t in list(self.tasks.values()):
-            th = t.header
-            if self.tasks_states[th.task_id].status not in self.activeStatus:
+        for task_id, subtask_ids in expired.items():
+            t = self.tasks.get(task_id)
+            ts = self.tasks_states.get(task_id)
+            if t is None or ts is None or ts.status not in self.activeStatus:
                 continue
-            cur_time = int(get_timestamp_utc())
-            # Check subtask timeout
-            ts = self.tasks_states[th.task_id]
-            for s in list(ts.subtask_states.values()):
-                if s.subtask_status.is_computed():
-                    if cur_time > s.deadline:
-                        logger.info("Subtask %r dies with status %r",
-                                    s.subtask_id,
-                                    s.subtask_status.value)
-                        s.subtask_status = SubtaskStatus.failure
-                        nodes_with_timeouts.append(s.node_id)
-                        t.computation_failed(s.subtask_id)
-                        s.stderr = "[GOLEM] Timeout"
-                        self.notice_task_updated(th.task_id,
-                                                 subtask_id=s.subtask_id,
-                                                 op=SubtaskOp.TIMEOUT)
-            # Check task timeout
-            if cur_time > th.deadline:
-                logger.info("Task %r dies", th.task_id)
-                self.tasks_states[th.task_id].status = TaskStatus.timeout
-                # TODO: t.tell_it_has_timeout()?
-                self.notice_task_updated(th.task_id, op=TaskOp.TIMEOUT)
+            # Subtasks are timed out before their task
+            for subtask_id in sorted(subtask_ids, key=lambda s: s is None):
+                if subtask_id is None:
+                    logger.info("Task %r dies", task_id)
+                    ts.status = TaskStatus.timeout
+                    # TODO: t.tell_it_has_timeout()?
+                    self.notice_task_updated(task_id, op=TaskOp.TIMEOUT)
+                    continue
+
+                s = ts.subtask_states.get(subtask_id)
+                if s is None or not s.subtask_status.is_computed():
+                    continue
+                logger.info("Subtask %r dies with status %r",
+                            s.subtask_id,
+                            s.subtask_status.value)
+                s.subtask_status = SubtaskStatus.failure
+                nodes_with_timeouts.append(s.node_id)
+                t.computation_failed(s.subtask_id)
+                s.stderr = "[GOLEM] Timeout"
+                self.notice_task_updated(task_id,
+                                         subtask_id=s.subtask_id,
+                                         op=SubtaskOp.TIMEOUT)
+
+        self._last_timeouts_check_time = time.time() - started
         return nodes_with_timeouts
 
+    def get_next_timeout(self, task_id: str) -> Optional[float]:
+        """ Return the earliest deadline of the task or one of its computed
+        subtasks, i.e. when check_timeouts() may need to act on the task next.
+        None if the task cannot time out. """
+        task_state = self.tasks_states.get(task_id)
+        deadlines = self._deadline_index.get(task_id)
+        if not deadlines or not task_state \
+                or task_state.status not in self.activeStatus:
+            return None
+        return min(deadlines.values())
+
+    def get_timeouts_stats(self) -> Dict[str, float]:
+        """ Return the size of the deadline index and how long the last
+        check_timeouts() call took, in seconds """
+        return {
+            'indexed_deadlines': self._indexed_deadlines,
+            'heap_size': len(self._deadlines),
+            'last_check_time': self._last_timeouts_check_time,
+        }
+
+    def _index_deadline(self, task_id: str, subtask_id: Optional[str],
+                        deadline: float) -> None:
+        deadlines = self._deadline_index.setdefault(task_id, {})
+        if subtask_id not in deadlines:
+            self._indexed_deadlines += 1
+        deadlines[subtask_id] = deadline
+        heapq.heappush(
+            self._deadlines,
+            (deadline, next(self._deadline_seq), task_id, subtask_id))
+
+    def _unindex_deadline(self, task_id: str,
+                          subtask_id: Optional[str]) -> None:
+        deadlines = self._deadline_index.get(task_id)
+        if not deadlines or subtask_id not in deadlines:
+            return
+        del deadlines[subtask_id]
+        self._indexed_deadlines -= 1
+        if not deadlines:
+            del self._deadline_index[task_id]
+        self._compact_deadlines()
+
+    def _unindex_task_deadlines(self, task_id: str) -> None:
+        deadlines = self._deadline_index.pop(task_id, None)
+        if deadlines:
+            self._indexed_deadlines -= len(deadlines)
+            self._compact_deadlines()
+
+    def _compact_deadlines(self) -> None:
+        """ Drop heap entries of unindexed deadlines once they pile up """
+        if len(self._deadlines) <= \
+                2 * self._indexed_deadlines + self.DEADLINES_COMPACT_SLACK:
+            return
+        self._deadlines = [
+            entry for entry in self._deadlines
+            if self._deadline_index.get(entry[2], {}).get(entry[3])
+            == entry[0]
+        ]
+        heapq.heapify(self._deadlines)
+
+    def _update_deadline_index(self, task_id: str,
+                               subtask_id: Optional[str] = None,
+                               op: Optional[Operation] = None) -> None:
+        if isinstance(op, TaskOp) and op.is_completed():
+            self._unindex_task_deadlines(task_id)
+            return
+
+        if subtask_id and isinstance(op, SubtaskOp) and op not in (
+                SubtaskOp.ASSIGNED,
+                SubtaskOp.RESULT_DOWNLOADING):
+            self._unindex_deadline(task_id, subtask_id)
+
+        # Tasks become active in a number of ways, e.g. when started,
+        # restored or when a subtask of a finished task is restarted
+        task_state = self.tasks_states.get(task_id)
+        if task_state is not None \
+                and task_state.status in self.activeStatus \
+                and None not in self._deadline_index.get(task_id, {}):
+            self._index_deadline(task_id, None,
+                                 self.tasks[task_id].header.deadline)
+
     def get_progresses(self):
         tasks_progresses = {}
 
@@ -917,8 +1119,10 @@ class TaskManager(TaskEventListener):
         self.tasks[task_id].unregister_listener(self)
         del self.tasks[task_id]
         del self.tasks_states[task_id]
+        self._unindex_task_deadlines(task_id)
 
         self.dir_manager.clear_temporary(task_id)
+        self._dirty_tasks.discard(task_id)
         self.remove_dump(task_id)
         if self.finished_cb:
             self.finished_cb()
@@ -1047,6 +1251,7 @@ class TaskManager(TaskEventListener):
 
         (self.tasks_states[ctd['task_id']].
             subtask_states[ctd['subtask_id']]) = ss
+        self._index_deadline(ctd['task_id'], ss.subtask_id, ss.deadline)
 
     def notify_update_task(self, task_id):
         self.notice_task_updated(task_id)
@@ -1075,7 +1280,8 @@ class TaskManager(TaskEventListener):
         :param str subtask_id: if the operation done on the
           task is related to a subtask, id of that subtask
         :param Operation op: performed operation
-        :param bool persist: should the task be persisted now
+        :param bool persist: should the task be persisted; the dump is
+          written in the background, see `schedule_dump`
         """
         # self.save_state()
 
@@ -1086,7 +1292,10 @@ class TaskManager(TaskEventListener):
         )
 
         if persist and self.task_persistence:
-            self.dump_task(task_id)
+            self.schedule_dump(task_id)
+
+        # Before the signal, listeners may ask for the next timeout
+        self._update_deadline_index(task_id, subtask_id, op)
 
         task_state = self.tasks_states.get(task_id)
         dispatcher.send(
@@ -8,8 +8,10 @@ import weakref
 from collections import deque
 from pathlib import Path
 from typing import (
+    Iterable,
     List,
     Optional,
+    Sequence,
     Set)
 
 from golem_messages import exceptions as msg_exceptions
@@ -17,13 +19,16 @@ from golem_messages import message
 from golem_messages.datastructures import p2p as dt_p2p
 from golem_messages.datastructures import tasks as dt_tasks
 from pydispatch import dispatcher
-from twisted.internet.defer import inlineCallbacks
+from twisted.internet.defer import Deferred, inlineCallbacks, succeed
+from twisted.internet.threads import deferToThread
 
 from apps.appsmanager import AppsManager
 from apps.core.task.coretask import CoreTask
 from golem.clientconfigdescriptor import ClientConfigDescriptor
 from golem.core.variables import MAX_CONNECT_SOCKET_ADDRESSES
-from golem.core.common import node_info_str, short_node_id
+from golem.core.common import get_timestamp_utc, node_info_str, \
+    short_node_id
+from golem.core.scheduler import DeadlineScheduler
 from golem.environments.environment import SupportStatus, UnsupportReason
 from golem.marketplace import OfferPool
 from golem.network.transport.network import ProtocolFactory, SessionFactory
@@ -44,7 +49,7 @@ from golem.task.acl import get_acl
 from golem.task.benchmarkmanager import BenchmarkManager
 from golem.task.taskbase import Task, AcceptClientVerdict
 from golem.task.taskconnectionshelper import TaskConnectionsHelper
-from golem.task.taskstate import TaskOp
+from golem.task.taskstate import SubtaskOp, TaskOp
 from golem.task.timer import ProviderTimer
 from golem.utils import decode_hex
 
@@ -52,7 +57,7 @@ from .result.resultmanager import ExtractedPackage
 from .server import resources
 from .server import concent
 from .taskcomputer import TaskComputer
-from .taskkeeper import TaskHeaderKeeper
+from .taskkeeper import HeaderSignatureCache, TaskHeaderKeeper
 from .taskmanager import TaskManager
 from .tasksession import TaskSession
 
@@ -76,6 +81,14 @@ def _calculate_price(min_price: int, requestor_id: str) -> int:
 class TaskServer(
         PendingConnectionsServer,
         resources.TaskResourcesMixin):
+
+    # Minimal delay before sending a result again after a failed attempt
+    RESULT_RETRY_DELAY = 1.0
+    # TaskManager.check_timeouts() compares whole seconds
+    TIMEOUT_MARGIN = 1.0
+    # Task headers with verified signatures, shared by verify_header_sig()
+    verified_headers = HeaderSignatureCache()
+
     def __init__(self,
                  node,
                  config_desc: ClientConfigDescriptor,
@@ -144,6 +157,17 @@ class TaskServer(
         self.resource_handshakes = {}
         self.requested_tasks: Set[str] = set()
 
+        # Deadlines are handled by timers instead of scans in sync_network()
+        self._session_timers = DeadlineScheduler(self._check_session_timeout)
+        self._result_timers = DeadlineScheduler(self._send_waiting_result)
+        self._failure_timers = DeadlineScheduler(self._send_waiting_failure)
+        self._task_timers = DeadlineScheduler(self._check_task_timeouts)
+        self._task_header_timers = DeadlineScheduler(
+            self._check_task_header_deadline)
+        self._comp_task_timers = DeadlineScheduler(
+            self._check_comp_task_deadline)
+        self._schedule_restored_deadlines()
+
         network = TCPNetwork(
             ProtocolFactory(SafeProtocol, self, SessionFactory(TaskSession)),
             use_ipv6)
@@ -167,6 +191,10 @@ class TaskServer(
             self.finished_task_listener,
             signal='golem.taskmanager'
         )
+        dispatcher.connect(
+            self.task_deadline_listener,
+            signal='golem.taskmanager'
+        )
 
     @property
     def all_sessions(self):
@@ -183,12 +211,9 @@ class TaskServer(
                 timeout=timeout,
             ),
             self._sync_pending,
-            self.__send_waiting_results,
             self.task_computer.run,
             self.task_connections_helper.sync,
             self._sync_forwarded_session_requests,
-            self.__remove_old_tasks,
-            self.__remove_old_sessions,
             functools.partial(
                 concent.process_messages_received_from_concent,
                 concent_service=self.client.concent_service,
@@ -253,6 +278,7 @@ class TaskServer(
                 price = min(price, theader.max_price)
                 self.task_manager.add_comp_task_request(
                     theader=theader, price=price)
+                self._schedule_comp_task_deadline(theader.task_id)
                 args = {
                     'node_name': self.config_desc.node_name,
                     'key_id': theader.task_owner.key,
@@ -328,6 +354,8 @@ class TaskServer(
 
             self.create_and_set_result_package(wtr)
             self.results_to_send[subtask_id] = wtr
+            self._result_timers.schedule(
+                subtask_id, last_sending_trial + delay_time)
 
             Trust.REQUESTED.increase(header.task_owner.key)
         else:
@@ -362,10 +390,12 @@ class TaskServer(
                 subtask_id=subtask_id,
                 err_msg=err_msg,
                 owner=header.task_owner)
+            self._failure_timers.schedule(subtask_id, time.time())
 
     def new_connection(self, session):
         if self.active:
             self.task_sessions_incoming.add(session)
+            self._schedule_session_timeout(session)
         else:
             session.disconnect(message.base.Disconnect.REASON.NoMoreMessages)
 
@@ -382,8 +412,51 @@ class TaskServer(
     def get_others_tasks_headers(self) -> List[dt_tasks.TaskHeader]:
         return self.task_keeper.get_all_tasks()
 
-    def add_task_header(self, task_header: dt_tasks.TaskHeader) -> bool:
-        if not self.verify_header_sig(task_header):
+    def add_task_headers(
+            self, task_headers: Iterable[dt_tasks.TaskHeader]) -> Deferred:
+        """ Add headers received from a peer. Signatures of headers not seen
+        before are verified in a batch, in a worker thread; the headers are
+        added in the reactor thread afterwards.
+        :return: Deferred fired with results of `add_task_header` for each
+                 header
+        """
+        task_headers = list(task_headers)
+        keys = [HeaderSignatureCache.key(header) for header in task_headers]
+        unverified = [i for i, key in enumerate(keys)
+                      if key not in self.verified_headers]
+
+        def add(results):
+            verified = [True] * len(task_headers)
+            for i, result in zip(unverified, results):
+                verified[i] = result
+            return [self.add_task_header(header, verified=result)
+                    for header, result in zip(task_headers, verified)]
+
+        def failed(failure):
+            logger.error("Adding task headers failed: %r", failure.value,
+                         exc_info=(failure.type, failure.value,
+                                   failure.getTracebackObject()))
+            return [False] * len(task_headers)
+
+        if not unverified:
+            deferred = succeed([])
+        else:
+            deferred = deferToThread(
+                self.verify_header_sigs,
+                [task_headers[i] for i in unverified],
+                [keys[i] for i in unverified],
+            )
+        return deferred.addCallback(add).addErrback(failed)
+
+    def add_task_header(self, task_header: dt_tasks.TaskHeader,
+                        verified: Optional[bool] = None) -> bool:
+        """
+        :param verified: result of a signature check already made by the
+                         caller; the signature is checked here when None
+        """
+        if verified is None:
+            verified = self.verify_header_sig(task_header)
+        if not verified:
             logger.info(
                 'Invalid signature task_header:%r, signature: %r',
                 task_header,
@@ -401,13 +474,25 @@ class TaskServer(
                     task_header.task_owner.key == self.node.key:
                 return True  # Own tasks are not added to task keeper
 
-            return self.task_keeper.add_task_header(task_header)
+            added = self.task_keeper.add_task_header(task_header)
+            if task_header.task_id in self.task_keeper.task_headers:
+                self._task_header_timers.schedule(
+                    task_header.task_id,
+                    self.task_keeper.task_headers[task_header.task_id]
+                    .deadline,
+                )
+            return added
         except Exception:  # pylint: disable=broad-except
             logger.exception("Task header validation failed")
             return False
 
     @classmethod
-    def verify_header_sig(cls, header: dt_tasks.TaskHeader):
+    def verify_header_sig(cls, header: dt_tasks.TaskHeader,
+                          key: Optional[tuple] = None) -> bool:
+        if key is None:
+            key = HeaderSignatureCache.key(header)
+        if key in cls.verified_headers:
+            return True
         try:
             header.verify(public_key=decode_hex(header.task_owner.key))
         except msg_exceptions.CryptoError:
@@ -417,8 +502,18 @@ class TaskServer(
                 exc_info=True,
             )
             return False
+        cls.verified_headers.add(key)
         return True
 
+    @classmethod
+    def verify_header_sigs(
+            cls, headers: Sequence[dt_tasks.TaskHeader],
+            keys: Optional[Sequence[tuple]] = None) -> List[bool]:
+        if keys is None:
+            keys = [None] * len(headers)
+        return [cls.verify_header_sig(header, key)
+                for header, key in zip(headers, keys)]
+
     def remove_task_header(self, task_id) -> bool:
         self.requested_tasks.discard(task_id)
         return self.task_keeper.remove_task_header(task_id)
@@ -427,6 +522,7 @@ class TaskServer(
         self.task_sessions[subtask_id] = session
 
     def remove_task_session(self, task_session: TaskSession):
+        self._session_timers.cancel(weakref.ref(task_session))
         self.remove_pending_conn(task_session.conn_id)
         self.remove_responses(task_session.conn_id)
 
@@ -462,17 +558,21 @@ class TaskServer(
         return self.client.resource_port
 
     def task_result_sent(self, subtask_id):
+        self._result_timers.cancel(subtask_id)
         return self.results_to_send.pop(subtask_id, None)
 
     def retry_sending_task_result(self, subtask_id):
         wtr = self.results_to_send.get(subtask_id, None)
         if wtr:
             wtr.already_sending = False
+            self._schedule_result_retry(wtr)
 
     def change_config(self, config_desc, run_benchmarks=False):
         PendingConnectionsServer.change_config(self, config_desc)
         self.config_desc = config_desc
         self.last_message_time_threshold = config_desc.task_session_timeout
+        for session in self.all_sessions:
+            self._schedule_session_timeout(session)
         self.task_keeper.change_config(config_desc)
         return self.task_computer.change_config(
             config_desc, run_benchmarks=run_benchmarks)
@@ -671,6 +771,10 @@ class TaskServer(
 
     def quit(self):
         self.task_computer.quit()
+        for timers in (self._session_timers, self._result_timers,
+                       self._failure_timers, self._task_timers,
+                       self._task_header_timers, self._comp_task_timers):
+            timers.cancel_all()
 
     def remove_responses(self, conn_id):
         self.response_list.pop(conn_id, None)
@@ -924,10 +1028,11 @@ class TaskServer(
         logger.info("Cannot connect to task {} owner".format(
             waiting_task_result.subtask_id))
 
-        waiting_task_result.lastSendingTrial = time.time()
-        waiting_task_result.delayTime = \
+        waiting_task_result.last_sending_trial = time.time()
+        waiting_task_result.delay_time = \
             self.config_desc.max_results_sending_delay
-        waiting_task_result.alreadySending = False
+        waiting_task_result.already_sending = False
+        self._schedule_result_retry(waiting_task_result)
         self.remove_pending_conn(conn_id)
         self.remove_responses(conn_id)
 
@@ -956,6 +1061,7 @@ class TaskServer(
         session.conn_id = conn_id
         self._mark_connected(conn_id, session.address, session.port)
         self.task_sessions_outgoing.add(session)
+        self._schedule_session_timeout(session)
 
     @classmethod
     def noop(cls, *args, **kwargs):
@@ -986,74 +1092,149 @@ class TaskServer(
                        "the verification result for %s to the provider %s",
                        subtask_id, key_id)
 
-    # SYNC METHODS
+    # DEADLINES
     #############################
-    def __remove_old_tasks(self):
-        self.task_keeper.remove_old_tasks()
-        self.task_manager.comp_task_keeper.remove_old_tasks()
+    def task_deadline_listener(self, event='default', task_id=None,
+                               subtask_id=None, op=None, **_kwargs):
+        if event != 'task_status_updated' or task_id is None:
+            return
+        if task_id not in self.task_manager.tasks:
+            return
+
+        if isinstance(op, TaskOp):
+            self._schedule_task_timeouts(task_id)
+        elif op is SubtaskOp.ASSIGNED and subtask_id:
+            # Only bring the deadline forward; _check_task_timeouts() finds
+            # the next one after each check
+            task_state = self.task_manager.tasks_states[task_id]
+            subtask_state = task_state.subtask_states.get(subtask_id)
+            if subtask_state is not None:
+                self._task_timers.schedule_earlier(
+                    task_id, subtask_state.deadline + self.TIMEOUT_MARGIN)
+
+    def _schedule_restored_deadlines(self):
+        for task_id in list(self.task_manager.tasks):
+            self._schedule_task_timeouts(task_id)
+        for task_id in list(self.task_manager.comp_task_keeper.active_tasks):
+            self._schedule_comp_task_deadline(task_id)
+        for task_id, header in list(self.task_keeper.task_headers.items()):
+            self._task_header_timers.schedule(task_id, header.deadline)
+
+    def _schedule_task_timeouts(self, task_id):
+        deadline = self.task_manager.get_next_timeout(task_id)
+        if deadline is None:
+            self._task_timers.cancel(task_id)
+        else:
+            self._task_timers.schedule(task_id,
+                                       deadline + self.TIMEOUT_MARGIN)
+
+    def _check_task_timeouts(self, task_id):
         nodes_with_timeouts = self.task_manager.check_timeouts()
         for node_id in nodes_with_timeouts:
             Trust.COMPUTED.decrease(node_id)
+        self._schedule_task_timeouts(task_id)
 
-    def __remove_old_sessions(self):
-        cur_time = time.time()
+    def _check_task_header_deadline(self, task_id):
+        if self.task_keeper.remove_task_if_expired(task_id):
+            self.requested_tasks.discard(task_id)
+            self.task_keeper.forget_removed_tasks()
+            return
+        header = self.task_keeper.task_headers.get(task_id)
+        if header is not None:
+            self._task_header_timers.schedule(task_id, header.deadline)
+
+    def _schedule_comp_task_deadline(self, task_id):
+        comp_task_info = \
+            self.task_manager.comp_task_keeper.active_tasks.get(task_id)
+        if comp_task_info is not None:
+            self._comp_task_timers.schedule(
+                task_id, comp_task_info.keeping_deadline)
+
+    def _check_comp_task_deadline(self, task_id):
+        comp_task_keeper = self.task_manager.comp_task_keeper
+        comp_task_info = comp_task_keeper.active_tasks.get(task_id)
+        if comp_task_info is None:
+            return
+        # The deadline is extended when a subtask is received
+        if comp_task_info.keeping_deadline > get_timestamp_utc():
+            self._schedule_comp_task_deadline(task_id)
+            return
+        comp_task_keeper.remove_old_tasks()
 
-        for session in self.all_sessions:
-            dt = cur_time - session.last_message_time
-            if dt < self.last_message_time_threshold:
-                continue
-            if session.task_computer is not None:
-                session.task_computer.session_timeout()
-            session.dropped()
+    def _schedule_session_timeout(self, session):
+        self._session_timers.schedule(
+            weakref.ref(session),
+            session.last_message_time + self.last_message_time_threshold,
+        )
 
-    def __send_waiting_results(self):
-        for subtask_id in list(self.results_to_send.keys()):
-            wtr = self.results_to_send[subtask_id]
-            now = time.time()
-
-            if not wtr.already_sending:
-                if now - wtr.last_sending_trial > wtr.delay_time:
-                    wtr.already_sending = True
-                    wtr.last_sending_trial = now
-                    session = self.task_sessions.get(subtask_id, None)
-                    if session:
-                        self.__connection_for_task_result_established(
-                            session, session.conn_id, wtr)
-                    else:
-                        args = {'waiting_task_result': wtr}
-                        node = wtr.owner
-                        self._add_pending_request(
-                            TASK_CONN_TYPES['task_result'],
-                            node,
-                            prv_port=node.prv_port,
-                            pub_port=node.pub_port,
-                            args=args
-                        )
-
-        for subtask_id in list(self.failures_to_send.keys()):
-            wtf = self.failures_to_send[subtask_id]
-
-            session = self.task_sessions.get(subtask_id, None)
-            if session:
-                self.__connection_for_task_failure_established(
-                    session, session.conn_id, wtf.owner.key, subtask_id,
-                    wtf.err_msg)
-            else:
-                args = {
-                    'key_id': wtf.owner.key,
-                    'subtask_id': wtf.subtask_id,
-                    'err_msg': wtf.err_msg
-                }
-                node = wtf.owner
-                self._add_pending_request(
-                    TASK_CONN_TYPES['task_failure'],
-                    node,
-                    prv_port=node.prv_port,
-                    pub_port=node.pub_port,
-                    args=args
-                )
+    def _check_session_timeout(self, session_ref):
+        session = session_ref()
+        if session is None or not (session in self.task_sessions_incoming or
+                                   session in self.task_sessions_outgoing):
+            return
+        # Sessions are not rescheduled on each message; check for activity
+        # since the timer was set
+        dt = time.time() - session.last_message_time
+        if dt < self.last_message_time_threshold:
+            self._schedule_session_timeout(session)
+            return
+        if session.task_computer is not None:
+            session.task_computer.session_timeout()
+        session.dropped()
+
+    def _schedule_result_retry(self, wtr):
+        self._result_timers.schedule(
+            wtr.subtask_id,
+            max(wtr.last_sending_trial + wtr.delay_time,
+                time.time() + self.RESULT_RETRY_DELAY),
+        )
+
+    def _send_waiting_result(self, subtask_id):
+        wtr = self.results_to_send.get(subtask_id)
+        if wtr is None or wtr.already_sending:
+            return
+
+        wtr.already_sending = True
+        wtr.last_sending_trial = time.time()
+        session = self.task_sessions.get(subtask_id, None)
+        if session:
+            self.__connection_for_task_result_established(
+                session, session.conn_id, wtr)
+        else:
+            args = {'waiting_task_result': wtr}
+            node = wtr.owner
+            self._add_pending_request(
+                TASK_CONN_TYPES['task_result'],
+                node,
+                prv_port=node.prv_port,
+                pub_port=node.pub_port,
+                args=args
+            )
+
+    def _send_waiting_failure(self, subtask_id):
+        wtf = self.failures_to_send.pop(subtask_id, None)
+        if wtf is None:
+            return
 
-        self.failures_to_send.clear()
+        session = self.task_sessions.get(subtask_id, None)
+        if session:
+            self.__connection_for_task_failure_established(
+                session, session.conn_id, wtf.owner.key, subtask_id,
+                wtf.err_msg)
+        else:
+            args = {
+                'key_id': wtf.owner.key,
+                'subtask_id': wtf.subtask_id,
+                'err_msg': wtf.err_msg
+            }
+            node = wtf.owner
+            self._add_pending_request(
+                TASK_CONN_TYPES['task_failure'],
+                node,
+                prv_port=node.prv_port,
+                pub_port=node.pub_port,
+                args=args
+            )
 
     def verify_results(
             self,
@@ -12,8 +12,12 @@ import pycodestyle
 
 from golem.core.common import get_golem_path, is_windows, is_osx
 from golem.core.simpleenv import get_local_datadir
+from golem.core.statskeeper import stats_cache
 from golem.database import Database
-from golem.model import DB_MODELS, db, DB_FIELDS
+from golem.environments.minperformancemultiplier import \
+    MinPerformanceMultiplier
+from golem.model import DB_MODELS, db, DB_FIELDS, Performance
+from golem.ranking.manager.database_manager import local_rank_cache
 
 logger = logging.getLogger(__name__)
 
@@ -127,6 +131,10 @@ class DatabaseFixture(TempDirFixture):
         super(DatabaseFixture, self).setUp()
         self.database = Database(db, fields=DB_FIELDS, models=DB_MODELS,
                                  db_dir=self.tempdir)
+        local_rank_cache.clear()
+        stats_cache.clear()
+        Performance.invalidate()
+        MinPerformanceMultiplier.invalidate()
 
     def tearDown(self):
         self.database.db.close()
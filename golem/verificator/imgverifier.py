@@ -2,6 +2,8 @@ from __future__ import division
 import logging
 import math
 
+import numpy
+
 from .imgrepr import (ImgRepr, PILImgRepr)
 
 from .verifier import SubtaskVerificationState
@@ -38,18 +40,9 @@ class ImgStatistics(object):
         img1_bw = img1.to_pil().convert('L')  # makes it greyscale
         img2_bw = img2.to_pil().convert('L')  # makes it greyscale
 
-        import numpy
-        npimg1 = numpy.array(img1_bw)
-        npimg2 = numpy.array(img2_bw)
-
-        npimg1 = npimg1.astype(numpy.float32, copy=False)
-        npimg2 = npimg2.astype(numpy.float32, copy=False)
-
-        mse_bw = 0
-        for i in range(len(npimg1)):
-            for j in range(len(npimg1[0])):
-                mse_bw += (npimg1[i][j] - npimg2[i][j]) \
-                          * (npimg1[i][j] - npimg2[i][j])
+        diff = numpy.asarray(img1_bw, dtype=numpy.float64) \
+            - numpy.asarray(img2_bw, dtype=numpy.float64)
+        mse_bw = float(numpy.sum(diff * diff))
 
         mse_bw /= res_x * res_y
 
@@ -60,16 +53,10 @@ class ImgStatistics(object):
         return mse_bw, norm_mse
 
     def _calculate_color_normalized_mse(self, img1, img2):
-        mse = 0
         (res_x, res_y) = img1.get_size()
 
-        for i in range(0, res_x):
-            for j in range(0, res_y):
-                [r1, g1, b1] = img1.get_pixel((i, j))
-                [r2, g2, b2] = img2.get_pixel((i, j))
-                mse += (r1 - r2) * (r1 - r2) + \
-                       (g1 - g2) * (g1 - g2) + \
-                       (b1 - b2) * (b1 - b2)
+        diff = img1.to_numpy().astype(numpy.float64) - img2.to_numpy()
+        mse = float(numpy.sum(diff * diff))
 
         mse /= res_x * res_y * 3
 
@@ -2,6 +2,7 @@
 import array
 import os
 from os import path
+import pickle
 from random import randrange, shuffle
 import tempfile
 import unittest
@@ -110,6 +111,23 @@ class TestBlenderFrameTask(TempDirFixture):
         self.assertEqual(len(self.bt.preview_task_file_path),
                          len(self.bt.frames))
 
+    def test_restore_pickled_without_canvases(self):
+        # Tasks pickled before previews were kept in memory
+        del self.bt.preview_canvases
+        for updater in self.bt.preview_updaters:
+            del updater.canvas
+
+        bt = pickle.loads(pickle.dumps(self.bt))
+
+        assert len(bt.preview_canvases) == len(bt.frames)
+        for updater, preview_path in zip(bt.preview_updaters,
+                                         bt.preview_file_path):
+            assert updater.canvas.path == preview_path
+            assert updater.canvas.size == (updater.preview_res_x,
+                                           updater.preview_res_y)
+            assert bt.preview_canvases[preview_path] is updater.canvas
+        bt.flush_previews()
+
     @mock.patch('apps.core.verification_task.deadline_to_timeout')
     def test_computation_failed_or_finished(self, mock_dtt):
         mock_dtt.return_value = 1.0
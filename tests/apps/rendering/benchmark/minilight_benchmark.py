@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from apps.rendering.benchmark.minilight.src.minilight import \
+    make_calibrated_perf_test, make_multicore_perf_test, make_perf_test
+from golem.core.common import get_golem_path
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+TEST_FILE = os.path.join(get_golem_path(), 'apps', 'rendering', 'benchmark',
+                         'minilight', 'cornellbox.ml.txt')
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_minilight_single_core_speed(benchmark):
+    assert benchmark(make_perf_test, TEST_FILE) > 0.0
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_minilight_all_cores_speed(benchmark):
+    assert benchmark(make_multicore_perf_test, TEST_FILE) > 0.0
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_minilight_calibrated_speed(benchmark):
+    # The default environment benchmark, compare with the single core one
+    single_core, all_cores = benchmark(make_calibrated_perf_test, TEST_FILE)
+    benchmark.extra_info['single_core'] = single_core
+    benchmark.extra_info['all_cores'] = all_cores
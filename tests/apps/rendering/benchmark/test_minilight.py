@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from unittest import TestCase
+from unittest.mock import patch
+
+from apps.rendering.benchmark.minilight.src.minilight import \
+    make_calibrated_perf_test, make_multicore_perf_test, render_tile
+from golem.core.common import get_golem_path
+
+TEST_FILE = path.join(get_golem_path(), 'apps', 'rendering', 'benchmark',
+                      'minilight', 'cornellbox.ml.txt')
+
+
+class TestMinilight(TestCase):
+
+    def test_render_tile(self):
+        samples, start, end = render_tile(TEST_FILE, (3, 5))
+        # 15 pixels wide image, 5 iterations
+        assert samples == 2 * 15 * 5
+        assert end >= start
+
+    def test_make_multicore_perf_test(self):
+        assert make_multicore_perf_test(TEST_FILE, processes=2,
+                                        tile_rows=4) > 0.0
+
+    def test_make_multicore_perf_test_passes(self):
+        with patch('apps.rendering.benchmark.minilight.src.minilight'
+                   '.ProcessPoolExecutor', ThreadPoolExecutor):
+            with patch('apps.rendering.benchmark.minilight.src.minilight'
+                       '.render_tile', wraps=render_tile) as tile:
+                make_multicore_perf_test(TEST_FILE, processes=2, tile_rows=5,
+                                         passes=1)
+        # 15 rows high image
+        assert tile.call_count == 3
+
+    def test_make_calibrated_perf_test(self):
+        single_core, all_cores = make_calibrated_perf_test(TEST_FILE,
+                                                           processes=2)
+        assert single_core > 0.0
+        assert all_cores > 0.0
+
+    def test_make_calibrated_perf_test_single_process(self):
+        with patch('apps.rendering.benchmark.minilight.src.minilight'
+                   '.make_multicore_perf_test') as multicore:
+            single_core, all_cores = make_calibrated_perf_test(TEST_FILE,
+                                                               processes=1)
+        multicore.assert_not_called()
+        assert single_core == all_cores > 0.0
@@ -0,0 +1,76 @@
+import os
+
+import Imath
+import numpy
+import OpenEXR
+import pytest
+from PIL import Image
+
+from apps.rendering.resources.imgcompare import calculate_mse
+from apps.rendering.resources.imgrepr import load_img
+
+RESOLUTION = (800, 600)
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+def calculate_mse_per_pixel(img1, img2):
+    """ Reference implementation, comparing images pixel by pixel """
+    mse = 0
+    (res_x, res_y) = img1.get_size()
+    for i in range(0, res_x):
+        for j in range(0, res_y):
+            [r1, g1, b1] = img1.get_pixel((i, j))
+            [r2, g2, b2] = img2.get_pixel((i, j))
+            mse += (r1 - r2) * (r1 - r2) + \
+                   (g1 - g2) * (g1 - g2) + \
+                   (b1 - b2) * (b1 - b2)
+    return mse / (res_x * res_y * 3)
+
+
+def make_png(path, seed):
+    rand = numpy.random.RandomState(seed)
+    pixels = rand.randint(0, 256, RESOLUTION[::-1] + (3,), numpy.uint8)
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+def make_exr(path, seed):
+    rand = numpy.random.RandomState(seed)
+    header = OpenEXR.Header(*RESOLUTION)
+    header['channels'] = {
+        c: Imath.Channel(Imath.PixelType(Imath.PixelType.FLOAT))
+        for c in "RGB"
+    }
+    exr = OpenEXR.OutputFile(path, header)
+    exr.writePixels({
+        c: rand.rand(*RESOLUTION[::-1]).astype(numpy.float32).tobytes()
+        for c in "RGB"
+    })
+    exr.close()
+    return path
+
+
+@pytest.fixture(params=['png', 'exr'])
+def images(request, tmpdir):
+    make = make_png if request.param == 'png' else make_exr
+    paths = [make(str(tmpdir.join('%d.%s' % (i, request.param))), i)
+             for i in range(2)]
+    return [load_img(path) for path in paths]
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_calculate_mse_speed(benchmark, images):
+    benchmark(calculate_mse, *images)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=1, warmup=False)
+def test_calculate_mse_per_pixel_speed(benchmark, images):
+    result = benchmark(calculate_mse_per_pixel, *images)
+    assert result == pytest.approx(calculate_mse(*images))
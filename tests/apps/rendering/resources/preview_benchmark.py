@@ -0,0 +1,54 @@
+import os
+
+import pytest
+from PIL import Image
+
+from apps.rendering.resources.preview import PreviewCanvas
+
+RESOLUTION = (1280, 720)
+CHUNKS = 100
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+def chunks():
+    height = RESOLUTION[1] // CHUNKS
+    for i in range(CHUNKS):
+        chunk = Image.new("RGB", (RESOLUTION[0], height), (i, i, i))
+        yield chunk, i * height
+
+
+def paste_and_save(path):
+    """ Reference implementation, reopening and saving the file per chunk """
+    for chunk, offset in chunks():
+        if os.path.exists(path):
+            img = Image.open(path)
+        else:
+            img = Image.new("RGB", RESOLUTION)
+        with img:
+            img.paste(chunk, (0, offset))
+            img.save(path, "PNG")
+
+
+def paste_into_canvas(path):
+    canvas = PreviewCanvas(path, RESOLUTION)
+    for chunk, offset in chunks():
+        canvas.image.paste(chunk, (0, offset))
+        canvas.changed()
+    canvas.flush()
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_paste_into_canvas_speed(benchmark, tmpdir):
+    benchmark(paste_into_canvas, str(tmpdir.join('preview.png')))
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=1, warmup=False)
+def test_paste_and_save_speed(benchmark, tmpdir):
+    benchmark(paste_and_save, str(tmpdir.join('preview.png')))
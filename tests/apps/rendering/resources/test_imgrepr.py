@@ -101,6 +101,25 @@ class TestPILImgRepr(TempDirFixture, PEP8MixIn):
         assert p_copy.get_pixel((5, 3)) == [200, 210, 220]
         assert p.get_pixel((5, 3)) == [255, 0, 0]
 
+    def test_numpy(self):
+        img_path = self.temp_file_name('img.png')
+        p = get_pil_img_repr(img_path, (10, 8))
+        p.set_pixel((3, 5), [10, 11, 12])
+
+        array = p.to_numpy()
+        assert array.shape == (8, 10, 3)
+        assert list(array[5, 3]) == [10, 11, 12]
+        assert list(array[3, 5]) == [255, 0, 0]
+        assert np.array_equal(array, ImgRepr.to_numpy(p))
+
+        array = array.astype(np.float64)
+        array[0, 1] = [300.0, -1.0, 20.7]
+        p.load_from_numpy(array)
+        assert p.get_size() == (10, 8)
+        assert p.get_pixel((1, 0)) == [255, 0, 20]
+        assert p.get_pixel((3, 5)) == [10, 11, 12]
+        assert p.get_name() == 'img.png'
+
 
 def almost_equal(v1, v2):
     assert abs(v1 - v2) < 0.001
@@ -182,6 +201,18 @@ class TestExrImgRepr(TempDirFixture, PEP8MixIn):
         assert e_copy.min == 0.0
         assert e_copy.max == 1.0
 
+    def test_numpy(self):
+        img = get_exr_img_repr()
+        array = img.to_numpy()
+        assert array.shape == (10, 10, 3)
+        assert array.dtype == np.float32
+        almost_equal_pixels(array[2, 1], img.get_pixel((1, 2)))
+
+        array[2, 1] = [0.5, 2.0, -1.0]
+        img.load_from_numpy(array)
+        almost_equal_pixels(img.get_pixel((1, 2)), [0.5, 1.0, 0.0])
+        almost_equal_pixels(img.get_pixel((5, 5)), array[5, 5])
+
     def test_to_pil(self):
         e = get_exr_img_repr()
 
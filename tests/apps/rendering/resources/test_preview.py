@@ -0,0 +1,89 @@
+import os
+import pickle
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from apps.rendering.resources.preview import PreviewCanvas
+from golem import testutils
+from golem.testutils import TempDirFixture
+
+
+class TestPEP8(unittest.TestCase, testutils.PEP8MixIn):
+    PEP8_FILES = ['apps/rendering/resources/preview.py']
+
+
+class TestPreviewCanvas(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.preview_path = os.path.join(self.tempdir, "preview.png")
+
+    def _read_pixel(self, xy):
+        with Image.open(self.preview_path) as img:
+            return img.getpixel(xy)
+
+    def test_new_canvas(self):
+        canvas = PreviewCanvas(self.preview_path, (20, 10))
+        assert canvas.is_empty()
+        assert canvas.image.size == (20, 10)
+        assert canvas.image.getpixel((0, 0)) == (0, 0, 0)
+        assert not canvas.is_empty()
+        assert not os.path.exists(self.preview_path)
+
+    def test_load_existing_file(self):
+        Image.new("RGBA", (20, 10), (1, 2, 3, 255)).save(self.preview_path)
+        canvas = PreviewCanvas(self.preview_path, (20, 10))
+        assert not canvas.is_empty()
+        assert canvas.image.mode == "RGB"
+        assert canvas.image.getpixel((5, 5)) == (1, 2, 3)
+
+    def test_changes_are_rate_limited(self):
+        canvas = PreviewCanvas(self.preview_path, (20, 10))
+        canvas.image.paste((255, 0, 0), (0, 0, 20, 5))
+        canvas.changed()
+        assert self._read_pixel((0, 0)) == (255, 0, 0)
+
+        canvas.image.paste((0, 255, 0), (0, 0, 20, 5))
+        canvas.changed()
+        assert self._read_pixel((0, 0)) == (255, 0, 0)
+
+        canvas.flush()
+        assert self._read_pixel((0, 0)) == (0, 255, 0)
+
+        with patch("apps.rendering.resources.preview.time.time",
+                   return_value=canvas._last_flush +
+                   PreviewCanvas.FLUSH_INTERVAL):
+            canvas.image.paste((0, 0, 255), (0, 0, 20, 5))
+            canvas.changed()
+        assert self._read_pixel((0, 0)) == (0, 0, 255)
+
+    def test_replace_and_reset(self):
+        canvas = PreviewCanvas(self.preview_path, (20, 10))
+        canvas.replace(Image.new("RGBA", (20, 10), (7, 7, 7, 255)))
+        assert canvas.image.mode == "RGB"
+        assert self._read_pixel((0, 0)) == (7, 7, 7)
+
+        canvas.reset()
+        assert canvas.image.getpixel((0, 0)) == (0, 0, 0)
+        assert self._read_pixel((0, 0)) == (7, 7, 7)
+        canvas.flush()
+        assert self._read_pixel((0, 0)) == (0, 0, 0)
+
+    def test_flush_without_path(self):
+        canvas = PreviewCanvas(None, (20, 10))
+        canvas.image.paste((1, 1, 1), (0, 0, 20, 10))
+        canvas.changed()
+        canvas.flush()
+
+    def test_pickle_reloads_from_file(self):
+        canvas = PreviewCanvas(self.preview_path, (20, 10))
+        canvas.replace(Image.new("RGB", (20, 10), (9, 9, 9)))
+        canvas.image.paste((200, 0, 0), (0, 0, 20, 10))
+        canvas.changed()
+
+        restored = pickle.loads(pickle.dumps(canvas))
+        assert canvas.image.getpixel((0, 0)) == (200, 0, 0)
+        assert restored.path == self.preview_path
+        assert restored.image.getpixel((0, 0)) == (9, 9, 9)
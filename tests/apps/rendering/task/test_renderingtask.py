@@ -3,6 +3,7 @@ from os import path, remove
 from unittest.mock import Mock, patch, ANY
 
 from golem_messages.factories.datastructures import p2p as dt_p2p_factory
+from PIL import Image
 
 from apps.core.task.coretaskstate import TaskDefinition, TaskState, Options
 from apps.core.task.coretask import logger as core_logger
@@ -108,6 +109,24 @@ class TestRenderingTask(TestDirFixture, LogTestCase):
 
         img.close()
 
+    def test_task_preview_is_flushed_lazily(self):
+        rt = self.task
+        rt.subtasks_given["xxyyzz"] = {"start_task": 2,
+                                       "status": SubtaskStatus.starting}
+        rt._update_task_preview()
+        with Image.open(rt.preview_task_file_path) as img:
+            assert img.getpixel((0, 8)) == (0, 255, 0)
+
+        rt.subtasks_given["xxyyzz"]["status"] = SubtaskStatus.failure
+        rt._update_task_preview()
+        with Image.open(rt.preview_task_file_path) as img:
+            assert img.getpixel((0, 8)) == (0, 255, 0)
+
+        rt.flush_previews()
+        with Image.open(rt.preview_task_file_path) as img:
+            assert img.getpixel((0, 8)) == (255, 0, 0)
+            assert img.getpixel((0, 0)) == (0, 0, 0)
+
     def test_update_task_state(self):
         task = self.task
         state = TaskState()
@@ -294,6 +313,7 @@ class TestRenderingTask(TestDirFixture, LogTestCase):
             ))
 
     def test_update_task_preview_ioerror(self):
+        self.task._open_preview().close()
         e = IOError("test message")
         with patch("PIL.Image.open", side_effect=e), \
                 patch("apps.rendering.task.renderingtask.logger") as logger:
@@ -0,0 +1,45 @@
+import os
+import random
+import struct
+
+import pytest
+
+from golem.core.databuffer import DataBuffer
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+def random_chunks(frames: int = 10000):
+    rand = random.Random(0)
+    stream = b"".join(
+        struct.pack("!L", size) + os.urandom(size)
+        for size in (rand.randint(64, 8192) for _ in range(frames))
+    )
+    chunks = []
+    pos = 0
+    while pos < len(stream):
+        size = rand.randint(1, 4096)
+        chunks.append(stream[pos:pos + size])
+        pos += size
+    return chunks
+
+
+def feed(chunks):
+    db = DataBuffer()
+    received = 0
+    for chunk in chunks:
+        db.append_bytes(chunk)
+        for _ in db.get_len_prefixed_views():
+            received += 1
+    return received
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_data_buffer_framing_speed(benchmark):
+    chunks = random_chunks()
+    assert benchmark(feed, chunks) == 10000
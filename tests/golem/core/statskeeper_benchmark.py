@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from golem.core.statskeeper import IntStatsKeeper, stats_cache
+from golem.task.taskcomputer import CompStats
+from golem.testutils import DatabaseFixture
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+INCREMENTS = 10000
+
+
+@pytest.fixture
+def keeper():
+    fixture = DatabaseFixture()
+    fixture.setUp()
+    try:
+        yield IntStatsKeeper(CompStats)
+    finally:
+        fixture.tearDown()
+
+
+def increase(keeper, flush_every=None):
+    for i in range(1, INCREMENTS + 1):
+        keeper.increase_stat('computed_tasks')
+        if flush_every and i % flush_every == 0:
+            stats_cache.flush()
+    stats_cache.flush()
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_increase_stat_write_through_speed(benchmark, keeper):
+    # Every increment written in its own transaction, as before caching
+    benchmark(increase, keeper, 1)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_increase_stat_speed(benchmark, keeper):
+    benchmark(increase, keeper)
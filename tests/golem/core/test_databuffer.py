@@ -0,0 +1,74 @@
+import struct
+import unittest
+
+from golem.core.databuffer import DataBuffer
+
+
+class TestDataBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DataBuffer()
+
+    @staticmethod
+    def _frame(data):
+        return struct.pack("!L", len(data)) + data
+
+    def test_ulong(self):
+        self.assertIsNone(self.db.peek_ulong())
+        with self.assertRaises(ValueError):
+            self.db.read_ulong()
+        self.assertEqual(self.db.append_ulong(7), b"\x00\x00\x00\x07")
+        self.assertEqual(self.db.peek_ulong(), 7)
+        self.assertEqual(self.db.read_ulong(), 7)
+        self.assertEqual(self.db.data_size(), 0)
+        with self.assertRaises(AttributeError):
+            self.db.append_ulong(-1)
+
+    def test_bytes(self):
+        self.db.append_bytes(b"abc")
+        self.db.append_bytes(b"def")
+        self.assertEqual(self.db.peek_bytes(2), b"ab")
+        self.assertEqual(self.db.read_bytes(2), b"ab")
+        self.assertEqual(self.db.data_size(), 4)
+        self.assertEqual(self.db.buffered_data, b"cdef")
+        with self.assertRaises(AttributeError):
+            self.db.peek_bytes(5)
+        self.assertEqual(self.db.read_all(), b"cdef")
+        self.assertEqual(self.db.data_size(), 0)
+
+    def test_read_len_prefixed_bytes(self):
+        self.db.append_len_prefixed_bytes(b"abc")
+        self.db.append_bytes(self._frame(b"defg")[:-1])
+        self.assertEqual(self.db.read_len_prefixed_bytes(), b"abc")
+        self.assertIsNone(self.db.read_len_prefixed_bytes())
+        self.db.append_bytes(b"g")
+        self.assertEqual(self.db.read_len_prefixed_bytes(), b"defg")
+
+    def test_get_len_prefixed_bytes_split(self):
+        stream = b"".join(self._frame(bytes([i]) * i) for i in range(1, 50))
+        received = []
+        for i in range(0, len(stream), 7):
+            self.db.append_bytes(stream[i:i + 7])
+            received.extend(self.db.get_len_prefixed_bytes())
+        self.assertEqual(received, [bytes([i]) * i for i in range(1, 50)])
+        self.assertEqual(self.db.data_size(), 0)
+
+    def test_get_len_prefixed_views(self):
+        self.db.append_bytes(self._frame(b"abc") + self._frame(b"de") + b"\0")
+        views = list(self.db.get_len_prefixed_views())
+        self.assertTrue(all(isinstance(v, memoryview) for v in views))
+        self.assertEqual([v.tobytes() for v in views], [b"abc", b"de"])
+        self.assertEqual(self.db.buffered_data, b"\0")
+
+    def test_append_while_view_alive(self):
+        self.db.append_bytes(self._frame(b"abc"))
+        view = next(self.db.get_len_prefixed_views())
+        self.db.append_len_prefixed_bytes(b"xyz")
+        self.assertEqual(view.tobytes(), b"abc")
+        self.assertEqual(self.db.read_len_prefixed_bytes(), b"xyz")
+
+    def test_clear_buffer(self):
+        self.db.append_bytes(b"abc")
+        self.db.clear_buffer()
+        self.assertEqual(self.db.data_size(), 0)
+        self.assertEqual(self.db.read_all(), b"")
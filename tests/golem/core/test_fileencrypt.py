@@ -3,7 +3,8 @@ import random
 
 from io import IOBase
 
-from golem.core.fileencrypt import FileHelper, FileEncryptor, AESFileEncryptor
+from golem.core.fileencrypt import FileHelper, FileEncryptor, \
+    AESFileEncryptor, AESCTRFileEncryptor, DecryptionError
 from golem.resource.dirmanager import DirManager
 from golem.tools.testdirfixture import TestDirFixture
 
@@ -115,6 +116,123 @@ class TestAESFileEncryptor(TestDirFixture):
         self.assertEqual(len(iv), iv_len)
 
 
+class TestAESCTRFileEncryptor(TestDirFixture):
+    """ Test encryption using AESCTRFileEncryptor """
+
+    def setUp(self):
+        TestDirFixture.setUp(self)
+
+        self.dir_manager = DirManager(self.path)
+        self.res_dir = self.dir_manager.get_task_temporary_dir('test_task')
+        self.test_file_path = os.path.join(self.res_dir, 'test_file')
+        self.enc_file_path = os.path.join(self.res_dir, 'test_file.enc')
+        self.decrypted_path = os.path.join(self.res_dir, 'test_file.dec')
+        self.secret = FileEncryptor.gen_secret(10, 20)
+
+        self.data = bytes(random.getrandbits(8) for _ in range(10007))
+        with open(self.test_file_path, 'wb') as f:
+            f.write(self.data)
+
+    def test_encrypt_decrypt(self):
+        AESCTRFileEncryptor.encrypt(self.test_file_path,
+                                    self.enc_file_path,
+                                    self.secret)
+
+        assert AESCTRFileEncryptor.is_encrypted(self.enc_file_path)
+        assert os.path.getsize(self.enc_file_path) == len(self.data) \
+            + AESCTRFileEncryptor.header_len + AESCTRFileEncryptor.mac_len
+
+        AESCTRFileEncryptor.decrypt(self.enc_file_path,
+                                    self.decrypted_path,
+                                    self.secret)
+
+        with open(self.decrypted_path, 'rb') as f:
+            assert f.read() == self.data
+
+    def test_writer_buffering(self):
+        with AESCTRFileEncryptor.writer(self.enc_file_path, self.secret,
+                                        buffer_size=100) as writer:
+            for i in range(0, len(self.data), 33):
+                writer.write(self.data[i:i + 33])
+            assert writer.tell() == len(self.data)
+
+        with AESCTRFileEncryptor.reader(self.enc_file_path,
+                                        self.secret) as reader:
+            assert reader.read() == self.data
+
+    def test_reader_seek(self):
+        AESCTRFileEncryptor.encrypt(self.test_file_path,
+                                    self.enc_file_path,
+                                    self.secret)
+
+        with AESCTRFileEncryptor.reader(self.enc_file_path, self.secret,
+                                        buffer_size=64) as reader:
+            for offset in [5000, 17, 0, 10000, 4096, 9999]:
+                reader.seek(offset)
+                assert reader.read(100) == self.data[offset:offset + 100]
+
+            reader.seek(-10, os.SEEK_END)
+            assert reader.read() == self.data[-10:]
+            assert reader.read() == b''
+
+    def test_writer_error(self):
+        with self.assertRaises(RuntimeError):
+            with AESCTRFileEncryptor.writer(self.enc_file_path,
+                                            self.secret) as writer:
+                writer.write(self.data)
+                raise RuntimeError()
+
+        assert writer.closed
+        assert os.path.getsize(self.enc_file_path) \
+            < len(self.data) + AESCTRFileEncryptor.header_len \
+            + AESCTRFileEncryptor.mac_len
+        with self.assertRaises(DecryptionError):
+            AESCTRFileEncryptor.reader(self.enc_file_path, self.secret)
+
+    def test_tampered_file(self):
+        AESCTRFileEncryptor.encrypt(self.test_file_path,
+                                    self.enc_file_path,
+                                    self.secret)
+
+        with open(self.enc_file_path, 'r+b') as f:
+            f.seek(AESCTRFileEncryptor.header_len + 100)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes([byte[0] ^ 1]))
+
+        with self.assertRaises(DecryptionError):
+            AESCTRFileEncryptor.reader(self.enc_file_path, self.secret)
+
+    def test_truncated_file(self):
+        AESCTRFileEncryptor.encrypt(self.test_file_path,
+                                    self.enc_file_path,
+                                    self.secret)
+
+        with open(self.enc_file_path, 'r+b') as f:
+            f.truncate(AESCTRFileEncryptor.header_len + 10)
+
+        with self.assertRaises(DecryptionError):
+            AESCTRFileEncryptor.reader(self.enc_file_path, self.secret)
+
+    def test_invalid_secret(self):
+        AESCTRFileEncryptor.encrypt(self.test_file_path,
+                                    self.enc_file_path,
+                                    self.secret)
+
+        with self.assertRaises(DecryptionError):
+            AESCTRFileEncryptor.reader(self.enc_file_path,
+                                       self.secret + b"0")
+
+    def test_legacy_format(self):
+        AESFileEncryptor.encrypt(self.test_file_path,
+                                 self.enc_file_path,
+                                 self.secret)
+
+        assert not AESCTRFileEncryptor.is_encrypted(self.enc_file_path)
+        with self.assertRaises(DecryptionError):
+            AESCTRFileEncryptor.reader(self.enc_file_path, self.secret)
+
+
 class TestFileHelper(TestDirFixture):
     """ Tests for FileHelper class """
 
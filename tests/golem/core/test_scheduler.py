@@ -0,0 +1,103 @@
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from twisted.internet.task import Clock
+
+from golem.core.scheduler import DeadlineScheduler
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.now = time.time()
+        self.clock = Clock()
+        self.clock.advance(self.now)
+        patcher = patch('golem.core.scheduler.time.time',
+                        side_effect=self.clock.seconds)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.callback = Mock()
+        self.scheduler = DeadlineScheduler(self.callback, reactor=self.clock)
+
+    def test_schedule(self):
+        self.scheduler.schedule('a', self.now + 10)
+        assert 'a' in self.scheduler
+        assert len(self.scheduler) == 1
+
+        self.clock.advance(5)
+        self.callback.assert_not_called()
+
+        self.clock.advance(6)
+        self.callback.assert_called_once_with('a')
+        assert 'a' not in self.scheduler
+        assert not self.clock.getDelayedCalls()
+
+    def test_deadline_in_the_past(self):
+        self.scheduler.schedule('a', self.now - 10)
+        self.clock.advance(0)
+        self.callback.assert_called_once_with('a')
+
+    def test_schedule_moves_the_timer(self):
+        self.scheduler.schedule('a', self.now + 10)
+        self.scheduler.schedule('a', self.now + 20)
+        assert len(self.clock.getDelayedCalls()) == 1
+
+        self.clock.advance(11)
+        self.callback.assert_not_called()
+        self.clock.advance(10)
+        self.callback.assert_called_once_with('a')
+
+    def test_schedule_earlier(self):
+        self.scheduler.schedule('a', self.now + 10)
+        self.scheduler.schedule_earlier('a', self.now + 20)
+        self.scheduler.schedule_earlier('b', self.now + 20)
+
+        self.clock.advance(11)
+        self.callback.assert_called_once_with('a')
+
+        self.scheduler.schedule_earlier('b', self.now + 12)
+        self.clock.advance(2)
+        assert self.callback.call_count == 2
+        self.callback.assert_called_with('b')
+
+    def test_cancel(self):
+        self.scheduler.schedule('a', self.now + 10)
+        self.scheduler.schedule('b', self.now + 10)
+        self.scheduler.cancel('a')
+        self.scheduler.cancel('unknown')
+        assert 'a' not in self.scheduler
+
+        self.clock.advance(11)
+        self.callback.assert_called_once_with('b')
+
+    def test_cancel_all(self):
+        self.scheduler.schedule('a', self.now + 10)
+        self.scheduler.schedule('b', self.now + 10)
+        self.scheduler.cancel_all()
+
+        assert not self.scheduler
+        assert not self.clock.getDelayedCalls()
+
+    def test_callback_error(self):
+        self.callback.side_effect = ValueError
+        self.scheduler.schedule('a', self.now)
+        self.scheduler.schedule('b', self.now)
+
+        with patch('golem.core.scheduler.logger') as logger:
+            self.clock.advance(0)
+
+        assert self.callback.call_count == 2
+        assert logger.exception.call_count == 2
+
+    def test_schedule_from_another_thread(self):
+        self.clock.running = True
+        self.clock.callFromThread = Mock()
+
+        with patch('golem.core.scheduler.threadable.isInIOThread',
+                   return_value=False):
+            self.scheduler.schedule('a', self.now)
+
+        self.clock.callFromThread.assert_called_once()
+        assert 'a' not in self.scheduler
@@ -1,6 +1,7 @@
 from threading import Thread
 
-from golem.core.statskeeper import IntStatsKeeper
+from golem.core.statskeeper import IntStatsKeeper, stats_cache
+from golem.model import Stats
 from golem.task.taskcomputer import CompStats
 from golem.tools.testwithdatabase import TestWithDatabase
 
@@ -58,3 +59,30 @@ class TestStatsKeeper(TestWithDatabase):
 
         self.assertEqual(sk.session_stats.computed_tasks, n_expected)
         self.assertEqual(sk.global_stats.computed_tasks, n_expected)
+
+    def test_flush(self):
+        sk = IntStatsKeeper(CompStats)
+        sk.increase_stat("computed_tasks")
+        sk.increase_stat("computed_tasks", 2)
+        sk.set_stat("tasks_with_errors", 5)
+        assert not Stats.select().where(Stats.name == "computed_tasks").exists()
+
+        stats_cache.flush()
+        stats_cache.clear()
+
+        sk2 = IntStatsKeeper(CompStats)
+        self._compare_stats(sk2, [3, 0, 5, 0, 0, 0])
+
+        sk2.increase_stat("computed_tasks")
+        stats_cache.flush()
+        stats_cache.flush()
+        assert [stat.value for stat in Stats.select()
+                .where(Stats.name == "computed_tasks")] == ["4"]
+
+    def test_wrong_format(self):
+        Stats.create(name="computed_tasks", value="abc")
+        sk = IntStatsKeeper(CompStats)
+        self._compare_stats(sk, [0] * 6)
+
+        sk.increase_stat("computed_tasks")
+        self._compare_stats(sk, [0, 0, 0, 1, 0, 0])
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from golem.environments.minperformancemultiplier import MinPerformanceMultiplier
 from golem.testutils import DatabaseFixture
 
@@ -25,8 +27,19 @@ class EnvTest(DatabaseFixture, PEP8MixIn):
 
     def test_run_default_benchmark(self):
         assert Environment.get_performance() == 0.0
+        assert Environment.get_all_cores_performance() is None
         assert Environment.run_default_benchmark(save=True) > 0.0
         assert Environment.get_performance() > 0.0
+        assert Environment.get_all_cores_performance() > 0.0
+
+    @patch('golem.environments.environment.make_calibrated_perf_test',
+           return_value=(100.0, 400.0))
+    def test_run_default_benchmark_all_cores(self, *_):
+        assert Environment.run_default_benchmark() == 100.0
+        assert Environment.get_performance() == 0.0
+        assert Environment.run_default_benchmark(save=True) == 100.0
+        assert Environment.get_performance() == 100.0
+        assert Environment.get_all_cores_performance() == 400.0
 
     def test_get_min_accepted_performance_default(self):
         self.assertEqual(MinPerformanceMultiplier.get(), 0.0)
@@ -42,3 +55,13 @@ class EnvTest(DatabaseFixture, PEP8MixIn):
         # then
         self.assertEqual(MinPerformanceMultiplier.get(), 3.141)
         self.assertEqual(self.env.get_min_accepted_performance(), 314.1)
+
+    def test_get_min_accepted_performance_multiplier_changed(self):
+        p = Performance(environment_id=Environment.get_id(),
+                        min_accepted_step=100)
+        p.save()
+        MinPerformanceMultiplier.set(2)
+        self.assertEqual(self.env.get_min_accepted_performance(), 200)
+
+        MinPerformanceMultiplier.set(3)
+        self.assertEqual(self.env.get_min_accepted_performance(), 300)
@@ -0,0 +1,161 @@
+import os
+import time
+import unittest.mock as mock
+
+import pytest
+from golem_sci.interface import TransactionReceipt
+from hexbytes import HexBytes
+
+from golem.database import Database
+from golem.ethereum.incomeskeeper import IncomesKeeper
+from golem.ethereum.paymentprocessor import PaymentProcessor
+from golem.model import db, DB_FIELDS, DB_MODELS, Income, Payment, \
+    PaymentDetails, PaymentStatus
+
+BATCH_SIZE = 10000
+AWAITING = 50000
+TICKS = 100
+TX_HASH = '0x' + 64 * 'd'
+PAYER_ADDRESS = '0x' + 40 * '9'
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+class StubSCI:
+    """ Smart contracts interface with fixed balances, counting calls """
+    GAS_PER_PAYMENT = 20000
+    GAS_BATCH_PAYMENT_BASE = 30000
+
+    def __init__(self, gntb_balance, eth_balance=10 ** 18, gas_price=10 ** 9):
+        self.gntb_balance = gntb_balance
+        self.eth_balance = eth_balance
+        self.gas_price = gas_price
+        self.calls = 0
+
+    def get_eth_address(self):
+        return PAYER_ADDRESS
+
+    def get_gntb_balance(self, _address):
+        self.calls += 1
+        return self.gntb_balance
+
+    def get_eth_balance(self, _address):
+        self.calls += 1
+        return self.eth_balance
+
+    def get_current_gas_price(self):
+        self.calls += 1
+        return self.gas_price
+
+    def get_latest_block(self):
+        self.calls += 1
+        return mock.Mock(gas_limit=8 * 10 ** 6)
+
+
+@pytest.fixture
+def database(tmpdir):
+    database = Database(db, fields=DB_FIELDS, models=DB_MODELS,
+                        db_dir=str(tmpdir))
+    yield database
+    database.db.close()
+
+
+def sent_payments(n):
+    Payment.delete().execute()
+    with db.atomic():
+        for i in range(n):
+            Payment.create(
+                subtask='subtask_{}'.format(i),
+                payee=os.urandom(20),
+                value=10 ** 18,
+                details=PaymentDetails(tx=TX_HASH[2:]),
+                status=PaymentStatus.sent,
+            )
+    return list(Payment.select())
+
+
+def expected_incomes(n):
+    Income.delete().execute()
+    with db.atomic():
+        for i in range(n):
+            Income.create(
+                sender_node=64 * 'a',
+                subtask='subtask_{}'.format(i),
+                payer_address=PAYER_ADDRESS,
+                value=10 ** 18,
+                accepted_ts=1,
+            )
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_batch_confirmed_speed(benchmark, database):  # noqa pylint: disable=redefined-outer-name,unused-argument
+    sci = mock.Mock()
+    sci.get_transaction_gas_price.return_value = 1
+    sci.get_block_by_number.return_value = mock.Mock(timestamp=time.time())
+    payment_processor = PaymentProcessor(sci)
+    receipt = TransactionReceipt({
+        'transactionHash': HexBytes(TX_HASH),
+        'blockNumber': 1337,
+        'blockHash': HexBytes('0x' + 64 * 'f'),
+        'gasUsed': 100000,
+        'status': 1,
+    })
+
+    with mock.patch('golem.ethereum.paymentprocessor.dispatcher'):
+        benchmark.pedantic(
+            payment_processor._on_batch_confirmed,  # noqa pylint: disable=protected-access
+            setup=lambda: ((sent_payments(BATCH_SIZE), receipt), {}),
+            rounds=3,
+        )
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_received_batch_transfer_speed(benchmark, database):  # noqa pylint: disable=redefined-outer-name,unused-argument
+    incomes_keeper = IncomesKeeper()
+
+    def setup():
+        expected_incomes(BATCH_SIZE)
+        return (TX_HASH, PAYER_ADDRESS, BATCH_SIZE * 10 ** 18, 1), {}
+
+    with mock.patch('golem.ethereum.incomeskeeper.dispatcher'):
+        benchmark.pedantic(
+            incomes_keeper.received_batch_transfer,
+            setup=setup,
+            rounds=3,
+        )
+
+
+def awaiting_payments(payment_processor, n):
+    awaiting = payment_processor._awaiting  # noqa pylint: disable=protected-access
+    for i in range(n):
+        awaiting.add(Payment(
+            subtask='subtask_{}'.format(i),
+            payee=bytes([i % 256]) * 20,
+            value=10 ** 18,
+            processed_ts=i,
+        ))
+
+
+def sendout_ticks(payment_processor, ticks):
+    for _ in range(ticks):
+        payment_processor.sendout(0)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_sendout_short_on_gntb_speed(benchmark, database):  # noqa pylint: disable=redefined-outer-name,unused-argument
+    """ Simulates sendout ticks of a requestor which can't afford the
+    oldest of its awaiting payments """
+    sci = StubSCI(gntb_balance=0)
+    payment_processor = PaymentProcessor(sci)
+    awaiting_payments(payment_processor, AWAITING)
+
+    benchmark(sendout_ticks, payment_processor, TICKS)
+    # Balances are read once per PaymentProcessor.READINGS_TTL
+    assert sci.calls < TICKS
@@ -190,6 +190,43 @@ class TestIncomesKeeper(TestWithDatabase):
         income2 = Income.get(sender_node=sender_node2, subtask=subtask_id2)
         assert transaction_id2[2:] == income2.transaction
 
+    @mock.patch('golem.ethereum.incomeskeeper.dispatcher')
+    def test_received_batch_transfer_partial(self, dispatcher):
+        sender_node = 64 * 'a'
+        payer_address = '0x' + 40 * '9'
+        subtasks = ['subtask_{}'.format(i) for i in range(3)]
+        value = MAX_INT + 10
+        for subtask_id in subtasks:
+            self._test_expect_income(
+                sender_node=sender_node,
+                subtask_id=subtask_id,
+                payer_addr=payer_address,
+                value=value,
+                accepted_ts=1337,
+            )
+        dispatcher.reset_mock()
+
+        transaction_id = '0x' + 64 * 'b'
+        self.incomes_keeper.received_batch_transfer(
+            transaction_id,
+            payer_address,
+            value + 5,
+            1337,
+        )
+
+        incomes = [Income.get(sender_node=sender_node, subtask=subtask_id)
+                   for subtask_id in subtasks]
+        assert sorted(income.value_received for income in incomes) == \
+            [0, 5, value]
+        assert all(income.transaction == transaction_id[2:]
+                   for income in incomes)
+        dispatcher.send.assert_called_once_with(
+            signal='golem.income',
+            event='confirmed',
+            node_id=sender_node,
+            amount=value,
+        )
+
     @staticmethod
     def _create_income(**kwargs):
         income = model_factories.Income(**kwargs)
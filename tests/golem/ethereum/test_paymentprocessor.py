@@ -15,6 +15,7 @@ from hexbytes import HexBytes
 
 from golem.core.common import timestamp_to_datetime
 from golem.ethereum.paymentprocessor import (
+    AwaitingPayments,
     PaymentProcessor,
     PAYMENT_MAX_DELAY,
 )
@@ -28,6 +29,46 @@ class PaymentStatusTest(unittest.TestCase):
         self.assertEqual(s, PaymentStatus.awaiting)
 
 
+class AwaitingPaymentsTest(unittest.TestCase):
+    @staticmethod
+    def _payment(processed_ts, value, payee):
+        return mock.Mock(processed_ts=processed_ts, value=value, payee=payee)
+
+    def test_batch_size(self):
+        awaiting = AwaitingPayments()
+        awaiting.update([
+            self._payment(1, 10, b'a'),
+            self._payment(2, 20, b'b'),
+            self._payment(3, 30, b'a'),
+            self._payment(4, 40, b'c'),
+        ])
+
+        assert awaiting.batch_size(10, 1000, 10) == (4, 4, 4)
+        assert awaiting.batch_size(2, 1000, 10) == (2, 2, 2)
+        assert awaiting.batch_size(10, 59, 10) == (4, 2, 4)
+        assert awaiting.batch_size(10, 60, 10) == (4, 3, 4)
+        assert awaiting.batch_size(10, 1000, 2) == (4, 4, 3)
+        assert awaiting.value(3) == 60
+        assert awaiting.value(0) == 0
+
+    def test_out_of_order(self):
+        awaiting = AwaitingPayments()
+        awaiting.add(self._payment(3, 30, b'a'))
+        assert awaiting.value(1) == 30
+
+        awaiting.add(self._payment(1, 10, b'b'))
+        awaiting.add(self._payment(2, 20, b'a'))
+        assert [p.processed_ts for p in awaiting] == [1, 2, 3]
+        assert awaiting.value(3) == 60
+        assert awaiting.batch_size(10, 1000, 1) == (3, 3, 1)
+
+        batch = awaiting.pop_batch(2)
+        assert [p.processed_ts for p in batch] == [1, 2]
+        assert len(awaiting) == 1
+        assert awaiting.value(1) == 30
+        assert awaiting.batch_size(10, 1000, 1) == (1, 1, 1)
+
+
 class PaymentProcessorInternalTest(DatabaseFixture):
     """ In this suite we test internal logic of PaymentProcessor. The final
         Ethereum transactions are not inspected.
@@ -122,6 +163,12 @@ class PaymentProcessorInternalTest(DatabaseFixture):
     def test_recipients_count(self):
         assert self.pp.recipients_count == 0
 
+    def test_awaiting_value(self):
+        assert self.pp.awaiting_value == 0
+        self.pp.add("subtask1", encode_hex(urandom(20)), 10 ** 17)
+        self.pp.add("subtask2", encode_hex(urandom(20)), 2 * 10 ** 17)
+        assert self.pp.awaiting_value == 3 * 10 ** 17
+
     def test_monitor_progress(self):
         balance_eth = 1 * denoms.ether
         balance_gntb = 99 * denoms.ether
@@ -201,6 +248,64 @@ class PaymentProcessorInternalTest(DatabaseFixture):
         assert self.pp.reserved_gntb == gnt_value
         assert len(self.pp._awaiting) == 1
 
+    def test_batch_confirmed(self):
+        payments = [
+            Payment.create(
+                subtask=str(uuid.uuid4()),
+                payee=urandom(20),
+                value=10,
+                details=PaymentDetails(tx='dead'),
+                status=PaymentStatus.sent,
+            ) for _ in range(10)
+        ]
+        untouched = Payment.create(
+            subtask=str(uuid.uuid4()),
+            payee=urandom(20),
+            value=10,
+        )
+        self.sci.get_transaction_gas_price.return_value = 1
+        self.sci.get_block_by_number.return_value = mock.Mock(
+            timestamp=time.time())
+        receipt = TransactionReceipt({
+            'transactionHash': HexBytes('0xdead'),
+            'blockNumber': 1337,
+            'blockHash': HexBytes('0x' + 64 * 'f'),
+            'gasUsed': 100,
+            'status': 1,
+        })
+
+        self.pp._on_batch_confirmed(payments, receipt)
+
+        confirmed = Payment.select() \
+            .where(Payment.status == PaymentStatus.confirmed)
+        assert {p.subtask for p in confirmed} == \
+            {p.subtask for p in payments}
+        for p in confirmed:
+            assert p.details == PaymentDetails(
+                tx='dead',
+                block_number=1337,
+                block_hash=64 * 'f',
+                fee=10,
+            )
+        assert untouched.refresh().status == PaymentStatus.awaiting
+
+    def test_readings_cache(self):
+        self.sci.get_eth_balance.return_value = denoms.ether
+        self.sci.get_gntb_balance.return_value = 0
+        self.pp.CLOSURE_TIME_DELAY = 0
+        self.pp.add("test_subtask_id", encode_hex(urandom(20)), 1)
+
+        for _ in range(3):
+            assert not self.pp.sendout(0)
+        self.sci.get_gntb_balance.assert_called_once_with(self.addr)
+
+        self.sci.get_gntb_balance.return_value = denoms.ether
+        self.sci.batch_transfer.return_value = '0xdead'
+        with mock.patch('golem.ethereum.paymentprocessor.time.monotonic',
+                        return_value=time.monotonic() + 60):
+            assert self.pp.sendout(0)
+        assert self.sci.get_gntb_balance.call_count == 2
+
     def test_payment_timestamp(self):
         self.sci.get_eth_balance.return_value = denoms.ether
 
@@ -10,7 +10,8 @@ from golem.diag.service import DiagnosticsOutputFormat
 from golem.diag.vm import VMDiagnosticsProvider
 from golem.monitor.model.modelbase import BasicModel
 from golem.monitor.model.statssnapshotmodel import VMSnapshotModel, \
-    P2PSnapshotModel, RequestorAggregateStatsModel, ProviderStatsModel
+    P2PSnapshotModel, RequestorAggregateStatsModel, ProviderStatsModel, \
+    TaskTimeoutsModel
 from golem.monitor.test_helper import MonitorTestBaseClass
 from golem.task.taskproviderstats import ProviderStats
 from golem.task.taskrequestorstats import AggregateTaskStats
@@ -116,3 +117,24 @@ class TestProviderStatsModel(TestCase):
         for key in vars(stats):
             assert hasattr(model, key)
         json.dumps(model.dict_repr())
+
+
+class TestTaskTimeoutsModel(TestCase):
+    def test_init(self):
+        cliid = str(uuid4())
+        sessid = str(uuid4())
+        stats = {
+            'indexed_deadlines': 10,
+            'heap_size': 12,
+            'last_check_time': 0.001,
+        }
+        meta_data = BasicModel("NotTaskTimeouts", cliid, sessid)
+        model = TaskTimeoutsModel(meta_data, stats)
+
+        assert model.cliid == cliid
+        assert model.sessid == sessid
+        assert model.type == "TaskTimeouts"
+        assert model.indexed_deadlines == 10
+        assert model.heap_size == 12
+        assert model.last_check_time == 0.001
+        json.dumps(model.dict_repr())
@@ -0,0 +1,117 @@
+from unittest import mock, TestCase
+
+from twisted.internet.task import Clock
+from twisted.web.test.requesthelper import DummyRequest
+
+from golem.monitor import metrics
+
+
+class TestMetrics(TestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_counter(self):
+        counter = self.registry.counter(
+            'messages_total', 'Messages', ('type',))
+        counter.inc(type='Ping')
+        counter.inc(2, type='Ping')
+        counter.inc(type='Pong')
+
+        assert self.registry.render().decode() == (
+            '# HELP messages_total Messages\n'
+            '# TYPE messages_total counter\n'
+            'messages_total{type="Ping"} 3.0\n'
+            'messages_total{type="Pong"} 1.0\n'
+        )
+
+    def test_histogram(self):
+        histogram = self.registry.histogram(
+            'duration_seconds', 'Duration', buckets=(1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+
+        assert self.registry.render().decode() == (
+            '# HELP duration_seconds Duration\n'
+            '# TYPE duration_seconds histogram\n'
+            'duration_seconds_bucket{le="1.0"} 2.0\n'
+            'duration_seconds_bucket{le="5.0"} 3.0\n'
+            'duration_seconds_bucket{le="+Inf"} 4.0\n'
+            'duration_seconds_sum 14.5\n'
+            'duration_seconds_count 4.0\n'
+        )
+
+    def test_gauge_labels_escaped(self):
+        family = metrics.gauge('peers', 'Peers "by" state')
+        family.add(1, state='a\\b"c\n')
+
+        assert family.render() == (
+            '# HELP peers Peers "by" state\n'
+            '# TYPE peers gauge\n'
+            'peers{state="a\\\\b\\"c\\n"} 1.0\n'
+        )
+
+    def test_collectors(self):
+        def failing():
+            raise ValueError()
+            yield  # pylint: disable=unreachable
+
+        def collector():
+            yield metrics.gauge('queue_depth', 'Queue depth', 3)
+
+        self.registry.register(failing)
+        self.registry.register(collector)
+        with self.assertLogs(metrics.logger):
+            assert self.registry.render() == \
+                b'# HELP queue_depth Queue depth\n' \
+                b'# TYPE queue_depth gauge\n' \
+                b'queue_depth 3.0\n'
+
+        self.registry.unregister(collector)
+        self.registry.unregister(failing)
+        assert self.registry.render() == b''
+
+    def test_resource(self):
+        self.registry.register(
+            lambda: [metrics.gauge('queue_depth', 'Queue depth', 3)])
+        request = DummyRequest([b'metrics'])
+
+        body = metrics.MetricsResource(self.registry).render_GET(request)
+
+        assert b'queue_depth 3.0\n' in body
+        assert request.responseHeaders.getRawHeaders(b'content-type') == \
+            [metrics.CONTENT_TYPE]
+
+
+@mock.patch('twisted.internet.reactor', create=True)
+class TestMetricsService(TestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+        self.collector = mock.Mock(return_value=[])
+        self.service = metrics.MetricsService(
+            9100, collectors=[self.collector], registry=self.registry)
+        self.clock = Clock()
+        self.service._lag_call.clock = self.clock  # noqa pylint: disable=protected-access
+
+    def test_start_stop(self, reactor):
+        self.service.start()
+        assert self.service.running
+        reactor.listenTCP.assert_called_once_with(
+            9100, mock.ANY, interface='127.0.0.1')
+
+        self.registry.render()
+        self.collector.assert_called_once_with()
+
+        self.service.stop()
+        assert not self.service.running
+        reactor.listenTCP.return_value.stopListening.assert_called_once_with()
+        assert self.registry.render() == b''
+
+    def test_reactor_lag(self, _reactor):
+        self.service.start()
+        self.clock.advance(self.service.LAG_INTERVAL + 0.25)
+
+        assert b'golem_reactor_last_lag_seconds 0.25\n' in \
+            self.registry.render()
+        self.service.stop()
@@ -1,4 +1,5 @@
 # pylint: disable=protected-access
+import gzip
 import json
 import time
 from unittest import mock, TestCase
@@ -12,8 +13,13 @@ from pydispatch import dispatcher
 from golem import testutils
 from golem.clientconfigdescriptor import ClientConfigDescriptor
 from golem.core import variables
+from golem.monitor.model.modelbase import BasicModel
 from golem.monitor.model.nodemetadatamodel import NodeMetadataModel
+from golem.monitor.model.statssnapshotmodel import StatsSnapshotModel
+from golem.monitor.model.taskcomputersnapshotmodel import \
+    TaskComputerSnapshotModel
 from golem.monitor.monitor import SystemMonitor, SenderThread, Sender
+from golem.monitor import test_helper
 from golem.monitorconfig import MONITOR_CONFIG
 from golem.task.taskrequestorstats import CurrentStats, FinishedTasksStats, \
     EMPTY_FINISHED_SUMMARY
@@ -75,6 +81,16 @@ class TestSystemMonitor(TestCase, testutils.PEP8MixIn):
                 EMPTY_FINISHED_SUMMARY,
                 EMPTY_FINISHED_SUMMARY,
                 EMPTY_FINISHED_SUMMARY))
+        self.monitor.on_task_timeouts_snapshot({
+            'indexed_deadlines': 0,
+            'heap_size': 0,
+            'last_check_time': 0.0,
+        })
+        self.monitor.on_message_history_snapshot({
+            'queue_depth': 0,
+            'batch_size': 0,
+            'commit_time': 0.0,
+        })
         ccd = ClientConfigDescriptor()
         ccd.node_name = "new node name"
         client_mock = mock.MagicMock()
@@ -256,24 +272,115 @@ class TestSystemMonitor(TestCase, testutils.PEP8MixIn):
 
 
 class TestSenderThread(TestCase):
-    def test_run_exception(self):
-        node_info = mock.Mock()
-        node_info.dict_repr.return_value = dict()
-        sender = SenderThread(
-            node_info=node_info,
+    def setUp(self):
+        self.node_info = mock.Mock()
+        self.node_info.dict_repr.return_value = dict()
+        self.sender = SenderThread(
+            node_info=self.node_info,
             monitor_host=None,
             monitor_request_timeout=0,
             monitor_sender_thread_timeout=0,
-            proto_ver=None
+            proto_ver=None,
+            max_queue_size=3,
+            max_batch_size=2,
         )
-        sender.stop_request.isSet = mock.Mock(side_effect=[False, True])
-        with mock.patch('requests.post',
-                        side_effect=requests.exceptions.RequestException(
-                            "request failed")), \
+
+    @staticmethod
+    def _model():
+        return BasicModel('Test', 'cliid', str(random.random()))
+
+    @staticmethod
+    def _stats_snapshot():
+        stats = mock.Mock()
+        stats.get_stats.return_value = (None, random.randint(0, 100))
+        return StatsSnapshotModel(test_helper.meta_data(), 1, 1, stats)
+
+    @staticmethod
+    def _task_computer_snapshot():
+        task_computer = mock.Mock(compute_tasks=True, assigned_subtask=None)
+        return TaskComputerSnapshotModel(test_helper.meta_data(), task_computer)
+
+    def test_run_exception(self):
+        def post(*_, **__):
+            self.sender.stop_request.set()
+            raise requests.exceptions.RequestException("request failed")
+
+        with mock.patch('requests.Session.post', side_effect=post), \
                 self.assertLogs() as logs:
-            sender.run()
+            self.sender.run()
 
         # make sure we're not spitting out stack traces
         assert len(logs.output) == 1
         output_lines = logs.output[0].split('\n')
         assert len(output_lines) == 1
+
+    def test_drop_oldest(self):
+        models = [self._model() for _ in range(5)]
+        for model in models:
+            self.sender.send(model)
+
+        assert list(self.sender.queue) == models[2:]
+        stats = self.sender.get_stats()
+        assert stats['queue_depth'] == 3
+        assert stats['dropped'] == 2
+
+    def test_coalesce_snapshots(self):
+        model = self._model()
+        stats_snapshots = [self._stats_snapshot() for _ in range(3)]
+        tc_snapshot = self._task_computer_snapshot()
+        for msg in stats_snapshots + [model, tc_snapshot]:
+            self.sender.send(msg)
+
+        assert self.sender._next_batch() == [stats_snapshots[-1], tc_snapshot]
+        assert self.sender._next_batch() == [model]
+        assert self.sender.get_stats()['coalesced'] == 2
+
+    def test_send_compressed_batch(self):
+        models = [self._model() for _ in range(3)]
+        for model in models:
+            self.sender.send(model)
+
+        with mock.patch('requests.Session.post') as post_mock:
+            post_mock.return_value.status_code = 200
+            self.sender.stop_request.set()
+            self.sender.run()
+
+        assert post_mock.call_count == 2
+        batch = post_mock.call_args_list[0][1]
+        assert batch['headers']['content-encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(batch['data']))['data'] == \
+            [model.dict_repr() for model in models[:2]]
+        single = post_mock.call_args_list[1][1]
+        assert json.loads(single['data'])['data'] == models[2].dict_repr()
+        stats = self.sender.get_stats()
+        assert stats['sent'] == 3
+        assert stats['queue_depth'] == 0
+
+    def test_backoff(self):
+        stats_snapshot = self._stats_snapshot()
+        models = [self._model() for _ in range(2)]
+        self.sender.send(stats_snapshot)
+        self.sender.send(models[0])
+        batch = self.sender._next_batch()
+        self.sender.send(models[1])
+        newer_snapshot = self._stats_snapshot()
+        self.sender.send(newer_snapshot)
+
+        with mock.patch('requests.Session.post') as post_mock:
+            post_mock.return_value.status_code = 500
+            assert not self.sender._send_batch(batch)
+            assert self.sender.backoff == SenderThread.MIN_BACKOFF
+            assert not self.sender._send_batch(self.sender._next_batch())
+            assert self.sender.backoff == SenderThread.MIN_BACKOFF * 2
+
+            post_mock.return_value.status_code = 200
+            assert self.sender._send_batch(self.sender._next_batch())
+            assert self.sender.backoff == 0
+
+        # Failed messages are sent again, in order, apart from the outdated
+        # snapshot
+        sent = [json.loads(gzip.decompress(call[1]['data']))['data']
+                for call in post_mock.call_args_list]
+        assert sent[-1] == [newer_snapshot.dict_repr(), models[0].dict_repr()]
+        assert list(self.sender.queue) == [models[1]]
+        assert self.sender.get_stats()['failed'] == 2
@@ -1,7 +1,11 @@
 # pylint: disable=protected-access, no-self-use
+import calendar
 import datetime
 import gc
+import http.server
 import logging
+import socketserver
+import threading
 import time
 from unittest import mock, TestCase
 import urllib
@@ -14,6 +18,7 @@ from freezegun import freeze_time
 import golem_messages
 import golem_messages.cryptography
 import golem_messages.exceptions
+from golem_messages import datastructures as msg_datastructures
 from golem_messages import message
 from golem_messages import factories as msg_factories
 
@@ -282,6 +287,11 @@ class TestConcentClientService(testutils.TempDirFixture):
 
         assert 'key' not in self.concent_service._delayed
 
+    def _wait_for_requests(self):
+        executor = self.concent_service._executor
+        self.concent_service._executor = None
+        executor.shutdown(wait=True)
+
     def test_loop_exception(self, send_mock, *_):
         self.concent_service.submit(
             'key',
@@ -290,19 +300,60 @@ class TestConcentClientService(testutils.TempDirFixture):
         )
 
         send_mock.side_effect = exceptions.ConcentRequestError
-        mock_path = ("golem.network.concent.client.ConcentClientService"
-                     "._grace_sleep")
-        with mock.patch(mock_path) as sleep_mock:
-            self.concent_service._loop()
-            sleep_mock.assert_called_once_with()
+        self.concent_service._loop()
+        self._wait_for_requests()
 
         send_mock.assert_called_once_with(
             self.msg,
             self.concent_service.keys_auth._private_key,
             concent_variant=self.concent_service.variant,
+            session=mock.ANY,
         )
 
         assert not self.concent_service._delayed
+        assert self.concent_service._send_backoff.remaining() > 0
+        stats = self.concent_service.get_stats()
+        assert stats['failed'] == 1
+        assert stats['in_flight'] == 0
+
+    def test_loop_grace_period(self, send_mock, *_):
+        self.concent_service._send_backoff.failure()
+        self.concent_service.submit(
+            'key',
+            self.msg,
+            delay=datetime.timedelta(),
+        )
+
+        self.concent_service._loop()
+
+        send_mock.assert_not_called()
+        assert self.concent_service.get_stats()['queue_depth'] == 1
+
+    def test_loop_concurrent_failures(self, send_mock, *_):
+        max_in_flight = self.concent_service.max_in_flight
+        failed = threading.Barrier(max_in_flight, timeout=5)
+
+        def fail(*_, **__):
+            # All requests fail at once, in a single outage
+            failed.wait()
+            raise exceptions.ConcentRequestError()
+
+        send_mock.side_effect = fail
+        for i in range(max_in_flight):
+            self.concent_service.submit(
+                'key{}'.format(i),
+                message.concents.ForceReportComputedTask(),
+                delay=datetime.timedelta(),
+            )
+
+        self.concent_service._loop()
+        self._wait_for_requests()
+
+        backoff = self.concent_service._send_backoff
+        assert send_mock.call_count == max_in_flight
+        assert backoff.delay == self.concent_service.MIN_GRACE_TIME \
+            * self.concent_service.GRACE_FACTOR
+        assert self.concent_service.get_stats()['failed'] == max_in_flight
 
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
@@ -318,12 +369,44 @@ class TestConcentClientService(testutils.TempDirFixture):
         )
 
         self.concent_service._loop()
+        self._wait_for_requests()
         send_mock.assert_called_once_with(
             self.msg,
             self.concent_service.keys_auth._private_key,
             concent_variant=self.concent_service.variant,
+            session=mock.ANY,
         )
         react_mock.assert_called_once_with(data, response_to=self.msg)
+        stats = self.concent_service.get_stats()
+        assert stats['sent'] == 1
+        assert stats['queue_depth'] == 0
+
+    @mock.patch(
+        'golem.network.concent.client.ConcentClientService'
+        '.react_to_concent_message'
+    )
+    def test_loop_max_in_flight(self, _react_mock, send_mock, *_):
+        max_in_flight = self.concent_service.max_in_flight
+        release = threading.Event()
+        send_mock.side_effect = lambda *_, **__: release.wait(5)
+        for i in range(max_in_flight + 2):
+            self.concent_service.submit(
+                'key{}'.format(i),
+                message.concents.ForceReportComputedTask(),
+                delay=datetime.timedelta(),
+            )
+
+        self.concent_service._loop()
+        self.concent_service._loop()
+
+        assert self.concent_service.get_stats()['queue_depth'] == 2
+        release.set()
+        self._wait_for_requests()
+        assert send_mock.call_count == max_in_flight
+
+        self.concent_service._loop()
+        self._wait_for_requests()
+        assert send_mock.call_count == max_in_flight + 2
 
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
@@ -336,24 +419,35 @@ class TestConcentClientService(testutils.TempDirFixture):
             signing_key=self.concent_service.keys_auth._private_key,
             public_key=self.concent_service.keys_auth.public_key,
             concent_variant=self.concent_service.variant,
+            session=mock.ANY,
+            timeout=self.concent_service.RECEIVE_TIMEOUT,
         )
         react_mock.assert_has_calls(
             (
                 mock.call(content),
             ),
         )
+        # Concent is polled again until there are no more messages
+        assert self.concent_service._next_receive <= time.monotonic()
 
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
-        '._grace_sleep'
+        '.react_to_concent_message'
     )
+    def test_receive_nothing(self, react_mock, _send_mock, receive_mock, *_):
+        receive_mock.return_value = None
+        self.concent_service._next_receive = next_receive = \
+            time.monotonic() + variables.CONCENT_PULL_INTERVAL
+        self.concent_service.receive()
+        react_mock.assert_called_once_with(None)
+        assert self.concent_service._next_receive == next_receive
+
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
         '.react_to_concent_message'
     )
     def test_receive_concent_error(self,
                                    react_mock,
-                                   sleep_mock,
                                    _send_mock,
                                    receive_mock,
                                    *_):
@@ -363,21 +457,21 @@ class TestConcentClientService(testutils.TempDirFixture):
             signing_key=mock.ANY,
             public_key=mock.ANY,
             concent_variant=self.concent_service.variant,
+            session=mock.ANY,
+            timeout=mock.ANY,
         )
-        sleep_mock.assert_called_once_with()
+        grace_time = self.concent_service.MIN_GRACE_TIME \
+            * self.concent_service.GRACE_FACTOR
+        assert self.concent_service._receive_backoff.delay == grace_time
+        assert self.concent_service._next_receive > time.monotonic()
         react_mock.assert_not_called()
 
-    @mock.patch(
-        'golem.network.concent.client.ConcentClientService'
-        '._grace_sleep'
-    )
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
         '.react_to_concent_message'
     )
     def test_receive_exception(self,
                                react_mock,
-                               sleep_mock,
                                _send_mock,
                                receive_mock,
                                *_):
@@ -387,8 +481,10 @@ class TestConcentClientService(testutils.TempDirFixture):
             signing_key=mock.ANY,
             public_key=mock.ANY,
             concent_variant=mock.ANY,
+            session=mock.ANY,
+            timeout=mock.ANY,
         )
-        sleep_mock.assert_called_once_with()
+        assert self.concent_service._next_receive > time.monotonic()
         react_mock.assert_not_called()
 
     def test_react_to_concent_message_none(self, *_):
@@ -429,6 +525,145 @@ class TestConcentClientService(testutils.TempDirFixture):
         )
 
 
+class StubConcentHandler(http.server.BaseHTTPRequestHandler):
+    """ Concent stub answering each request after `delay` seconds. Sent
+    messages are decrypted and kept, messages from `outbox` are returned
+    to clients polling the receive endpoint. """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):  # noqa pylint:disable=invalid-name
+        server = self.server
+        data = self.rfile.read(int(self.headers['Content-Length']))
+        sending = self.path == '/api/v1/send/'
+        with server.lock:
+            server.connections.add(self.client_address)
+            if sending:
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight,
+                                           server.in_flight)
+        time.sleep(server.delay)
+
+        body = b''
+        with server.lock:
+            if sending:
+                server.in_flight -= 1
+                server.sent.append(golem_messages.load(
+                    data, server.keys.raw_privkey, server.client_public_key))
+            else:
+                server.receive_requests += 1
+                if server.outbox:
+                    body = server.outbox.pop(0)
+
+        self.send_response(200)
+        self.send_header('Concent-Golem-Messages-Version',
+                         golem_messages.__version__)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):  # pylint:disable=arguments-differ
+        pass
+
+
+class StubConcentServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class ConcentClientServiceStubConcentTest(testutils.TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        terms_patch = mock.patch(
+            'golem.terms.ConcentTermsOfUse.are_accepted', return_value=True)
+        terms_patch.start()
+        self.addCleanup(terms_patch.stop)
+
+        keys_auth = keysauth.KeysAuth(
+            datadir=self.path,
+            private_key_name='priv_key',
+            password='password',
+        )
+        self.server = StubConcentServer(('127.0.0.1', 0), StubConcentHandler)
+        self.server.keys = golem_messages.cryptography.ECCx(None)
+        self.server.client_public_key = keys_auth.public_key
+        self.server.lock = threading.Lock()
+        self.server.connections = set()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.delay = 0.
+        self.server.sent = []
+        self.server.receive_requests = 0
+        self.server.outbox = []
+        threading.Thread(target=self.server.serve_forever, daemon=True)\
+            .start()
+
+        self.concent_service = client.ConcentClientService(
+            keys_auth=keys_auth,
+            variant={
+                'url': 'http://127.0.0.1:{}'.format(self.server.server_port),
+                'pubkey': self.server.keys.raw_pubkey,
+            },
+            max_in_flight=4,
+        )
+
+    def tearDown(self):
+        self.concent_service.stop()
+        self.concent_service.join(timeout=3)
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    @staticmethod
+    def _wait_until(condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "Timed out"
+            time.sleep(.01)
+
+    def test_pipelined_send(self):
+        self.server.delay = .2
+        submitted = calendar.timegm(time.gmtime())
+        for i in range(8):
+            msg = msg_factories.concents.ForceReportComputedTaskFactory()
+            # Stale header of a message prepared long before it's sent
+            msg.header = msg_datastructures.MessageHeader(
+                msg.header.type_, submitted - 3600, msg.header.encrypted)
+            self.concent_service.submit(
+                'key{}'.format(i), msg, delay=datetime.timedelta())
+
+        self.concent_service.start()
+        self._wait_until(lambda: self.concent_service.get_stats()['sent'] == 8)
+
+        stats = self.concent_service.get_stats()
+        assert stats['failed'] == 0
+        assert stats['in_flight'] == 0
+        assert stats['queue_depth'] == 0
+        assert stats['request_time'] >= self.server.delay
+        assert 1 < self.server.max_in_flight <= 4
+        # Connections are kept alive and reused
+        assert len(self.server.connections) <= 4 + 1
+        assert len(self.server.sent) == 8
+        assert all(msg.timestamp >= submitted for msg in self.server.sent)
+
+    def test_receive_until_empty(self):
+        for _ in range(2):
+            self.server.outbox.append(golem_messages.dump(
+                msg_factories.concents.ForceReportComputedTaskFactory(),
+                self.server.keys.raw_privkey,
+                self.server.client_public_key,
+            ))
+
+        self.concent_service.start()
+        for _ in range(2):
+            msg = self.concent_service.received_messages.get(timeout=10)
+            assert isinstance(msg, message.concents.ForceReportComputedTask)
+            self.concent_service.received_messages.task_done()
+
+        # Concent is polled right away while it has messages to deliver
+        self._wait_until(lambda: self.server.receive_requests == 3)
+        assert self.concent_service.get_stats()['received'] == 2
+
+
 class ConcentCallLaterTestCase(testutils.TempDirFixture):
     def setUp(self):
         super().setUp()
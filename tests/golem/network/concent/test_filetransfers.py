@@ -1,5 +1,9 @@
 import base64
+import http.server
+import os
 import queue
+import socketserver
+import threading
 import unittest
 
 import mock
@@ -61,6 +65,15 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
                 file_transfer_token.serialize()).decode(),
         }
 
+    @staticmethod
+    def _mock_response(content=b'content'):
+        return mock.Mock(
+            ok=True,
+            status_code=200,
+            headers={'Content-Length': str(len(content))},
+            iter_content=mock.Mock(return_value=[content]),
+        )
+
     def tearDown(self):
         self.assertFalse(self.cfs.running)
 
@@ -113,6 +126,7 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         ftt = FileTransferTokenFactory()
         self.cfs.transfer(path, ftt)
         self.cfs._run()
+        self.cfs._transfers.join()
         process_mock.assert_called_once()
         request = process_mock.call_args[0][0]
         self.assertIsInstance(request, filetransfers.ConcentFileRequest)
@@ -185,7 +199,7 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         file.write_text('meh')
         return str(file)
 
-    @mock.patch('golem.network.concent.filetransfers.requests.post')
+    @mock.patch('golem.network.concent.filetransfers.requests.Session.post')
     def test_upload(self, requests_mock):
         path = self._init_uploaded_file('something.good')
 
@@ -210,7 +224,7 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         self.assertIsNotNone(kwargs.get('headers').pop('Concent-Auth'))
         self.assertEqual(kwargs.get('headers'), headers)
 
-    @mock.patch('golem.network.concent.filetransfers.requests.post')
+    @mock.patch('golem.network.concent.filetransfers.requests.Session.post')
     def test_upload_multiple_files(self, requests_mock):
         path = self._init_uploaded_file('obsta.cles')
         category = FileTransferToken.FileInfo.Category.resources
@@ -238,7 +252,7 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         concent_upload_path = kwargs.get('headers').get('Concent-Upload-Path')
         self.assertEqual(concent_upload_path, ftt.files[1].get('path'))  # noqa pylint:disable=unsubscriptable-object
 
-    @mock.patch('golem.network.concent.filetransfers.requests.get')
+    @mock.patch('golem.network.concent.filetransfers.requests.Session.get')
     def test_download(self, requests_mock):
         path = self.path + '/gotwell.soon'
 
@@ -252,6 +266,7 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         download_address = ftt.storage_cluster_address + 'download/' + \
             ftt.files[0].get('path')  # noqa pylint:disable=unsubscriptable-object
 
+        requests_mock.return_value = self._mock_response()
         self.cfs.download(request)
 
         requests_mock.assert_called_once()
@@ -264,7 +279,7 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
             self._mock_get_auth_headers(ftt)
         )
 
-    @mock.patch('golem.network.concent.filetransfers.requests.get')
+    @mock.patch('golem.network.concent.filetransfers.requests.Session.get')
     def test_download_multiple_files(self, requests_mock):
         path = self.path + '/spanish.sahara'
         category = FileTransferToken.FileInfo.Category.resources
@@ -286,7 +301,158 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         download_address = ftt.storage_cluster_address + 'download/' + \
             ftt.files[1].get('path')  # noqa pylint:disable=unsubscriptable-object
 
+        requests_mock.return_value = self._mock_response()
         self.cfs.download(request)
 
         requests_mock.assert_called_once()
         self.assertEqual(requests_mock.call_args[0], (download_address, ))
+
+
+class StubClusterHandler(http.server.BaseHTTPRequestHandler):
+    """ Storage cluster stub keeping files in memory. Downloads are
+    interrupted once, halfway through, when `interrupt` is set. """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # noqa pylint:disable=invalid-name
+        length = int(self.headers['Content-Length'])
+        path = self.headers['Concent-Upload-Path']
+        self.server.files[path] = self.rfile.read(length)
+        self.server.connections.add(self.client_address)
+        self._respond(200, b'')
+
+    def do_GET(self):  # noqa pylint:disable=invalid-name
+        path = self.path[len('/download/'):]
+        self.server.connections.add(self.client_address)
+        content = self.server.files.get(path)
+        if content is None:
+            self._respond(404, b'not found')
+            return
+
+        start = 0
+        if 'Range' in self.headers:
+            start = int(self.headers['Range'][len('bytes='):-1])
+            self.send_response(206)
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(content) - start))
+        self.end_headers()
+
+        if self.server.interrupt:
+            self.server.interrupt = False
+            self.wfile.write(content[start:len(content) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(content[start:])
+
+    def _respond(self, code, body):
+        self.send_response(code)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):  # pylint:disable=arguments-differ
+        pass
+
+
+class StubClusterServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class ConcentFiletransferStubClusterTest(testutils.TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.server = StubClusterServer(('127.0.0.1', 0), StubClusterHandler)
+        self.server.files = {}
+        self.server.connections = set()
+        self.server.interrupt = False
+        threading.Thread(target=self.server.serve_forever, daemon=True)\
+            .start()
+        self.address = 'http://127.0.0.1:{}/'.format(self.server.server_port)
+
+        self.cfs = filetransfers.ConcentFiletransferService(
+            keys_auth=keysauth.KeysAuth(
+                datadir=self.path,
+                private_key_name='priv_key',
+                password='password',
+            ),
+            variant=variables.CONCENT_CHOICES['dev'],
+            max_workers=4,
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def _ftt(self, path, **kwargs):
+        return FileTransferTokenFactory(
+            storage_cluster_address=self.address,
+            files=[FileInfoFactory(
+                path=path,
+                category=FileTransferToken.FileInfo.Category.results)],
+            **kwargs,
+        )
+
+    def test_parallel_upload_and_download(self):
+        contents = {'file{}'.format(i): os.urandom(100000 + i)
+                    for i in range(8)}
+        success = mock.Mock()
+
+        for name, content in contents.items():
+            path = os.path.join(self.path, name)
+            with open(path, 'wb') as f:
+                f.write(content)
+            self.cfs.transfer(path, self._ftt(name, upload=True),
+                              success=success)
+        self.cfs._run()
+        self.cfs._transfers.join()
+
+        assert success.call_count == len(contents)
+        assert self.server.files == contents
+
+        for name in contents:
+            self.cfs.transfer(os.path.join(self.path, name + '.down'),
+                              self._ftt(name, download=True),
+                              success=success)
+        self.cfs._run()
+        self.cfs._transfers.join()
+
+        for name, content in contents.items():
+            with open(os.path.join(self.path, name + '.down'), 'rb') as f:
+                assert f.read() == content
+
+        stats = self.cfs.get_stats()
+        assert stats['completed'] == 2 * len(contents)
+        assert stats['failed'] == 0
+        assert stats['bytes'] == 2 * sum(map(len, contents.values()))
+        # Connections are reused
+        assert len(self.server.connections) <= 2 * self.cfs.max_workers
+
+    def test_download_resume(self):
+        content = os.urandom(1000000)
+        self.server.files['resumed'] = content
+        self.server.interrupt = True
+        path = os.path.join(self.path, 'resumed')
+
+        response = self.cfs.download(filetransfers.ConcentFileRequest(
+            path, self._ftt('resumed', download=True)))
+
+        assert response.status_code == 206
+        with open(path, 'rb') as f:
+            assert f.read() == content
+        assert self.cfs.get_stats()['bytes'] == len(content)
+
+    def test_download_not_found(self):
+        error = mock.Mock()
+        path = os.path.join(self.path, 'missing')
+        self.cfs.transfer(path, self._ftt('missing', download=True),
+                          error=error)
+        self.cfs._run()
+        self.cfs._transfers.join()
+
+        error.assert_called_once()
+        assert isinstance(error.call_args[0][0],
+                          filetransfers.ConcentFiletransferError)
+        assert self.cfs.get_stats()['failed'] == 1
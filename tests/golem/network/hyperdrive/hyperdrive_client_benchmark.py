@@ -0,0 +1,85 @@
+import json
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+from golem.network.hyperdrive.client import HyperdriveClient
+
+REQUESTS = 500
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+class StubDaemonServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubDaemonHandler(BaseHTTPRequestHandler):
+    """ Responds to every hyperg API command with the requested hash """
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        length = int(self.headers['Content-Length'])
+        params = json.loads(self.rfile.read(length).decode('utf-8'))
+        body = json.dumps({'hash': params.get('hash')}).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+class UnpooledHyperdriveClient(HyperdriveClient):
+    """ Opens a new connection for every request """
+
+    def _request(self, **data):
+        response = requests.post(url=self._url,
+                                 headers=self._headers,
+                                 data=json.dumps(data),
+                                 timeout=self.timeout)
+        response.raise_for_status()
+        return json.loads(response.content.decode('utf-8'))
+
+
+@pytest.fixture(scope='module')
+def daemon_port():
+    server = StubDaemonServer(('127.0.0.1', 0), StubDaemonHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def cancel(client):
+    for i in range(REQUESTS):
+        client.cancel('hash_{}'.format(i))
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_pooled_cancel_speed(benchmark, daemon_port):
+    client = HyperdriveClient(port=daemon_port, host='127.0.0.1')
+    benchmark(cancel, client)
+    client.close()
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_unpooled_cancel_speed(benchmark, daemon_port):
+    client = UnpooledHyperdriveClient(port=daemon_port, host='127.0.0.1')
+    benchmark(cancel, client)
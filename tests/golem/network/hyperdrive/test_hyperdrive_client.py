@@ -21,7 +21,7 @@ response = {
 response_str = json.dumps(response)
 
 
-@mock.patch('golem.network.hyperdrive.client.requests.post',
+@mock.patch('golem.network.hyperdrive.client.requests.Session.post',
             return_value=mock.Mock(text=response_str,
                                    content=response_str.encode()))
 class TestHyperdriveClient(TestCase):
@@ -68,7 +68,7 @@ class TestHyperdriveClient(TestCase):
         assert client.cancel(content_hash) == response_hash
 
     @mock.patch('json.loads')
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_request(self, post, json_loads, _):
         client = HyperdriveClient()
         resp = mock.Mock()
@@ -77,6 +77,16 @@ class TestHyperdriveClient(TestCase):
         client._request(key="value")
         assert json_loads.called
 
+    def test_request_reuses_session(self, post):
+        client = HyperdriveClient()
+        session = client._session
+
+        client.id()
+        client.cancel(str(uuid.uuid4()))
+
+        assert post.call_count == 2
+        assert client._session is session
+
     @mock.patch('json.loads')
     def test_request_exception(self, json_loads, post):
         client = HyperdriveClient()
@@ -206,6 +216,39 @@ class TestHyperdriveClientAsync(TestCase):
             assert wrapper.called
             assert isinstance(wrapper.result, str)
 
+    def test_cancel_many_async(self):
+        client = HyperdriveAsyncClient()
+        pending = []
+
+        def cancel_async(content_hash):
+            deferred = Deferred()
+            pending.append((content_hash, deferred))
+            return deferred
+
+        on_error = mock.Mock(side_effect=lambda failure_: failure_)
+        hashes = ['hash_{}'.format(i) for i in range(client.POOL_SIZE * 2)]
+
+        with mock.patch.object(client, 'cancel_async',
+                               side_effect=cancel_async):
+            result = client.cancel_many_async(hashes + hashes[:2],
+                                              on_error=on_error)
+
+            # Requests in flight are limited to the pool size
+            assert len(pending) == client.POOL_SIZE
+            assert not result.called
+
+            pending[0][1].errback(Exception())
+            # Each finished request lets the next one in
+            for i in range(1, len(hashes)):
+                pending[i][1].callback('hash')
+
+        # Duplicate hashes are cancelled once
+        assert [content_hash for content_hash, _ in pending] == hashes
+        assert on_error.call_count == 1
+        assert result.called
+        assert [success for success, _ in result.result] == \
+            [False] + [True] * (len(hashes) - 1)
+
 
 class TestHyperdriveClientOptions(TestCase):
 
@@ -0,0 +1,65 @@
+import os
+import random
+
+import pytest
+
+from golem.network.p2p.peerkeeper import PeerKeeper, K_SIZE
+
+PEERS = 100000
+LOOKUPS = 1000
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+class SyntheticPeer:
+    def __init__(self, key):
+        self.key = key
+
+
+def random_keys(n, seed=0):
+    rand = random.Random(seed)
+    return ['{:0128x}'.format(rand.getrandbits(K_SIZE)) for _ in range(n)]
+
+
+def fill(peer_keeper, peers):
+    for peer in peers:
+        peer_keeper.add_peer(peer)
+
+
+def find_nodes(peer_keeper, key_nums):
+    for key_num in key_nums:
+        peer_keeper.neighbours(key_num, peer_keeper.k)
+
+
+@pytest.fixture(scope='module')
+def own_key():
+    return random_keys(1, seed=1)[0]
+
+
+@pytest.fixture(scope='module')
+def peers():
+    return [SyntheticPeer(key) for key in random_keys(PEERS)]
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_add_peers_speed(benchmark, own_key, peers):
+    benchmark.pedantic(
+        fill,
+        setup=lambda: ((PeerKeeper(own_key), peers), {}),
+        rounds=3,
+    )
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_find_node_speed(benchmark, own_key, peers):
+    peer_keeper = PeerKeeper(own_key)
+    fill(peer_keeper, peers)
+    rand = random.Random(2)
+    key_nums = [rand.getrandbits(K_SIZE) for _ in range(LOOKUPS)]
+    benchmark(find_nodes, peer_keeper, key_nums)
@@ -0,0 +1,157 @@
+import os
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from golem_messages import factories as msg_factories
+from golem_messages import message
+from golem_messages.datastructures.masking import Mask
+from golem_messages.factories.datastructures import p2p as dt_p2p_factory
+from golem_messages.utils import encode_hex as encode_key_id
+from twisted.internet.defer import succeed
+
+from golem import clientconfigdescriptor
+from golem import testutils
+from golem.core.keysauth import KeysAuth
+from golem.network.p2p.p2pservice import P2PService
+from golem.network.p2p.peersession import PeerSession
+from golem.task.taskserver import TaskServer
+from tests.factories import taskserver as task_server_factory
+
+HEADERS = 2000
+OWNERS = 20
+HEADERS_PER_MESSAGE = 20
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+def signed_task_headers(path, n):
+    headers = []
+    for i in range(OWNERS):
+        keys_auth = KeysAuth(os.path.join(path, str(i)), 'priv_key', 'pass')
+        key = encode_key_id(keys_auth.public_key)
+        for _ in range(n // OWNERS):
+            header = msg_factories.datastructures.tasks.TaskHeaderFactory(
+                mask=Mask().to_bytes(),
+                requestor_public_key=key,
+                task_owner=msg_factories.datastructures.p2p.Node(key=key),
+            )
+            header.sign(private_key=keys_auth._private_key)  # noqa pylint:disable=protected-access
+            headers.append(header)
+    return headers
+
+
+@pytest.fixture
+def session_and_messages():
+    fixture = testutils.DatabaseFixture()
+    fixture.setUp()
+    try:
+        session = PeerSession(MagicMock())
+        session.p2p_service = P2PService(
+            node=dt_p2p_factory.Node(),
+            config_desc=clientconfigdescriptor.ClientConfigDescriptor(),
+            keys_auth=KeysAuth(fixture.path, 'priv_key', 'password'),
+            connect_to_known_hosts=False,
+        )
+        client = MagicMock()
+        client.datadir = fixture.path
+        with patch('golem.network.concent.handlers_library.HandlersLibrary'
+                   '.register_handler'):
+            session.p2p_service.task_server = \
+                task_server_factory.TaskServer(client=client)
+
+        headers = signed_task_headers(fixture.path, HEADERS)
+        messages = [
+            message.p2p.Tasks(tasks=headers[i:i + HEADERS_PER_MESSAGE])
+            for i in range(0, len(headers), HEADERS_PER_MESSAGE)
+        ]
+        yield session, messages
+    finally:
+        fixture.tearDown()
+
+
+def react_to_tasks(session, messages):
+    for msg in messages:
+        session._react_to_tasks(msg)  # pylint: disable=protected-access
+
+
+def clear_verified_headers(session, messages):
+    TaskServer.verified_headers.clear()
+    return (session, messages), {}
+
+
+# Verification is run synchronously, to measure its cost alone
+@patch('golem.task.taskserver.deferToThread',
+       lambda f, *args: succeed(f(*args)))
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_react_to_new_tasks_speed(benchmark, session_and_messages):
+    # headers/s = HEADERS * rounds/s
+    session, messages = session_and_messages
+    benchmark.pedantic(
+        react_to_tasks,
+        setup=lambda: clear_verified_headers(session, messages),
+        rounds=3,
+    )
+
+
+@patch('golem.task.taskserver.deferToThread',
+       lambda f, *args: succeed(f(*args)))
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_react_to_known_tasks_speed(benchmark, session_and_messages):
+    # The same headers gossiped again by other peers
+    session, messages = session_and_messages
+    react_to_tasks(session, messages)
+    benchmark(react_to_tasks, session, messages)
+
+
+SYNCS = 10
+
+
+class LoopbackSessions:
+    """ Two peer sessions, `provider` asking `requestor` for tasks """
+
+    def __init__(self, headers, keys_auth):
+        self.keys_auth = keys_auth
+        self.sent_bytes = []
+        self.requestor = PeerSession(MagicMock())
+        self.requestor.p2p_service = Mock()
+        self.requestor.p2p_service.get_own_tasks_headers.return_value = \
+            headers
+        self.requestor.p2p_service.get_others_tasks_headers.return_value = []
+        self.requestor.send = self._send
+        self.provider = PeerSession(MagicMock())
+        self.provider.p2p_service = Mock()
+        self.provider.p2p_service.add_task_headers.side_effect = \
+            lambda headers: succeed([True] * len(headers))
+
+    def _send(self, msg):
+        data = msg.serialize(sign_as=self.keys_auth._private_key)  # noqa pylint:disable=protected-access
+        self.sent_bytes.append(len(data))
+        self.provider._react_to_tasks(msg)  # noqa pylint:disable=protected-access
+
+    def sync(self, syncs=SYNCS):
+        for _ in range(syncs):
+            self.requestor._react_to_get_tasks(message.p2p.GetTasks())  # noqa pylint:disable=protected-access
+        return sum(self.sent_bytes)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_get_tasks_sync_bytes(benchmark, session_and_messages):
+    # Headers already known to the asking peer are not sent again, so after
+    # the first few syncs nothing is sent at all
+    session, messages = session_and_messages
+    headers = [header for msg in messages for header in msg.tasks]
+    keys_auth = session.p2p_service.keys_auth
+
+    sent_bytes = benchmark.pedantic(
+        lambda sessions: sessions.sync(),
+        setup=lambda: ((LoopbackSessions(headers, keys_auth),), {}),
+        rounds=3,
+    )
+    benchmark.extra_info['bytes_per_sync'] = sent_bytes / SYNCS
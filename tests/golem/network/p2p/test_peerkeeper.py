@@ -98,6 +98,53 @@ class TestPeerKeeper(unittest.TestCase, testutils.PEP8MixIn):
         neighs = self.peer_keeper.neighbours(not_added_peer.key_num ^ 1)
         assert not_added_peer == neighs[0]
 
+    def test_neighbours_of_random_keys(self):
+        for _ in range(256):
+            self.peer_keeper.add_peer(MockPeer(random_key(self.n_bytes)))
+        peers = [p for b in self.peer_keeper.buckets for p in b.peers]
+
+        for _ in range(20):
+            key_num = key_to_number(random_key(self.n_bytes))
+            expected = sorted(peers, key=lambda p: p.key_num ^ key_num)
+            nodes = self.peer_keeper.neighbours(key_num, self.peer_keeper.k)
+            assert nodes == expected[:self.peer_keeper.k]
+
+    def test_bucket_for_peer(self):
+        for _ in range(256):
+            self.peer_keeper.add_peer(MockPeer(random_key(self.n_bytes)))
+        assert len(self.peer_keeper.buckets) > 1
+
+        for bucket in self.peer_keeper.buckets:
+            assert self.peer_keeper.bucket_for_peer(bucket.start) is bucket
+            assert self.peer_keeper.bucket_for_peer(bucket.end - 1) is bucket
+            for peer in bucket.peers:
+                assert self.peer_keeper.bucket_for_peer(peer.key_num) \
+                    is bucket
+        assert self.peer_keeper.bucket_for_peer(2 ** K_SIZE) is None
+
+    def test_set_last_message_time(self):
+        peer = MockPeer(random_key(self.n_bytes))
+        self.peer_keeper.add_peer(peer)
+        bucket = self.peer_keeper.bucket_for_peer(peer.key_num)
+        bucket.last_updated = 0
+
+        self.peer_keeper.set_last_message_time(peer.key)
+        assert bucket.last_updated > 0
+
+    def test_remove_old_requests(self):
+        self.peer_keeper.idle_refresh = -1
+        peers_to_find = self.peer_keeper.sync()
+        assert peers_to_find
+        assert set(self.peer_keeper.find_requests) == set(peers_to_find)
+
+        self.peer_keeper.idle_refresh = 3600
+        self.peer_keeper.sync()
+        assert self.peer_keeper.find_requests
+
+        self.peer_keeper.request_timeout = -1
+        self.peer_keeper.sync()
+        assert not self.peer_keeper.find_requests
+
     def test_estimated_network_size_buckets_bigger_than_k(self):
         for _ in range(self.peer_keeper.k):
             self.peer_keeper.buckets[0].peers.append(
@@ -8,23 +8,30 @@ import uuid
 from unittest import TestCase
 from unittest.mock import patch, Mock, MagicMock, ANY
 
+import freezegun
 import semantic_version
 from golem_messages import message
 from golem_messages.factories.datastructures import p2p as dt_p2p_factory
 from pydispatch import dispatcher
+from twisted.internet.defer import succeed
 
 import golem
 from golem import clientconfigdescriptor
 from golem import testutils
 from golem.core.keysauth import KeysAuth
 from golem.core.variables import PROTOCOL_CONST
-from golem.core.variables import TASK_HEADERS_LIMIT
+from golem.core.variables import TASK_HEADERS_LIMIT, \
+    TASK_HEADERS_RESEND_INTERVAL
 from golem.network.p2p.p2pservice import P2PService
 from golem.network.p2p.peersession import (logger, PeerSession, PeerSessionInfo)
 from golem.tools.assertlogs import LogTestCase
 from tests.factories import taskserver as task_server_factory
 
 
+def task_headers(ids):
+    return [Mock(task_id=str(i), signature=b'signature') for i in ids]
+
+
 def fill_slots(msg):
     for slot in msg.__slots__:
         if hasattr(msg, slot):
@@ -392,8 +399,8 @@ class TestPeerSession(testutils.DatabaseFixture, LogTestCase,
         peer_session._react_to_get_tasks(Mock())
         assert not peer_session.send.called
 
-        peer_session.p2p_service.get_own_tasks_headers.return_value = list(
-            range(0, 100))
+        peer_session.p2p_service.get_own_tasks_headers.return_value = \
+            task_headers(range(0, 100))
         peer_session.p2p_service.get_others_tasks_headers.return_value = list()
         peer_session._react_to_get_tasks(Mock())
 
@@ -401,10 +408,10 @@ class TestPeerSession(testutils.DatabaseFixture, LogTestCase,
         assert len(sent_tasks) <= TASK_HEADERS_LIMIT
         assert len(sent_tasks) == len(set(sent_tasks))
 
-        peer_session.p2p_service.get_own_tasks_headers.return_value = list(
-            range(0, TASK_HEADERS_LIMIT - 1))
-        peer_session.p2p_service.get_others_tasks_headers.return_value = list(
-            range(0, TASK_HEADERS_LIMIT - 1))
+        peer_session.p2p_service.get_own_tasks_headers.return_value = \
+            task_headers(range(0, TASK_HEADERS_LIMIT - 1))
+        peer_session.p2p_service.get_others_tasks_headers.return_value = \
+            task_headers(range(0, TASK_HEADERS_LIMIT - 1))
         peer_session._react_to_get_tasks(Mock())
         sent_tasks = peer_session.send.call_args_list[0][0][0].tasks
         assert len(sent_tasks) <= TASK_HEADERS_LIMIT
@@ -418,15 +425,15 @@ class TestPeerSession(testutils.DatabaseFixture, LogTestCase,
         peer_session.send = MagicMock()
 
         peer_session.p2p_service.get_own_tasks_headers.return_value = None
-        peer_session.p2p_service.get_others_tasks_headers.return_value = list(
-            range(0, 10))
+        peer_session.p2p_service.get_others_tasks_headers.return_value = \
+            task_headers(range(0, 10))
         peer_session._react_to_get_tasks(Mock())
         sent_tasks = peer_session.send.call_args_list[0][0][0].tasks
         assert len(sent_tasks) <= TASK_HEADERS_LIMIT
         assert len(sent_tasks) == len(set(sent_tasks))
 
-        peer_session.p2p_service.get_own_tasks_headers.return_value = list(
-            range(0, 10))
+        peer_session.p2p_service.get_own_tasks_headers.return_value = \
+            task_headers(range(0, 10))
         peer_session.p2p_service.get_others_tasks_headers.return_value = None
         peer_session._react_to_get_tasks(Mock())
         sent_tasks = peer_session.send.call_args_list[0][0][0].tasks
@@ -440,10 +447,10 @@ class TestPeerSession(testutils.DatabaseFixture, LogTestCase,
         peer_session.p2p_service.get_others_tasks_headers = Mock()
         peer_session.send = MagicMock()
 
-        peer_session.p2p_service.get_own_tasks_headers.return_value = list(
-            range(0, 50))
-        peer_session.p2p_service.get_others_tasks_headers.return_value = list(
-            range(51, 100))
+        peer_session.p2p_service.get_own_tasks_headers.return_value = \
+            task_headers(range(0, 50))
+        peer_session.p2p_service.get_others_tasks_headers.return_value = \
+            task_headers(range(51, 100))
         peer_session._react_to_get_tasks(Mock())
         sent_tasks = peer_session.send.call_args_list[0][0][0].tasks
 
@@ -455,6 +462,72 @@ class TestPeerSession(testutils.DatabaseFixture, LogTestCase,
         assert len(sent_tasks) <= TASK_HEADERS_LIMIT
         assert len(sent_tasks) == len(set(sent_tasks))
 
+    def test_react_to_get_tasks_delta(self):
+        peer_session = PeerSession(MagicMock())
+        peer_session.p2p_service.get_own_tasks_headers = Mock()
+        peer_session.p2p_service.get_others_tasks_headers = Mock()
+        peer_session.p2p_service.add_task_headers.return_value = succeed([])
+        peer_session.send = MagicMock()
+
+        my_tasks = task_headers(range(0, 5))
+        other_tasks = task_headers(range(5, 10))
+        peer_session.p2p_service.get_own_tasks_headers.return_value = my_tasks
+        peer_session.p2p_service.get_others_tasks_headers.return_value = \
+            other_tasks
+
+        peer_session._react_to_get_tasks(Mock())
+        sent_tasks = peer_session.send.call_args[0][0].tasks
+        assert set(sent_tasks) == set(my_tasks + other_tasks)
+
+        # Nothing new
+        peer_session.send.reset_mock()
+        peer_session._react_to_get_tasks(Mock())
+        peer_session.send.assert_not_called()
+
+        # Updated and received headers
+        my_tasks[0].signature = b'new signature'
+        received = task_headers(range(10, 12))
+        peer_session._react_to_tasks(message.p2p.Tasks(tasks=received))
+        other_tasks.extend(received)
+        peer_session._react_to_get_tasks(Mock())
+        assert peer_session.send.call_args[0][0].tasks == [my_tasks[0]]
+
+        # Forgotten and re-added headers are sent again
+        del other_tasks[0]
+        peer_session._react_to_get_tasks(Mock())
+        peer_session.send.reset_mock()
+        assert '5' not in peer_session.known_headers
+        other_tasks.extend(task_headers([5]))
+        peer_session._react_to_get_tasks(Mock())
+        assert [t.task_id for t in peer_session.send.call_args[0][0].tasks] \
+            == ['5']
+
+    def test_react_to_get_tasks_resend(self):
+        peer_session = PeerSession(MagicMock())
+        peer_session.p2p_service.get_own_tasks_headers = Mock(
+            return_value=task_headers(range(0, 2)))
+        peer_session.p2p_service.get_others_tasks_headers = Mock(
+            return_value=[])
+        peer_session.send = MagicMock()
+
+        with freezegun.freeze_time() as frozen_time:
+            peer_session._react_to_get_tasks(Mock())
+            assert len(peer_session.send.call_args[0][0].tasks) == 2
+
+            # The peer may have dropped the headers in the meantime
+            peer_session.send.reset_mock()
+            frozen_time.tick(TASK_HEADERS_RESEND_INTERVAL - 1)
+            peer_session._react_to_get_tasks(Mock())
+            peer_session.send.assert_not_called()
+
+            frozen_time.tick(1)
+            peer_session._react_to_get_tasks(Mock())
+            assert len(peer_session.send.call_args[0][0].tasks) == 2
+
+            peer_session.send.reset_mock()
+            peer_session._react_to_get_tasks(Mock())
+            peer_session.send.assert_not_called()
+
     @patch('golem.network.p2p.peersession.PeerSession._send_peers')
     def test_react_to_get_peers(self, send_mock):
         msg = message.p2p.GetPeers()
@@ -516,6 +589,25 @@ class TestPeerSession(testutils.DatabaseFixture, LogTestCase,
         assert keys_auth.verify(msg.sig, msg.get_short_hash(), keys_auth.key_id)
         return msg, task_id, previous_ka
 
+    def _react_to_tasks(self, results):
+        self.peer_session.p2p_service = Mock()
+        self.peer_session.p2p_service.add_task_headers.return_value = \
+            succeed(results)
+        self.peer_session.disconnect = Mock()
+        msg = message.p2p.Tasks(tasks=[Mock()] * len(results))
+        self.peer_session._react_to_tasks(msg)
+        self.peer_session.p2p_service.add_task_headers.assert_called_once_with(
+            msg.tasks)
+
+    def test_react_to_tasks(self):
+        self._react_to_tasks([True, True])
+        self.peer_session.disconnect.assert_not_called()
+
+    def test_react_to_tasks_invalid(self):
+        self._react_to_tasks([True, False])
+        self.peer_session.disconnect.assert_called_once_with(
+            message.base.Disconnect.REASON.BadProtocol)
+
     def test_react_to_remove_task_unknown_task_owner(self):
         msg, task_id, previous_ka = \
             self._gen_data_for_test_react_to_remove_task()
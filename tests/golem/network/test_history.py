@@ -1,6 +1,7 @@
 # pylint: disable=protected-access
 import datetime
 import queue
+import threading
 import uuid
 import unittest
 import unittest.mock as mock
@@ -210,50 +211,178 @@ class TestMessageHistoryService(DatabaseFixture):
         self.service._loop()
         assert not self.service._sweep.called
 
-    def test_loop_add_sync(self):
+    def test_loop_save_batch(self):
         self.service._sweep = mock.Mock()
         self.service._queue_timeout = 0.1
-        self.service.add_sync = mock.Mock()
+        self.service._save_batch = mock.Mock()
 
         # No message
         self.service._loop()
-        assert not self.service.add_sync.called
+        assert not self.service._save_batch.called
 
-        # Add message
-        msg = self._build_dict()
-        self.service._save_queue.put(msg)
+        # Add messages
+        msgs = [self._build_dict() for _ in range(3)]
+        for msg in msgs:
+            self.service._save_queue.put(msg)
+
+        # With messages, saved at once
+        self.service._loop()
+        self.service._save_batch.assert_called_once_with(msgs)
 
-        # With message
+        # No message again, since they were popped from the queue
+        self.service._save_batch.reset_mock()
         self.service._loop()
-        assert self.service.add_sync.called
+        assert not self.service._save_batch.called
+
+    @mock.patch(
+        'golem.network.history.MessageHistoryService.BATCH_SIZE', 2)
+    def test_loop_save_batch_size(self):
+        self.service._sweep = mock.Mock()
+        self.service._queue_timeout = 0.1
+        self.service._save_batch = mock.Mock()
+
+        msgs = [self._build_dict() for _ in range(3)]
+        for msg in msgs:
+            self.service._save_queue.put(msg)
 
-        # No message again, since it was popped from the queue
-        self.service.add_sync.reset_mock()
         self.service._loop()
-        assert not self.service.add_sync.called
+        self.service._save_batch.assert_called_once_with(msgs[:2])
+        self.service._loop()
+        self.service._save_batch.assert_called_with(msgs[2:])
 
-    def test_loop_remove_sync(self):
+    def test_loop_remove_batch(self):
         self.service._sweep = mock.Mock()
         self.service._queue_timeout = 0.1
-        self.service.remove_sync = mock.Mock()
+        self.service._remove_batch = mock.Mock()
 
         # No tuple
         self.service._loop()
-        assert not self.service.remove_sync.called
+        assert not self.service._remove_batch.called
 
-        # Add tuple
-        task = str(uuid.uuid4())
-        props = dict(subtask=str(uuid.uuid4()))
-        self.service._remove_queue.put((task, props))
+        # Add tuples
+        removals = [(str(uuid.uuid4()), dict(subtask=str(uuid.uuid4())))
+                    for _ in range(3)]
+        for removal in removals:
+            self.service._remove_queue.put(removal)
 
-        # With tuple
+        # With tuples
         self.service._loop()
-        assert self.service.remove_sync.called
+        self.service._remove_batch.assert_called_once_with(removals)
 
         # Not tuple again, since it was popped from the queue
-        self.service.remove_sync.reset_mock()
+        self.service._remove_batch.reset_mock()
         self.service._loop()
-        assert not self.service.remove_sync.called
+        assert not self.service._remove_batch.called
+
+    def test_save_batch(self):
+        msgs = [self._build_dict() for _ in range(
+            self.service.INSERT_CHUNK_SIZE + 10)]
+        for msg in msgs:
+            self.service.add(msg)
+
+        self.service._save_batch(msgs)
+        assert message_count() == len(msgs)
+        assert not self.service._pending
+
+        stats = self.service.get_stats()
+        assert stats['batch_size'] == len(msgs)
+        assert stats['commit_time'] >= 0
+
+    def test_save_batch_fail(self):
+        broken = self._build_dict()
+        broken['msg_data'] = None
+        msgs = [self._build_dict(), broken, self._build_dict()]
+        for msg in msgs:
+            self.service.add(msg)
+
+        self.service._save_batch(msgs)
+        # The broken message is dropped, others are saved one by one
+        assert message_count() == 2
+        assert not self.service._pending
+
+    @mock.patch('golem.model.NetworkMessage.insert_many',
+                side_effect=PeeweeException)
+    @mock.patch('golem.model.NetworkMessage.save',
+                side_effect=PeeweeException)
+    def test_save_batch_temporary_fail(self, *_):
+        msg = self._build_dict()
+        self.service.add(msg)
+        assert self.service._save_queue.get(block=False) is msg
+
+        self.service._save_batch([msg])
+        assert message_count() == 0
+        assert self.service._save_queue.get(block=False) is msg
+        assert self.service.get_sync(task=msg['task'])
+
+    def test_remove_batch(self):
+        msgs = [self._build_dict("task"), self._build_dict("task"),
+                self._build_dict()]
+        for msg in msgs:
+            self.service.add_sync(msg)
+
+        self.service._remove_batch([
+            ("task", dict(subtask=msgs[0]['subtask'])),
+            (msgs[2]['task'], dict()),
+        ])
+        assert message_count() == 1
+
+    def test_get_sync_pending(self):
+        history.MessageHistoryService.instance = self.service
+        saved = self._build_dict("task")
+        self.service.add_sync(saved)
+        pending = self._build_dict("task")
+        self.service.add(pending)
+        self.service.add(self._build_dict("other_task"))
+
+        result = self.service.get_sync(task="task")
+        assert [m.subtask for m in result] == \
+            [saved['subtask'], pending['subtask']]
+
+        result = self.service.get_sync(task="task",
+                                       subtask=pending['subtask'])
+        assert len(result) == 1
+        assert result[0].msg_data == pending['msg_data']
+
+        self.service._queue_timeout = 0.1
+        self.service._sweep_ts = datetime.datetime.max
+        self.service._loop()
+        assert not self.service._pending
+        assert len(self.service.get_sync(task="task")) == 2
+        assert message_count() == 3
+
+    def test_get_sync_during_commit(self):
+        history.MessageHistoryService.instance = self.service
+        msgs = [self._build_dict("task"), self._build_dict("task")]
+        for msg in msgs:
+            self.service.add(msg)
+
+        results = []
+        insert_many = NetworkMessage.insert_many
+
+        def insert(rows):
+            # Lookups are not blocked by the commit in progress
+            thread = threading.Thread(target=lambda: results.append(
+                self.service.get_sync(task="task")))
+            thread.start()
+            thread.join(5)
+            assert not thread.is_alive()
+            return insert_many(rows)
+
+        with mock.patch('golem.model.NetworkMessage.insert_many',
+                        side_effect=insert):
+            self.service._save_batch(msgs)
+
+        assert len(results[0]) == 2
+        assert len(self.service.get_sync(task="task")) == 2
+
+    def test_get_sync_pending_and_saved(self):
+        history.MessageHistoryService.instance = self.service
+        msg = self._build_dict("task")
+        self.service.add(msg)
+        # Committed, but not removed from pending yet
+        NetworkMessage.insert_many([msg]).execute()
+
+        assert len(self.service.get_sync(task="task")) == 1
 
 
 @mock.patch("golem.network.history.MessageHistoryService.add")
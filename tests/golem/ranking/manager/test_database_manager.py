@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+from golem.model import LocalRank
 from golem.ranking.helper.trust import Trust
 from golem.ranking.manager import database_manager as dm
 from golem.testutils import DatabaseFixture
@@ -251,3 +254,96 @@ class TestDatabaseManager(DatabaseFixture):
         """Should throw exception for WRONG_COMPUTED increase."""
         with self.assertRaises(KeyError):
             Trust.WRONG_COMPUTED.increase('alpha', 0.3)
+
+
+class TestLocalRankCache(DatabaseFixture):
+
+    @staticmethod
+    def _db_rank(node_id):
+        return LocalRank.select().where(LocalRank.node_id == node_id).first()
+
+    def test_increase_is_written_behind(self):
+        dm.increase_positive_computed('alpha', 1.0)
+        dm.increase_negative_payment('alpha', 0.5)
+        dm.increase_positive_computed('alpha', 2.0)
+
+        assert self._db_rank('alpha') is None
+        assert dm.get_local_rank('alpha').positive_computed == 3.0
+
+        dm.local_rank_cache.flush()
+
+        rank = self._db_rank('alpha')
+        assert rank.positive_computed == 3.0
+        assert rank.negative_payment == 0.5
+
+    def test_flush_updates_existing_rows(self):
+        LocalRank.create(node_id='alpha', positive_computed=1.0,
+                         requestor_paid_sum=10)
+
+        dm.increase_positive_computed('alpha', 2.0)
+        dm.increase_negative_computed('beta', 1.0)
+        dm.local_rank_cache.flush()
+
+        rank = self._db_rank('alpha')
+        assert rank.positive_computed == 3.0
+        assert rank.requestor_paid_sum == 10
+        assert self._db_rank('beta').negative_computed == 1.0
+        assert LocalRank.select().count() == 2
+
+    def test_get_is_cached(self):
+        LocalRank.create(node_id='alpha', positive_computed=1.0)
+        assert dm.get_local_rank('alpha').positive_computed == 1.0
+        assert dm.get_local_rank('beta') is None
+
+        with patch.object(LocalRank, 'select', side_effect=AssertionError):
+            assert dm.get_local_rank('alpha').positive_computed == 1.0
+            assert dm.get_local_rank('beta') is None
+            dm.increase_positive_computed('alpha', 1.0)
+            dm.increase_positive_computed('beta', 1.0)
+            assert dm.get_local_rank('alpha').positive_computed == 2.0
+            assert dm.get_local_rank('beta').positive_computed == 1.0
+
+    def test_cache_eviction(self):
+        cache = dm.LocalRankCache(max_size=1)
+        LocalRank.create(node_id='alpha', positive_computed=1.0)
+        cache.increase('alpha', 'positive_computed', 1.0)
+
+        assert cache.get('alpha').positive_computed == 2.0
+        assert cache.get('beta') is None
+        # Evicted entries are reloaded with pending increments applied
+        assert cache.get('alpha').positive_computed == 2.0
+
+    def test_max_pending(self):
+        cache = dm.LocalRankCache(max_pending=2)
+        cache.increase('alpha', 'positive_computed', 1.0)
+        assert self._db_rank('alpha') is None
+
+        cache.increase('beta', 'positive_computed', 1.0)
+        assert self._db_rank('alpha').positive_computed == 1.0
+        assert self._db_rank('beta').positive_computed == 1.0
+
+    def test_update_invalidates_cache(self):
+        dm.increase_positive_computed('alpha', 1.0)
+        dm.update_requestor_assigned_sum('alpha', 5)
+        dm.local_rank_cache.flush()
+
+        rank = dm.get_local_rank('alpha')
+        assert rank.requestor_assigned_sum == 5
+        assert rank.positive_computed == 1.0
+
+    def test_get_local_rank_for_all_flushes(self):
+        dm.increase_positive_computed('alpha', 1.0)
+        ranks = list(dm.get_local_rank_for_all())
+        assert [rank.node_id for rank in ranks] == ['alpha']
+
+    def test_failed_flush_keeps_increments(self):
+        dm.increase_positive_computed('alpha', 1.0)
+
+        with patch.object(dm.LocalRankCache, '_create',
+                          side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                dm.local_rank_cache.flush()
+
+        dm.increase_positive_computed('alpha', 1.0)
+        dm.local_rank_cache.flush()
+        assert self._db_rank('alpha').positive_computed == 2.0
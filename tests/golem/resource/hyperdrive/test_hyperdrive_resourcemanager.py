@@ -236,6 +236,22 @@ class TestHyperdriveResourceManager(TempDirFixture):
         assert deferred.called
         assert isinstance(deferred.result, Failure)
 
+    def test_remove_task(self, _add, _restore):
+        hashes = [str(uuid.uuid4()) for _ in range(3)]
+        for content_hash in hashes:
+            self.resource_manager.storage.cache.add_resource(Resource(
+                content_hash, task_id=self.task_id,
+                path=self.tempdir, files=['test_file']))
+
+        with patch.object(self.resource_manager.client,
+                          'cancel_many_async') as cancel_many_async:
+            self.resource_manager.remove_task(self.task_id)
+
+        assert list(cancel_many_async.call_args[0][0]) == hashes
+        assert not self.resource_manager.storage.get_resources(self.task_id)
+        with self.assertRaises(ResourceError):
+            self.resource_manager.remove_task(self.task_id)
+
 
 class TestHandleAsync(TestCase):
 
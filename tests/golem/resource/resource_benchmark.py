@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import time
+
+import pytest
+
+from golem.resource.hashcache import hash_cache
+from golem.resource.resource import TaskResourceHeader
+
+DIRS = 100
+FILES_PER_DIR = 100
+FILE_SIZE = 16 * 1024
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+@pytest.fixture(scope='module')
+def resource_dir():
+    """ Synthesizes a tree of DIRS * FILES_PER_DIR texture-like files """
+    directory = tempfile.mkdtemp()
+    mtime = time.time() - 60
+    for i in range(DIRS):
+        sub_dir = os.path.join(directory, 'textures_{:03d}'.format(i))
+        os.makedirs(sub_dir)
+        for j in range(FILES_PER_DIR):
+            path = os.path.join(sub_dir, 'texture_{:03d}.png'.format(j))
+            with open(path, 'wb') as f:
+                f.write(os.urandom(FILE_SIZE))
+            os.utime(path, (mtime, mtime))
+    yield directory
+    shutil.rmtree(directory)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_build_header_cold_cache_speed(benchmark, resource_dir):
+    benchmark.pedantic(
+        TaskResourceHeader.build,
+        args=('resources', resource_dir),
+        setup=hash_cache.clear,
+        rounds=3,
+    )
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_build_header_warm_cache_speed(benchmark, resource_dir):
+    TaskResourceHeader.build('resources', resource_dir)
+    benchmark(TaskResourceHeader.build, 'resources', resource_dir)
@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from unittest.mock import patch
+
+from golem.core.simplehash import SimpleHash
+from golem.resource.hashcache import FileHashCache
+from golem.testutils import TempDirFixture
+
+
+class TestFileHashCache(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.dump_file = os.path.join(self.path, 'file_hashes.pickle')
+        self.cache = FileHashCache(self.dump_file)
+        self.files = self.additional_dir_content([4])
+        self._make_old(*self.files)
+
+    @staticmethod
+    def _make_old(*paths):
+        mtime = time.time() - 60
+        for path in paths:
+            os.utime(path, (mtime, mtime))
+
+    def test_get_many(self):
+        hashes = self.cache.get_many(self.files)
+
+        assert hashes == {
+            path: SimpleHash.hash_file_base64(path) for path in self.files
+        }
+        assert len(self.cache) == len(self.files)
+
+    def test_cached_hashes_are_not_recomputed(self):
+        self.cache.get_many(self.files)
+
+        with patch('golem.resource.hashcache.SimpleHash') as simple_hash:
+            self.cache.get_many(self.files)
+            self.cache.get(self.files[0])
+
+        simple_hash.hash_file_base64.assert_not_called()
+
+    def test_modified_file_is_rehashed(self):
+        self.cache.get_many(self.files)
+
+        with open(self.files[0], 'w') as f:
+            f.write('modified')
+        self._make_old(self.files[0])
+
+        expected = SimpleHash.hash_file_base64(self.files[0])
+        assert self.cache.get(self.files[0]) == expected
+
+    def test_recently_modified_file_is_not_cached(self):
+        with open(self.files[0], 'w') as f:
+            f.write('modified')
+
+        self.cache.get(self.files[0])
+        assert len(self.cache) == 0
+
+    def test_missing_file(self):
+        with self.assertRaises(OSError):
+            self.cache.get(os.path.join(self.path, 'missing'))
+
+    def test_max_entries(self):
+        cache = FileHashCache(max_entries=2)
+        cache.get_many(self.files)
+        assert len(cache) == 2
+
+        with patch('golem.resource.hashcache.SimpleHash') as simple_hash:
+            cache.get_many(self.files[-2:])
+        simple_hash.hash_file_base64.assert_not_called()
+
+    def test_save_and_load(self):
+        hashes = self.cache.get_many(self.files)
+        self.cache.save()
+        assert os.path.exists(self.dump_file)
+
+        cache = FileHashCache(self.dump_file)
+        assert len(cache) == len(self.files)
+        with patch('golem.resource.hashcache.SimpleHash') as simple_hash:
+            assert cache.get_many(self.files) == hashes
+        simple_hash.hash_file_base64.assert_not_called()
+
+    def test_save_unchanged(self):
+        self.cache.save()
+        assert not os.path.exists(self.dump_file)
+
+    def test_save_failure(self):
+        self.cache.get_many(self.files)
+
+        with patch('golem.resource.hashcache.os.replace',
+                   side_effect=OSError):
+            self.cache.save()
+
+        assert not os.path.exists(self.dump_file)
+        assert not any(name.endswith('.tmp') for name in os.listdir(self.path))
+
+        # Still changed, so saved next time
+        self.cache.save()
+        assert len(FileHashCache(self.dump_file)) == len(self.files)
+
+    def test_concurrent_saves(self):
+        replace = os.replace
+        threads = []
+
+        def save_during_replace(*args):
+            # Another save, with more entries, while the first one renames
+            if not threads:
+                self.cache.get_many(self.files)
+                threads.append(threading.Thread(target=self.cache.save))
+                threads[0].start()
+                threads[0].join(0.1)
+                assert threads[0].is_alive()
+            replace(*args)
+
+        self.cache.get_many(self.files[:2])
+        with patch('golem.resource.hashcache.os.replace',
+                   side_effect=save_during_replace):
+            self.cache.save()
+            threads[0].join()
+
+        assert len(FileHashCache(self.dump_file)) == len(self.files)
+        assert not any(name.endswith('.tmp') for name in os.listdir(self.path))
+
+    def test_load_invalid_file(self):
+        with open(self.dump_file, 'wb') as f:
+            f.write(b'invalid')
+
+        cache = FileHashCache(self.dump_file)
+        assert len(cache) == 0
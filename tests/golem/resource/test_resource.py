@@ -5,6 +5,7 @@ import zipfile
 from apps.core.task.coretask import CoreTask
 from apps.core.task.coretaskstate import TaskDefinition
 
+from golem.core.simplehash import SimpleHash
 from golem.resource.dirmanager import DirManager
 from golem.resource.resource import (get_resources_for_task, ResourceType,
                                      TaskResource, TaskResourceHeader)
@@ -56,6 +57,34 @@ class TestTaskResourceHeader(TempDirFixture):
         with self.assertRaises(TypeError):
             TaskResourceHeader.build_header_delta_from_header(None, None, None)
 
+    def testBuildHashes(self):
+        with open(self.file3, 'w') as f:
+            f.write("file3 contents")
+
+        dir_name = self.dir_manager.get_task_resource_dir('task2')
+        header = TaskResourceHeader.build("resource", dir_name)
+        self.assertEqual(
+            sorted(header.files_data),
+            [('file1', SimpleHash.hash_file_base64(self.file1)),
+             ('file2', SimpleHash.hash_file_base64(self.file2))])
+        self.assertEqual(
+            header.sub_dir_headers[0].files_data,
+            [('file3', SimpleHash.hash_file_base64(self.file3))])
+
+        delta = TaskResourceHeader.build_header_delta_from_header(
+            header, dir_name, None)
+        self.assertEqual(delta.files_data, [])
+        self.assertEqual(delta.sub_dir_headers[0].files_data, [])
+
+        with open(self.file3, 'w') as f:
+            f.write("file3 modified")
+        delta = TaskResourceHeader.build_header_delta_from_header(
+            header, dir_name, None)
+        self.assertEqual(
+            delta.sub_dir_headers[0].files_data,
+            [('file3', SimpleHash.hash_file_base64(self.file3))])
+        self.assertEqual(delta.files_data, [])
+
 
 class TestTaskResource(TempDirFixture):
 
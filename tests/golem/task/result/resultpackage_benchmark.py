@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from golem.core.fileencrypt import AESFileEncryptor, FileEncryptor
+from golem.task.result.resultpackage import EncryptingPackager, ZipPackager
+
+FILES = 4
+FILE_SIZE = int(os.environ.get('benchmark_file_size', 64 * 1024 * 1024))
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+class LegacyEncryptingPackager(EncryptingPackager):
+    """ Zips to disk and encrypts the zip in a second pass with AES-CBC """
+
+    def create(self, output_path, disk_files):
+        tmp_file_path = self.package_name(output_path)
+        pkg_file_path, pkg_sha1 = ZipPackager().create(tmp_file_path,
+                                                       disk_files)
+        AESFileEncryptor.encrypt(pkg_file_path, output_path,
+                                 secret=self._secret)
+        return output_path, pkg_sha1
+
+
+@pytest.fixture(scope='module')
+def result_files():
+    """ Synthesizes large, poorly compressible files resembling EXR frames """
+    directory = tempfile.mkdtemp()
+    paths = []
+    for i in range(FILES):
+        path = os.path.join(directory, 'frame_{:04d}.exr'.format(i))
+        with open(path, 'wb') as f:
+            for _ in range(FILE_SIZE // (1024 * 1024)):
+                f.write(os.urandom(1024 * 1024))
+        paths.append(path)
+    yield paths
+    shutil.rmtree(directory)
+
+
+def package(packager_class, files):
+    output_dir = tempfile.mkdtemp()
+    try:
+        packager = packager_class(FileEncryptor.gen_secret(10, 20))
+        path, _ = packager.create(os.path.join(output_dir, 'package'), files)
+        packager.extract(path, os.path.join(output_dir, 'extracted'))
+    finally:
+        shutil.rmtree(output_dir)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_package_speed(benchmark, result_files):
+    benchmark(package, EncryptingPackager, result_files)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_legacy_package_speed(benchmark, result_files):
+    benchmark(package, LegacyEncryptingPackager, result_files)
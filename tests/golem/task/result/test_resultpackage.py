@@ -2,8 +2,10 @@ import uuid
 from os import makedirs, listdir
 from os.path import basename, exists, join, relpath
 from pathlib import Path
+from unittest.mock import patch
 
-from golem.core.fileencrypt import FileEncryptor
+from golem.core.fileencrypt import FileEncryptor, AESFileEncryptor, \
+    AESCTRFileEncryptor, DecryptionError
 from golem.resource.dirmanager import DirManager
 from golem.task.result.resultpackage import EncryptingPackager, \
     EncryptingTaskResultPackager, ExtractedPackage, ZipPackager, backup_rename
@@ -148,6 +150,62 @@ class TestEncryptingPackager(PackageDirContentsFixture):
 
         self.assertTrue(len(files) == len(self.all_files))
 
+    def testCreateWritesPlainPackage(self):
+        ep = EncryptingPackager(self.secret)
+        path, pkg_sha1 = ep.create(self.out_path, self.disk_files)
+        zip_path = ep.package_name(path)
+
+        assert AESCTRFileEncryptor.is_encrypted(path)
+        assert pkg_sha1 == EncryptingPackager.compute_sha1(zip_path)
+
+        files, _ = ZipPackager().extract(zip_path, join(self.path, 'plain'))
+        assert len(files) == len(self.all_files)
+
+    def testExtractToOutputDir(self):
+        ep = EncryptingPackager(self.secret)
+        ep.create(self.out_path, self.disk_files)
+        output_dir = join(self.path, 'extracted')
+        files, files_dir = ep.extract(self.out_path, output_dir)
+
+        assert files_dir == output_dir
+        assert all(exists(join(output_dir, f)) for f in files)
+        assert not exists(self.out_path)
+
+    def testExtractLegacyPackage(self):
+        zip_path, _ = ZipPackager().create(self.out_path + '.zip',
+                                           self.disk_files)
+        AESFileEncryptor.encrypt(zip_path, self.out_path, self.secret)
+
+        ep = EncryptingPackager(self.secret)
+        files, _ = ep.extract(self.out_path)
+
+        self.assertEqual(len(files), len(self.all_files))
+        self.assertTrue(all(exists(join(self.out_dir, f)) for f in files))
+
+    def testCreateFailure(self):
+        ep = EncryptingPackager(self.secret)
+
+        with patch.object(ZipPackager, 'write_disk_file',
+                          side_effect=[None, OSError()]):
+            with self.assertRaises(OSError):
+                ep.create(self.out_path, self.disk_files)
+
+        assert not exists(self.out_path)
+        assert not exists(ep.package_name(self.out_path))
+
+    def testExtractTamperedPackage(self):
+        ep = EncryptingPackager(self.secret)
+        ep.create(self.out_path, self.disk_files)
+
+        with open(self.out_path, 'r+b') as f:
+            f.seek(-1, 2)
+            byte = f.read(1)
+            f.seek(-1, 2)
+            f.write(bytes([byte[0] ^ 1]))
+
+        with self.assertRaises(DecryptionError):
+            ep.extract(self.out_path)
+
 
 class TestEncryptingTaskResultPackager(PackageDirContentsFixture):
 
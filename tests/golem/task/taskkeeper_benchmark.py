@@ -0,0 +1,107 @@
+import os
+import random
+
+import pytest
+from eth_utils import encode_hex
+from golem_messages import idgenerator
+from golem_messages.datastructures import tasks as dt_tasks
+from golem_messages.datastructures.masking import Mask
+from golem_messages.factories.datastructures import p2p as dt_p2p_factory
+
+import golem
+from golem.core.common import timeout_to_deadline
+from golem.environments.environment import Environment
+from golem.environments.environmentsmanager import EnvironmentsManager
+from golem.task.taskkeeper import TaskHeaderKeeper
+
+HEADERS = 100000
+TASKS_PER_OWNER = 10
+LOOKUPS = 1000
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+def task_headers(n):
+    rand = random.Random(0)
+    headers = []
+    for i in range(n // TASKS_PER_OWNER):
+        owner_key = bytes(rand.getrandbits(8) for _ in range(64))
+        for _ in range(TASKS_PER_OWNER):
+            headers.append(dt_tasks.TaskHeader(
+                task_id=idgenerator.generate_id(owner_key),
+                task_owner={
+                    "node_name": "node {}".format(i),
+                    "key": encode_hex(owner_key)[2:],
+                    "pub_addr": "10.10.10.10",
+                    "pub_port": 10101
+                },
+                environment=Environment.get_id(),
+                deadline=timeout_to_deadline(rand.randint(600, 3600)),
+                subtask_timeout=120,
+                subtasks_count=1,
+                max_price=10,
+                min_version=golem.__version__,
+                estimated_memory=0,
+                mask=Mask().to_bytes(),
+                timestamp=0,
+                signature=None,
+            ))
+    return headers
+
+
+def task_header_keeper():
+    environment = Environment()
+    environment.accept_tasks = True
+    environments_manager = EnvironmentsManager()
+    environments_manager.add_environment(environment)
+    return TaskHeaderKeeper(
+        environments_manager=environments_manager,
+        node=dt_p2p_factory.Node(),
+        min_price=10,
+        max_tasks_per_requestor=TASKS_PER_OWNER)
+
+
+def fill(task_keeper, headers):
+    for header in headers:
+        task_keeper.add_task_header(header)
+
+
+def get_tasks(task_keeper, exclude):
+    for _ in range(LOOKUPS):
+        task_keeper.get_task(exclude)
+
+
+@pytest.fixture(scope='module')
+def headers():
+    return task_headers(HEADERS)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=3, warmup=False)
+def test_add_task_headers_speed(benchmark, headers):
+    benchmark.pedantic(
+        fill,
+        setup=lambda: ((task_header_keeper(), headers), {}),
+        rounds=3,
+    )
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_get_task_speed(benchmark, headers):
+    task_keeper = task_header_keeper()
+    fill(task_keeper, headers)
+    exclude = {header.task_id for header in random.sample(headers, 10)}
+    benchmark(get_tasks, task_keeper, exclude)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_remove_old_tasks_speed(benchmark, headers):
+    task_keeper = task_header_keeper()
+    fill(task_keeper, headers)
+    benchmark(task_keeper.remove_old_tasks)
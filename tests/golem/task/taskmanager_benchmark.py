@@ -0,0 +1,67 @@
+import os
+import uuid
+from unittest.mock import Mock, patch
+
+import pytest
+from golem_messages.factories.datastructures import p2p as dt_p2p_factory
+
+from apps.dummy.task.dummytask import DummyTaskBuilder
+from apps.dummy.task.dummytaskstate import DummyTaskDefinition, \
+    DummyTaskDefaults
+from golem.resource.dirmanager import DirManager
+from golem.task.taskmanager import TaskManager
+from golem.task.taskstate import SubtaskState, SubtaskStatus
+
+SUBTASKS = 2000
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+@pytest.fixture
+def task_manager(tmpdir):
+    keys_auth = Mock()
+    keys_auth._private_key = b'a' * 32
+    tm = TaskManager(
+        dt_p2p_factory.Node(),
+        keys_auth,
+        root_path=str(tmpdir),
+        task_persistence=True,
+    )
+
+    definition = DummyTaskDefinition(DummyTaskDefaults())
+    definition.task_id = 'benchmark'
+    task = DummyTaskBuilder(
+        dt_p2p_factory.Node(node_name="MyNode"),
+        definition,
+        DirManager(str(tmpdir)),
+    ).build()
+
+    with patch('twisted.internet.reactor.callLater'):
+        tm.add_new_task(task)
+        task_state = tm.tasks_states[task.header.task_id]
+        for _ in range(SUBTASKS):
+            ss = SubtaskState()
+            ss.subtask_id = str(uuid.uuid4())
+            ss.subtask_status = SubtaskStatus.finished
+            ss.extra_data = {'start_task': 1, 'end_task': 1}
+            task_state.subtask_states[ss.subtask_id] = ss
+        yield tm, task.header.task_id
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=100, warmup=False)
+def test_notice_task_updated_speed(benchmark, task_manager):
+    tm, task_id = task_manager
+    with patch('twisted.internet.reactor.callLater'):
+        benchmark(tm.notice_task_updated, task_id)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.benchmark(min_rounds=100, warmup=False)
+def test_dump_task_speed(benchmark, task_manager):
+    tm, task_id = task_manager
+    benchmark(tm.dump_task, task_id)
@@ -55,11 +55,12 @@ class TestBenchmarkManager(DatabaseFixture, PEP8MixIn):
         assert not self.b.benchmarks_needed()
 
     @patch("golem.task.benchmarkmanager.Thread", MockThread)
-    @patch("golem.environments.environment.make_perf_test")
+    @patch("golem.environments.environment.make_calibrated_perf_test")
     @patch("golem.task.benchmarkmanager.BenchmarkRunner")
     def test_run_all_benchmarks(self, br_mock, mpt_mock, *_):
         # given
-        mpt_mock.return_value = 314.15  # default performance
+        # default performance, all cores performance
+        mpt_mock.return_value = (314.15, 1256.6)
 
         def _run():
             # call success callback with performance = call_count * 100
@@ -75,13 +76,14 @@ class TestBenchmarkManager(DatabaseFixture, PEP8MixIn):
         # then
         assert mpt_mock.call_count == 1
         assert DefaultEnvironment.get_performance() == 314.15
+        assert DefaultEnvironment.get_all_cores_performance() == 1256.6
         assert br_mock.call_count == len(self.b.benchmarks)
         for idx, env_id in enumerate(reversed(list(self.b.benchmarks))):
             assert (1 + idx) * 100 == \
                    Performance.get(Performance.environment_id == env_id).value
 
     @patch("golem.task.benchmarkmanager.Thread", MockThread)
-    @patch("golem.environments.environment.make_perf_test")
+    @patch("golem.environments.environment.make_calibrated_perf_test")
     @patch("golem.task.benchmarkmanager.BenchmarkRunner")
     def test_run_non_default_benchmarks(self, br_mock, mpt_mock, *_):
         # given
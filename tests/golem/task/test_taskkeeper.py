@@ -1,8 +1,11 @@
 # pylint: disable=protected-access
+import copy
+import pickle
 from datetime import timedelta
 from pathlib import Path
 import random
 import time
+import unittest
 import unittest.mock as mock
 
 from eth_utils import encode_hex
@@ -175,6 +178,34 @@ class TestTaskHeaderKeeper(LogTestCase):
         th = tk.get_task()
         self.assertEqual(task_header2.to_dict(), th.to_dict())
 
+        task_header3 = get_task_header("rst")
+        self.assertTrue(tk.add_task_header(task_header3))
+        exclude = {task_header2.task_id}
+        for _ in range(10):
+            th = tk.get_task(exclude)
+            self.assertEqual(task_header3.task_id, th.task_id)
+        exclude.add(task_header3.task_id)
+        self.assertIsNone(tk.get_task(exclude))
+
+    def test_remove_old_tasks_updated_deadline(self):
+        tk = TaskHeaderKeeper(
+            environments_manager=EnvironmentsManager(),
+            node=dt_p2p_factory.Node(),
+            min_price=10)
+        task_header = get_task_header()
+        task_header.deadline = get_timestamp_utc() - 1
+        assert tk.add_task_header(task_header)
+
+        # A newer header extends the deadline
+        task_header = copy.copy(task_header)
+        task_header.deadline = timeout_to_deadline(10)
+        task_header.timestamp = 1
+        task_header.signature = b'new'
+        assert tk.add_task_header(task_header)
+
+        tk.remove_old_tasks()
+        assert task_header.task_id in tk.task_headers
+
     @freeze_time(as_arg=True)
     def test_old_tasks(frozen_time, _):  # pylint: disable=no-self-argument
         tk = TaskHeaderKeeper(
@@ -208,6 +239,34 @@ class TestTaskHeaderKeeper(LogTestCase):
         assert len(tk.supported_tasks) == 1
         assert tk.supported_tasks[0] == task_id
 
+    @freeze_time(as_arg=True)
+    def test_remove_task_if_expired(frozen_time, _):  # noqa pylint: disable=no-self-argument
+        tk = TaskHeaderKeeper(
+            environments_manager=EnvironmentsManager(),
+            node=dt_p2p_factory.Node(),
+            min_price=10)
+        e = Environment()
+        e.accept_tasks = True
+        tk.environments_manager.add_environment(e)
+        task_header = get_task_header()
+        task_header.deadline = timeout_to_deadline(1)
+        task_id = task_header.task_id
+        assert tk.add_task_header(task_header)
+
+        assert not tk.remove_task_if_expired(task_id)
+        assert not tk.remove_task_if_expired("unknown")
+
+        frozen_time.tick(timedelta(seconds=1.1))  # pylint: disable=no-member
+        assert tk.remove_task_if_expired(task_id)
+        assert task_id not in tk.task_headers
+        assert not tk.add_task_header(task_header)
+
+        frozen_time.tick(  # pylint: disable=no-member
+            timedelta(seconds=tk.removed_task_timeout + 1))
+        task_header.deadline = timeout_to_deadline(10)
+        assert tk.add_task_header(task_header)
+        assert task_id not in tk.removed_tasks
+
     @mock.patch('golem.task.taskarchiver.TaskArchiver')
     def test_task_header_update_stats(self, tar):
         e = Environment()
@@ -415,6 +474,61 @@ class TestTaskHeaderKeeper(LogTestCase):
         assert tk.get_owner("UNKNOWN") is None
 
 
+class TestHeaderSignatureCache(unittest.TestCase):
+    def test_key(self):
+        header = get_task_header()
+        header.signature = b'signature'
+        key = taskkeeper.HeaderSignatureCache.key(header)
+        assert key == taskkeeper.HeaderSignatureCache.key(
+            copy.deepcopy(header))
+
+        header.max_price += 1
+        assert key != taskkeeper.HeaderSignatureCache.key(header)
+
+    def test_lru(self):
+        cache = taskkeeper.HeaderSignatureCache(max_size=2)
+        cache.add(('a',))
+        cache.add(('b',))
+        assert ('a',) in cache
+        cache.add(('c',))
+        assert len(cache) == 2
+        assert ('a',) in cache
+        assert ('b',) not in cache
+        assert ('c',) in cache
+
+        cache.clear()
+        assert ('a',) not in cache
+
+
+class TestRandomAccessSet(unittest.TestCase):
+    def test_add_discard(self):
+        items = taskkeeper.RandomAccessSet(['a', 'b', 'c'])
+        items.add('a')
+        items.discard('a')
+        items.discard('unknown')
+        items.add('d')
+
+        assert len(items) == 3
+        assert sorted(items) == ['b', 'c', 'd']
+        assert 'a' not in items
+        assert 'd' in items
+
+        items.clear()
+        assert not items
+        assert items.choice() is None
+
+    def test_choice(self):
+        items = taskkeeper.RandomAccessSet(str(i) for i in range(100))
+        assert items.choice() in items
+
+        exclude = {str(i) for i in range(99)}
+        for _ in range(10):
+            assert items.choice(exclude) == '99'
+
+        exclude.add('99')
+        assert items.choice(exclude) is None
+
+
 def get_dict_task_header(key_id_seed="kkk"):
     key_id = str.encode(key_id_seed)
     return {
@@ -680,6 +794,53 @@ class TestCompTaskKeeper(LogTestCase, PEP8MixIn, TempDirFixture):
         ctk.restore()
         self.assertEqual(ctk.get_package_paths(task_id), package_paths)
 
+    @mock.patch('golem.core.golem_async.async_run')
+    def test_dump_coalesced(self, async_run_mock):
+        ctk = CompTaskKeeper(self.new_path)
+        ctk.add_package_paths('task1', ['path/1'])
+        ctk.add_package_paths('task2', ['path/2'])
+        ctk.add_package_paths('task3', ['path/3'])
+        assert async_run_mock.call_count == 1
+        assert not ctk.dump_path.exists()
+
+        request = async_run_mock.call_args[0][0]
+        with mock.patch.object(ctk, '_dump_tasks',
+                               wraps=ctk._dump_tasks) as dump_tasks:
+            request.method(*request.args, **request.kwargs)
+        assert dump_tasks.call_count == 1
+
+        ctk.add_package_paths('task4', ['path/4'])
+        assert async_run_mock.call_count == 2
+
+        another_ctk = CompTaskKeeper(self.new_path)
+        assert set(another_ctk.task_package_paths) == \
+            {'task1', 'task2', 'task3'}
+
+    @mock.patch('golem.core.golem_async.async_run', async_run)
+    def test_dump_failure(self):
+        ctk = CompTaskKeeper(self.new_path)
+        ctk.add_package_paths('task1', ['path/1'])
+
+        with mock.patch('golem.task.taskkeeper.pickle.dump',
+                        side_effect=pickle.PicklingError):
+            ctk.add_package_paths('task2', ['path/2'])
+        assert not ctk.dump_path.with_suffix('.pickle.tmp').exists()
+        another_ctk = CompTaskKeeper(self.new_path)
+        assert set(another_ctk.task_package_paths) == {'task1'}
+
+        ctk.dump_pending()
+        another_ctk = CompTaskKeeper(self.new_path)
+        assert set(another_ctk.task_package_paths) == {'task1', 'task2'}
+
+    def test_restore_old_dump(self):
+        dump_path = self.new_path / "comp_task_keeper.pickle"
+        with dump_path.open('wb') as f:
+            pickle.dump(({}, {'subtask': 'task'}), f)
+
+        ctk = CompTaskKeeper(self.new_path)
+        assert ctk.subtask_to_task == {'subtask': 'task'}
+        assert ctk.task_package_paths == {}
+
     @mock.patch('golem.core.golem_async.async_run', async_run)
     def test_resources_options(self):
         task_path = Path(self.path)
@@ -210,6 +210,8 @@ class TestTaskManager(LogTestCase, TestDatabaseWithReactor,  # noqa # pylint: di
             for task, task_id in zip(tasks, task_ids):
                 temp_tm.add_new_task(task)
                 temp_tm.start_task(task.header.task_id)
+            temp_tm.dump_dirty_tasks()
+            for task_id in task_ids:
                 assert any(
                     "TASK %s DUMPED" % task_id in log for log in log.output)
 
@@ -242,6 +244,70 @@ class TestTaskManager(LogTestCase, TestDatabaseWithReactor,  # noqa # pylint: di
         self.tm.restore_tasks()
         assert not broken_pickle_file.is_file()
 
+    def test_remove_interrupted_dump_during_restore(self):
+        tmp_pickle_file = self.tm.tasks_dir / "xyz.pickle.tmp"
+        with tmp_pickle_file.open('w') as f:
+            f.write("partial")
+        self.tm.restore_tasks()
+        assert not tmp_pickle_file.is_file()
+        assert "xyz" not in self.tm.tasks
+
+    def test_schedule_dump_coalesces_updates(self):
+        task = self._get_test_dummy_task("xyz")
+        with patch('twisted.internet.reactor.callLater') as call_later, \
+                patch('golem.task.taskmanager.TaskManager.dump_task') \
+                as dump_mock:
+            self.tm.add_new_task(task)
+            self.tm.start_task("xyz")
+            self.tm.notice_task_updated("xyz")
+            self.tm.notice_task_updated("xyz")
+            call_later.assert_called_once_with(
+                TaskManager.DUMP_DELAY,
+                self.tm._dump_dirty_tasks_async,
+            )
+            dump_mock.assert_not_called()
+
+            self.tm.dump_dirty_tasks()
+            dump_mock.assert_called_once_with("xyz")
+            call_later.return_value.cancel.assert_called_once_with()
+
+    def test_dump_failure_keeps_task_dirty(self):
+        task = self._get_test_dummy_task("xyz")
+        with patch('twisted.internet.reactor.callLater'):
+            self.tm.add_new_task(task)
+            self.tm.start_task("xyz")
+        with patch('golem.task.taskmanager.pickle.dump',
+                   side_effect=RuntimeError):
+            self.tm.dump_dirty_tasks()
+        assert self.tm._dirty_tasks == {"xyz"}
+        assert not list(self.tm.tasks_dir.iterdir())
+
+    def test_interrupted_dump_keeps_previous_dump(self):
+        task = self._get_test_dummy_task("xyz")
+        with patch('twisted.internet.reactor.callLater'):
+            self.tm.add_new_task(task)
+            self.tm.start_task("xyz")
+        self.tm.dump_task("xyz")
+        dump_path = self.tm._dump_filepath("xyz")
+        dumped = dump_path.read_bytes()
+
+        self.tm.tasks_states["xyz"].status = TaskStatus.computing
+        with patch('golem.task.taskmanager.pickle.dump',
+                   side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.tm.dump_task("xyz")
+        assert dump_path.read_bytes() == dumped
+        assert [dump_path] == list(self.tm.tasks_dir.iterdir())
+
+    def test_deleted_task_dump_is_not_written(self):
+        task = self._get_test_dummy_task("xyz")
+        with patch('twisted.internet.reactor.callLater'):
+            self.tm.add_new_task(task)
+            self.tm.start_task("xyz")
+            self.tm.delete_task("xyz")
+        self.tm.dump_dirty_tasks()
+        assert not self.tm._dump_filepath("xyz").exists()
+
     def test_got_wants_to_compute(self, *_):
         task_mock = self._get_task_mock()
         self.tm.add_new_task(task_mock)
@@ -376,6 +442,7 @@ class TestTaskManager(LogTestCase, TestDatabaseWithReactor,  # noqa # pylint: di
         with self.assertLogs(logger, level="DEBUG") as log:
             self.tm.add_new_task(task)
             self.tm.start_task(task.header.task_id)
+            self.tm.dump_dirty_tasks()
             assert any("TASK %s DUMPED" % task_id in log for log in log.output)
             assert any("Task %s added" % task_id in log for log in log.output)
 
@@ -597,7 +664,7 @@ class TestTaskManager(LogTestCase, TestDatabaseWithReactor,  # noqa # pylint: di
             task_id, op=TaskOp.NOT_ACCEPTED)
         mock_finished.assert_called_once()
 
-    @patch('golem.task.taskmanager.TaskManager.dump_task')
+    @patch('golem.task.taskmanager.TaskManager.schedule_dump')
     def test_task_result_incoming(self, dump_mock):
         subtask_id = "xxyyzz"
         node_id = 'node'
@@ -861,6 +928,57 @@ class TestTaskManager(LogTestCase, TestDatabaseWithReactor,  # noqa # pylint: di
                      ("qwe", None, TaskOp.TIMEOUT)])
             del handler
 
+    @freeze_time()
+    def test_get_next_timeout(self):
+        assert self.tm.get_next_timeout("xyz") is None
+
+        with patch('golem.task.taskbase.Task.needs_computation',
+                   return_value=True):
+            t = self._get_task_mock(timeout=10, subtask_timeout=1)
+            self.tm.add_new_task(t)
+            assert self.tm.get_next_timeout("xyz") is None
+
+            self.tm.start_task(t.header.task_id)
+            assert self.tm.get_next_timeout("xyz") == t.header.deadline
+
+            self.tm.get_next_subtask(
+                "ABC", "ABC", "xyz", 1000, 10, 5, 10,
+                "10.10.10.10",
+            )
+            subtask_state = self.tm.tasks_states["xyz"].subtask_states["xxyyzz"]
+            assert subtask_state.deadline < t.header.deadline
+            assert self.tm.get_next_timeout("xyz") == subtask_state.deadline
+
+    @freeze_time()
+    def test_deadline_index(self):
+        with patch('golem.task.taskbase.Task.needs_computation',
+                   return_value=True):
+            t = self._get_task_mock(timeout=10, subtask_timeout=1)
+            self.tm.add_new_task(t)
+            assert self.tm.get_timeouts_stats()['indexed_deadlines'] == 0
+
+            self.tm.start_task(t.header.task_id)
+            self.tm.get_next_subtask(
+                "ABC", "ABC", "xyz", 1000, 10, 5, 10,
+                "10.10.10.10",
+            )
+            assert self.tm.get_timeouts_stats()['indexed_deadlines'] == 2
+
+            # Nothing has expired yet
+            assert self.tm.check_timeouts() == []
+            assert self.tm.get_timeouts_stats()['indexed_deadlines'] == 2
+
+            self.tm.abort_task(t.header.task_id)
+            stats = self.tm.get_timeouts_stats()
+            assert stats['indexed_deadlines'] == 0
+            assert self.tm.get_next_timeout("xyz") is None
+
+        with freeze_time(datetime.datetime.now() +
+                         datetime.timedelta(seconds=20)):
+            assert self.tm.check_timeouts() == []
+        assert self.tm.tasks_states["xyz"].status is TaskStatus.aborted
+        assert self.tm.get_timeouts_stats()['heap_size'] == 0
+
     def test_task_event_listener(self):
         self.tm.notice_task_updated = Mock()
         assert isinstance(self.tm, TaskEventListener)
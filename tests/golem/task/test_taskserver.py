@@ -1,9 +1,12 @@
 # pylint: disable=protected-access, too-many-lines
+import copy
 import os
 from datetime import datetime, timedelta
 import random
 import tempfile
+import time
 import uuid
+import weakref
 from collections import deque
 from math import ceil
 from unittest.mock import Mock, MagicMock, patch, ANY
@@ -17,6 +20,7 @@ from golem_messages.factories.datastructures import p2p as dt_p2p_factory
 from golem_messages.message import ComputeTaskDef
 from golem_messages.utils import encode_hex as encode_key_id
 from requests import HTTPError
+from twisted.internet.defer import succeed
 
 from golem import testutils
 from golem.clientconfigdescriptor import ClientConfigDescriptor
@@ -353,7 +357,6 @@ class TestTaskServer(TaskServerTestBase):  # noqa pylint: disable=too-many-publi
         ts._mark_connected = Mock()
         ts.task_computer = Mock()
         ts.task_manager = Mock()
-        ts.task_manager.check_timeouts.return_value = []
         ts.task_keeper = Mock()
         ts.task_connections_helper = Mock()
         ts._add_pending_request = Mock()
@@ -370,29 +373,34 @@ class TestTaskServer(TaskServerTestBase):  # noqa pylint: disable=too-many-publi
         wtr.address = '127.0.0.1'
         wtr.port = 10000
 
-        ts.sync_network()
+        ts._send_waiting_result(subtask_id)
         ts._add_pending_request.assert_not_called()
 
         wtr.last_sending_trial = 0
         ts.retry_sending_task_result(subtask_id)
+        assert subtask_id in ts._result_timers
 
-        ts.sync_network()
-        self.assertEquals(ts._add_pending_request.call_count, 1)
+        ts._send_waiting_result(subtask_id)
+        self.assertEqual(ts._add_pending_request.call_count, 1)
 
         ts._add_pending_request.reset_mock()
         ts.task_sessions[subtask_id] = Mock()
         ts.task_sessions[subtask_id].last_message_time = float('infinity')
 
-        ts.sync_network()
+        ts.retry_sending_task_result(subtask_id)
+        ts._send_waiting_result(subtask_id)
         ts._add_pending_request.assert_not_called()
 
+        ts.task_result_sent(subtask_id)
+        assert subtask_id not in ts._result_timers
+
         ts._add_pending_request.reset_mock()
         ts.results_to_send = dict()
 
         wtf = wtr
 
         ts.failures_to_send[subtask_id] = wtf
-        ts.sync_network()
+        ts._send_waiting_failure(subtask_id)
         ts._add_pending_request.assert_not_called()
         self.assertEqual(ts.failures_to_send, {})
 
@@ -400,10 +408,76 @@ class TestTaskServer(TaskServerTestBase):  # noqa pylint: disable=too-many-publi
         ts.task_sessions.pop(subtask_id)
 
         ts.failures_to_send[subtask_id] = wtf
-        ts.sync_network()
-        self.assertEquals(ts._add_pending_request.call_count, 1)
+        ts._send_waiting_failure(subtask_id)
+        self.assertEqual(ts._add_pending_request.call_count, 1)
         self.assertEqual(ts.failures_to_send, {})
 
+    def test_sync_network_does_not_scan_deadlines(self, *_):
+        ts = self.ts
+        ts.task_manager.check_timeouts = Mock(return_value=[])
+        ts.task_keeper.remove_old_tasks = Mock()
+        ts._add_pending_request = Mock()
+        ts.results_to_send['xxyyzz'] = Mock(already_sending=False,
+                                            last_sending_trial=0,
+                                            delay_time=0)
+
+        ts.sync_network()
+
+        ts.task_manager.check_timeouts.assert_not_called()
+        ts.task_keeper.remove_old_tasks.assert_not_called()
+        ts._add_pending_request.assert_not_called()
+
+    def test_session_timeout(self, *_):
+        ts = self.ts
+        session = Mock(last_message_time=time.time())
+        ts.task_sessions_incoming.add(session)
+        ts.last_message_time_threshold = 10
+
+        ts._schedule_session_timeout(session)
+        assert weakref.ref(session) in ts._session_timers
+
+        ts._check_session_timeout(weakref.ref(session))
+        session.dropped.assert_not_called()
+        assert weakref.ref(session) in ts._session_timers
+
+        session.last_message_time -= 20
+        ts._check_session_timeout(weakref.ref(session))
+        session.task_computer.session_timeout.assert_called_once_with()
+        session.dropped.assert_called_once_with()
+
+        ts.remove_task_session(session)
+        assert weakref.ref(session) not in ts._session_timers
+
+    def test_task_header_deadline(self, *_):
+        ts = self.ts
+        ts.task_keeper.remove_task_if_expired = Mock(return_value=False)
+        ts.task_keeper.task_headers['xxyyzz'] = Mock(deadline=time.time() + 60)
+
+        ts._check_task_header_deadline('xxyyzz')
+        assert 'xxyyzz' in ts._task_header_timers
+
+        ts.task_keeper.remove_task_if_expired.return_value = True
+        ts.task_keeper.forget_removed_tasks = Mock()
+        ts._task_header_timers.cancel('xxyyzz')
+        ts._check_task_header_deadline('xxyyzz')
+        assert 'xxyyzz' not in ts._task_header_timers
+        ts.task_keeper.forget_removed_tasks.assert_called_once_with()
+
+    def test_task_timeouts(self, *_):
+        ts = self.ts
+        ts.task_manager.check_timeouts = Mock(return_value=['node_id'])
+        ts.task_manager.get_next_timeout = Mock(return_value=None)
+        ts._task_timers.schedule('task_id', time.time() + 60)
+
+        with patch('golem.task.taskserver.Trust') as trust:
+            ts._check_task_timeouts('task_id')
+        trust.COMPUTED.decrease.assert_called_once_with('node_id')
+        assert 'task_id' not in ts._task_timers
+
+        ts.task_manager.get_next_timeout.return_value = time.time() + 60
+        ts._check_task_timeouts('task_id')
+        assert 'task_id' in ts._task_timers
+
     def test_add_task_session(self, *_):
         ts = self.ts
         ts.network = Mock()
@@ -479,8 +553,8 @@ class TestTaskServer(TaskServerTestBase):  # noqa pylint: disable=too-many-publi
 
         self.assertTrue(ts.remove_pending_conn.called)
         self.assertTrue(ts.remove_responses.called)
-        self.assertFalse(wtr.alreadySending)
-        self.assertTrue(wtr.lastSendingTrial)
+        self.assertFalse(wtr.already_sending)
+        self.assertTrue(wtr.last_sending_trial)
 
         ts.remove_pending_conn.called = False
         ts.remove_responses.called = False
@@ -794,6 +868,102 @@ class TaskServerTaskHeaderTest(TaskServerTestBase):
         self.assertTrue(ts.add_task_header(task_header))
         self.assertEqual(len(ts.get_others_tasks_headers()), 2)
 
+    def test_verify_header_sig_cached(self, *_):
+        keys_auth_2 = KeysAuth(
+            os.path.join(self.path, "2"),
+            'priv_key',
+            'password',
+        )
+        TaskServer.verified_headers.clear()
+        task_header = get_example_task_header(keys_auth_2.public_key)
+        task_header.sign(private_key=keys_auth_2._private_key)  # noqa pylint:disable=no-value-for-parameter
+
+        with patch.object(dt_tasks.TaskHeader, 'verify',
+                          autospec=True) as verify:
+            assert TaskServer.verify_header_sig(task_header)
+            assert TaskServer.verify_header_sig(task_header)
+        assert verify.call_count == 1
+
+        task_header.max_price += 1
+        assert not TaskServer.verify_header_sig(task_header)
+
+    @patch('golem.task.taskserver.deferToThread')
+    def test_add_task_headers(self, defer_mock, *_):
+        keys_auth_2 = KeysAuth(
+            os.path.join(self.path, "2"),
+            'priv_key',
+            'password',
+        )
+        TaskServer.verified_headers.clear()
+        defer_mock.side_effect = lambda f, *args: succeed(f(*args))
+
+        ts = self.ts
+        valid = get_example_task_header(keys_auth_2.public_key)
+        valid.sign(private_key=keys_auth_2._private_key)  # noqa pylint:disable=no-value-for-parameter
+        invalid = get_example_task_header(keys_auth_2.public_key)
+
+        results = []
+        with patch.object(dt_tasks.TaskHeader, 'verify', autospec=True,
+                          side_effect=dt_tasks.TaskHeader.verify) as verify:
+            ts.add_task_headers([valid, invalid]).addCallback(results.append)
+        assert results == [[True, False]]
+        assert defer_mock.call_count == 1
+        assert defer_mock.call_args[0][1] == [valid, invalid]
+        # Each signature is checked once, in the worker thread
+        assert verify.call_count == 2
+        assert [c[0][0] for c in verify.call_args_list] == [valid, invalid]
+
+        ts.add_task_headers([valid]).addCallback(results.append)
+        assert results[1] == [True]
+        assert defer_mock.call_count == 1
+        assert len(ts.get_others_tasks_headers()) == 1
+
+    @patch('golem.task.taskserver.deferToThread')
+    def test_add_task_headers_error(self, defer_mock, *_):
+        defer_mock.side_effect = lambda f, *args: succeed(f(*args))
+        TaskServer.verified_headers.clear()
+        keys_auth_2 = KeysAuth(
+            os.path.join(self.path, "2"),
+            'priv_key',
+            'password',
+        )
+        header = get_example_task_header(keys_auth_2.public_key)
+        header.sign(private_key=keys_auth_2._private_key)  # noqa pylint:disable=no-value-for-parameter
+
+        results = []
+        with patch.object(self.ts, 'add_task_header',
+                          side_effect=RuntimeError):
+            self.ts.add_task_headers([header]).addCallback(results.append)
+        assert results == [[False]]
+
+    def test_add_task_header_updates_keep_index_bounded(self, *_):
+        keys_auth_2 = KeysAuth(
+            os.path.join(self.path, "2"),
+            'priv_key',
+            'password',
+        )
+        ts = self.ts
+        headers = [get_example_task_header(keys_auth_2.public_key)
+                   for _ in range(10)]
+        for i in range(1, 21):
+            for header in headers:
+                header = copy.copy(header)
+                header.deadline += i
+                header.timestamp += i
+                header.signature = str(i).encode()
+                assert ts.add_task_header(header, verified=True)
+
+        task_keeper = ts.task_keeper
+        assert len(task_keeper.task_headers) == len(headers)
+        assert len(task_keeper.last_checking) == len(headers)
+        assert sum(map(len, task_keeper.tasks_by_owner.values())) == \
+            len(headers)
+        # One expiry timer per header, regardless of the number of updates
+        assert len(ts._task_header_timers) == len(headers)
+        for header in headers:
+            assert ts._task_header_timers._calls[header.task_id][0] == \
+                header.deadline + 20
+
     def test_add_task_header_past_deadline(self):
         keys_auth_2 = KeysAuth(
             os.path.join(self.path, "2"),
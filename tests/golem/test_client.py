@@ -22,7 +22,7 @@ from golem import model
 from golem import testutils
 from golem.client import Client, ClientTaskComputerEventListener, \
     DoWorkService, MonitoringPublisherService, \
-    NetworkConnectionPublisherService, \
+    NetworkConnectionPublisherService, NodeMetricsCollector, \
     ResourceCleanerService, TaskArchiverService, \
     TaskCleanerService
 from golem.clientconfigdescriptor import ClientConfigDescriptor
@@ -38,7 +38,7 @@ from golem.resource.dirmanager import DirManager
 from golem.rpc.mapping.rpceventnames import UI, Environment, Golem
 from golem.task.acl import Acl
 from golem.task.taskserver import TaskServer
-from golem.task.taskstate import TaskTestStatus
+from golem.task.taskstate import SubtaskStatus, TaskStatus, TaskTestStatus
 from golem.tools import testwithreactor
 from golem.tools.assertlogs import LogTestCase
 
@@ -524,13 +524,90 @@ class TestMonitoringPublisherService(testwithreactor.TestWithReactor):
             interval_seconds=1,
         )
 
+    @patch('golem.client.MessageHistoryService.instance', None)
     @patch('golem.client.logger')
     @patch('golem.client.dispatcher.send')
     def test_run(self, send, logger):
         self.service._run()
 
         logger.debug.assert_not_called()
-        assert send.call_count == 5
+        assert send.call_count == 6
+
+    @patch('golem.client.MessageHistoryService.instance')
+    @patch('golem.client.dispatcher.send')
+    def test_run_with_message_history(self, send, history_service):
+        history_service.get_stats.return_value = {'queue_depth': 1}
+        self.service._run()
+
+        assert send.call_count == 7
+        send.assert_called_with(
+            signal='golem.monitor',
+            event='message_history_snapshot',
+            stats={'queue_depth': 1},
+        )
+
+
+class TestNodeMetricsCollector(TestCase):
+
+    def setUp(self):
+        self.client = Mock()
+        task_manager = self.client.task_server.task_manager
+        task_manager.tasks_states = {
+            'task1': Mock(status=TaskStatus.computing, subtask_states={
+                'subtask1': Mock(subtask_status=SubtaskStatus.starting),
+                'subtask2': Mock(subtask_status=SubtaskStatus.finished),
+            }),
+            'task2': Mock(status=TaskStatus.finished, subtask_states={
+                'subtask3': Mock(subtask_status=SubtaskStatus.finished),
+            }),
+        }
+        task_manager.comp_task_keeper.active_tasks = {'task3': Mock()}
+        task_manager.comp_task_keeper.subtask_to_task = {'subtask4': 'task3'}
+        self.client.task_server.task_keeper.task_headers = {'task4': Mock()}
+        self.client.task_server.task_keeper.supported_tasks = set()
+        self.client.p2pservice.peers = {'node1': Mock()}
+        self.client.p2pservice.incoming_peers = {'node1': {}, 'node2': {}}
+        self.client.p2pservice.free_peers = ['node2']
+        self.client.transaction_system.get_awaiting_payments.return_value = \
+            (2, 3 * denoms.ether)
+        self.collector = NodeMetricsCollector(self.client)
+
+    def _collect(self):
+        return {
+            sample[0:2]: sample[2]
+            for collector in self.collector.collectors()
+            for family in collector()
+            for sample in family.samples
+        }
+
+    @patch('golem.client.MessageHistoryService.instance')
+    def test_collect(self, history_service):
+        history_service.get_stats.return_value = {
+            'queue_depth': 3,
+            'batch_size': 2,
+            'commit_time': 0.5,
+        }
+        samples = self._collect()
+
+        assert samples[('golem_tasks', (('status', 'computing'),))] == 1
+        assert samples[('golem_subtasks', (('status', 'finished'),))] == 2
+        assert samples[('golem_computed_subtasks', ())] == 1
+        assert samples[('golem_task_headers', ())] == 1
+        assert samples[('golem_supported_tasks', ())] == 0
+        assert samples[('golem_peers', (('state', 'known'),))] == 2
+        assert samples[('golem_verification_queue_depth', ())] == 0
+        assert samples[('golem_message_history_queue_depth', ())] == 3
+        assert samples[('golem_awaiting_payments', ())] == 2
+
+    @patch('golem.client.MessageHistoryService.instance', None)
+    def test_collect_not_started(self):
+        self.client.task_server = None
+        self.client.p2pservice = None
+        samples = self._collect()
+
+        assert ('golem_tasks', ()) not in samples
+        assert ('golem_peers', (('state', 'connected'),)) not in samples
+        assert ('golem_awaiting_payments', ()) in samples
 
 
 class TestNetworkConnectionPublisherService(testwithreactor.TestWithReactor):
@@ -1,4 +1,5 @@
 from datetime import datetime
+from unittest import mock
 
 from golem_messages.datastructures import p2p as dt_p2p
 from golem_messages.factories.datastructures import p2p as dt_p2p_factory
@@ -169,3 +170,31 @@ class TestPerformance(DatabaseFixture):
         assert env.value == 300
         env = m.Performance.get(m.Performance.environment_id == "ENVX")
         assert env.value == 200
+        assert env.all_cores_value is None
+
+    def test_update_or_create_all_cores(self):
+        m.Performance.update_or_create("ENVX", 100, all_cores_value=400)
+        env = m.Performance.get(m.Performance.environment_id == "ENVX")
+        assert env.value == 100
+        assert env.all_cores_value == 400
+        m.Performance.update_or_create("ENVX", 200)
+        env = m.Performance.get(m.Performance.environment_id == "ENVX")
+        assert env.value == 200
+        assert env.all_cores_value is None
+
+    def test_get_cached(self):
+        assert m.Performance.get_cached("ENVX") is None
+        m.Performance.update_or_create("ENVX", 100)
+        assert m.Performance.get_cached("ENVX").value == 100
+
+        with mock.patch.object(m.Performance, 'select') as select:
+            assert m.Performance.get_cached("ENVX").value == 100
+        select.assert_not_called()
+
+        m.Performance.update_or_create("ENVX", 200)
+        assert m.Performance.get_cached("ENVX").value == 200
+
+        perf = m.Performance.get(m.Performance.environment_id == "ENVX")
+        perf.min_accepted_step = 100
+        perf.save()
+        assert m.Performance.get_cached("ENVX").min_accepted_step == 100